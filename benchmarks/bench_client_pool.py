@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Benchmark of pooled model clients against a new client per classify call.
+
+This script starts a local OpenAI-compatible stand-in for the chat completions
+endpoint and times ``classify`` with a new client per call and with a shared
+ClientPool. No network access or API keys are required. The stand-in serves
+plain HTTP, so the savings measured here exclude the TLS handshake that
+dominates against the real HTTPS endpoints.
+
+Usage:
+    python benchmarks/bench_client_pool.py [--requests N]
+"""
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Add the src directory to the path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from chemsource import classifier
+from chemsource.clients import ClientPool
+
+COMPLETION_BODY = json.dumps({
+    "id": "chatcmpl-bench",
+    "object": "chat.completion",
+    "created": 0,
+    "model": "gpt-4o",
+    "choices": [{"index": 0,
+                 "message": {"role": "assistant", "content": "MEDICAL"},
+                 "finish_reason": "stop"}],
+    "usage": {"prompt_tokens": 1, "completion_tokens": 1, "total_tokens": 2}
+}).encode()
+
+
+class CompletionsHandler(BaseHTTPRequestHandler):
+    """Minimal keep-alive stand-in for /v1/chat/completions."""
+
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(COMPLETION_BODY)))
+        self.end_headers()
+        self.wfile.write(COMPLETION_BODY)
+
+    def log_message(self, *args):
+        pass
+
+
+def time_calls(count, client_pool=None):
+    """Return the mean seconds per classify call."""
+    start = time.perf_counter()
+    for _ in range(count):
+        classifier.classify("aspirin", "pain relief", api_key="bench", baseprompt="Classify COMPOUND_NAME: ",
+                            client_pool=client_pool)
+    return (time.perf_counter() - start) / count
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark pooled vs. per-call model clients")
+    parser.add_argument("--requests", type=int, default=200,
+                        help="Number of classify calls per run (default: 200)")
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), CompletionsHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    os.environ["OPENAI_BASE_URL"] = f"http://127.0.0.1:{server.server_address[1]}/v1"
+
+    # Clients without an explicit base URL, pooled or not, send requests to the stand-in
+    fresh = time_calls(args.requests)
+    with ClientPool() as pool:
+        pooled = time_calls(args.requests, pool)
+
+    server.shutdown()
+
+    print(f"classify calls per run: {args.requests}")
+    print(f"New client per call: {fresh * 1000:8.3f} ms per call")
+    print(f"Pooled client:       {pooled * 1000:8.3f} ms per call")
+    print(f"Saved per call:      {(fresh - pooled) * 1000:8.3f} ms ({(1 - pooled / fresh) * 100:.1f}%)")
+
+
+if __name__ == "__main__":
+    main()
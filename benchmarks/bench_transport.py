@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Benchmark of the pooled Transport against bare per-call requests.
+
+This script starts a local stand-in for the NCBI E-utilities endpoints and times
+``pubmed_retrieve`` (one esearch and one efetch per compound) with and without a
+shared Transport. No network access or API keys are required. The stand-in
+serves plain HTTP, so the savings measured here exclude the TLS handshake that
+dominates against the real HTTPS endpoints.
+
+Usage:
+    python benchmarks/bench_transport.py [--requests N]
+"""
+import argparse
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import patch
+
+# Add the src directory to the path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from chemsource import retriever
+from chemsource.ratelimit import RateLimiter
+from chemsource.transport import Transport
+
+SEARCH_BODY = (b"<eSearchResult><Count>1</Count><QueryKey>1</QueryKey>"
+               b"<WebEnv>bench</WebEnv><IdList><Id>1</Id></IdList></eSearchResult>")
+
+FETCH_BODY = (b"<PubmedArticleSet><PubmedArticle><MedlineCitation><PMID>1</PMID>"
+              b"<Article><Abstract><AbstractText>Benchmark abstract.</AbstractText>"
+              b"</Abstract></Article></MedlineCitation></PubmedArticle></PubmedArticleSet>")
+
+
+class EutilsHandler(BaseHTTPRequestHandler):
+    """Minimal keep-alive stand-in for esearch.fcgi and efetch.fcgi."""
+
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        body = SEARCH_BODY if self.path.startswith("/esearch") else FETCH_BODY
+        self.send_response(200)
+        self.send_header("Content-Type", "text/xml")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    do_POST = do_GET
+
+    def log_message(self, *args):
+        pass
+
+
+def time_calls(count, transport=None):
+    """Return the mean seconds per pubmed_retrieve call."""
+    start = time.perf_counter()
+    for _ in range(count):
+        retriever.pubmed_retrieve("aspirin", transport=transport)
+    return (time.perf_counter() - start) / count
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark pooled vs. per-call HTTP transport")
+    parser.add_argument("--requests", type=int, default=200,
+                        help="Number of compounds to retrieve per run (default: 200)")
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), EutilsHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+
+    # The stand-in is local, so lift the NCBI rate limit to measure transport cost only
+    unlimited = RateLimiter(rate=1e9)
+    with patch.object(retriever, "PUBMED_SEARCH_URL", base + "/esearch.fcgi"), \
+         patch.object(retriever, "PUBMED_FETCH_URL", base + "/efetch.fcgi"), \
+         patch.object(retriever, "get_ncbi_limiter", lambda ncbikey: unlimited):
+        bare = time_calls(args.requests)
+        with Transport() as transport:
+            pooled = time_calls(args.requests, transport)
+
+    server.shutdown()
+
+    print(f"Compounds retrieved per run: {args.requests} (2 HTTP requests each)")
+    print(f"Bare requests.get:  {bare * 1000:8.3f} ms per compound")
+    print(f"Pooled Transport:   {pooled * 1000:8.3f} ms per compound")
+    print(f"Saved per compound: {(bare - pooled) * 1000:8.3f} ms ({(1 - pooled / bare) * 100:.1f}%)")
+
+
+if __name__ == "__main__":
+    main()
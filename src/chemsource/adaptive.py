@@ -0,0 +1,218 @@
+"""
+Adaptive source ordering module for chemsource.
+
+This module tracks how often each source returns useful content and how long it
+takes, separately for different kinds of compound names, and orders the sources
+of a lookup so that the expected time to the first useful content is smallest.
+For two sources tried in order A, B the expected time is
+``latency(A) + (1 - hit_rate(A)) * latency(B)``, which is minimized by trying
+sources in decreasing order of ``hit_rate / latency``.
+"""
+
+from typing import Dict, List, Optional, Callable
+import itertools
+import re
+import threading
+
+#: Name pattern of research codes such as "GSK-1234" or "BMS986165"
+PATTERN_CODE = "CODE"
+
+#: Name pattern of systematic (IUPAC-like) names such as "2-acetoxybenzoic acid"
+PATTERN_SYSTEMATIC = "SYSTEMATIC"
+
+#: Name pattern of common and trade names such as "aspirin"
+PATTERN_COMMON = "COMMON"
+
+_CODE = re.compile(r"^[A-Za-z]{1,6}[- ]?\d{2,}[A-Za-z]?$")
+_SYSTEMATIC = re.compile(r"\d+(?:,\d+)*-|[\[\](){}]|"
+                         r"(?:methyl|ethyl|propyl|butyl|phenyl|hydroxy|amino|chloro|fluoro|bromo|oxo)[a-z]")
+
+
+def name_pattern(name: str) -> str:
+    """
+    Classify a compound name as a research code, a systematic name or a common name.
+
+    Args:
+        name (str): The compound name.
+
+    Returns:
+        str: PATTERN_CODE, PATTERN_SYSTEMATIC or PATTERN_COMMON.
+
+    Example:
+        >>> name_pattern("2-(acetyloxy)benzoic acid")
+        'SYSTEMATIC'
+    """
+    name = name.strip()
+    if _CODE.match(name):
+        return PATTERN_CODE
+    if _SYSTEMATIC.search(name.lower()):
+        return PATTERN_SYSTEMATIC
+    return PATTERN_COMMON
+
+
+class _SourceRecord:
+    """
+    Observations of one source for one name pattern.
+
+    Attributes:
+        attempts (int): Number of requests made.
+        hits (int): Number of requests that returned useful content.
+        latency (float): Exponentially weighted mean request time in seconds.
+    """
+
+    def __init__(self) -> None:
+        self.attempts = 0
+        self.hits = 0
+        self.latency = None
+
+
+class AdaptiveSourceOrder:
+    """
+    Thread-safe chooser of the source order minimizing expected time to useful content.
+
+    Every request made by ``retrieve`` or ``aretrieve`` is recorded with its outcome
+    and duration under the pattern of the compound name (see ``name_pattern``). Once
+    every source has at least ``min_samples`` observations for a pattern, lookups of
+    names with that pattern try the sources in decreasing order of smoothed hit rate
+    over latency; before that, the caller's priority order is kept. A source placed
+    second is only tried when the first one misses, so its statistics describe
+    those names rather than all names.
+
+    Args:
+        min_samples (int, optional): Observations each source needs for a pattern before
+                                     the order is adapted. Defaults to 20.
+        smoothing (float, optional): Weight of the newest latency in the moving average.
+                                     Defaults to 0.2.
+        pattern (Callable[[str], str], optional): Function mapping a name to its pattern.
+                                                  Defaults to ``name_pattern``; use
+                                                  ``lambda name: "ALL"`` for a single group.
+
+    Raises:
+        ValueError: If min_samples is less than 1 or smoothing is not in (0, 1].
+
+    Example:
+        >>> order = AdaptiveSourceOrder()
+        >>> source, content = retrieve("BMS-986165", source_order=order)
+        >>> order.explain("BMS-986165")
+    """
+
+    def __init__(self,
+                 min_samples: int = 20,
+                 smoothing: float = 0.2,
+                 pattern: Optional[Callable[[str], str]] = None) -> None:
+        if min_samples < 1:
+            raise ValueError("min_samples must be at least 1")
+        if not 0 < smoothing <= 1:
+            raise ValueError("smoothing must be in (0, 1]")
+
+        self.min_samples = min_samples
+        self.smoothing = smoothing
+        self.pattern = pattern if pattern is not None else name_pattern
+        self._lock = threading.Lock()
+        self._records: Dict[str, Dict[str, _SourceRecord]] = {}
+
+    def record(self, name: str, source: str, hit: bool, elapsed: float) -> None:
+        """
+        Record the outcome of a request to a source.
+
+        Args:
+            name (str): The compound name looked up.
+            source (str): The source, e.g. "WIKIPEDIA" or "PUBMED".
+            hit (bool): Whether the source returned useful content.
+            elapsed (float): The duration of the request in seconds.
+        """
+        pattern = self.pattern(name)
+        with self._lock:
+            record = self._records.setdefault(pattern, {}).setdefault(source, _SourceRecord())
+            record.attempts += 1
+            record.hits += int(hit)
+            if record.latency is None:
+                record.latency = elapsed
+            else:
+                record.latency += self.smoothing * (elapsed - record.latency)
+
+    def order(self, name: str, sources: List[str]) -> List[str]:
+        """
+        Order the sources of a lookup.
+
+        Args:
+            name (str): The compound name to look up.
+            sources (List[str]): The sources in the caller's priority order.
+
+        Returns:
+            List[str]: The sources in the order minimizing the expected time to useful
+                       content, or in the given order while observations are too few.
+        """
+        with self._lock:
+            records = self._records.get(self.pattern(name), {})
+            if any(source not in records or records[source].attempts < self.min_samples for source in sources):
+                return list(sources)
+            rates = {source: self._rate(records[source]) for source in sources}
+        return sorted(sources, key=lambda source: -rates[source])
+
+    def explain(self, name: str, sources: Optional[List[str]] = None) -> dict:
+        """
+        Explain the order chosen for a name.
+
+        Args:
+            name (str): The compound name to look up.
+            sources (List[str], optional): The sources in priority order. Defaults to
+                                           ["WIKIPEDIA", "PUBMED"].
+
+        Returns:
+            dict: The name pattern, the chosen order, whether it was adapted, and the expected
+                  time in seconds to useful content of every possible order whose sources
+                  have all been observed.
+        """
+        if sources is None:
+            sources = ["WIKIPEDIA", "PUBMED"]
+        pattern = self.pattern(name)
+        chosen = self.order(name, sources)
+        with self._lock:
+            records = self._records.get(pattern, {})
+            adapted = all(source in records and records[source].attempts >= self.min_samples for source in sources)
+            expected = {}
+            if all(source in records for source in sources):
+                for candidate in itertools.permutations(sources):
+                    expected[" > ".join(candidate)] = self._expected_time([records[source] for source in candidate])
+        return {"pattern": pattern, "order": chosen, "adapted": adapted, "expected_time": expected}
+
+    def stats(self) -> Dict[str, Dict[str, dict]]:
+        """
+        Get the observations of every source for every name pattern.
+
+        Returns:
+            Dict[str, Dict[str, dict]]: A dictionary mapping each pattern to a dictionary mapping
+                                        each source to its attempts, hits, hit rate and
+                                        mean latency in seconds.
+        """
+        with self._lock:
+            return {pattern: {source: {"attempts": record.attempts,
+                                       "hits": record.hits,
+                                       "hit_rate": record.hits / record.attempts,
+                                       "latency": record.latency}
+                              for source, record in records.items()}
+                    for pattern, records in self._records.items()}
+
+    def reset(self) -> None:
+        """
+        Forget all observations.
+        """
+        with self._lock:
+            self._records.clear()
+
+    @staticmethod
+    def _hit_rate(record: _SourceRecord) -> float:
+        # Laplace smoothing keeps a source with no hits yet from being ruled out for good
+        return (record.hits + 1) / (record.attempts + 2)
+
+    def _rate(self, record: _SourceRecord) -> float:
+        return self._hit_rate(record) / max(record.latency, 1e-6)
+
+    def _expected_time(self, records: List[_SourceRecord]) -> float:
+        expected = 0.0
+        reached = 1.0
+        for record in records:
+            expected += reached * record.latency
+            reached *= 1 - self._hit_rate(record)
+        return expected
@@ -0,0 +1,228 @@
+"""
+Batch API module for chemsource.
+
+This module exports classification jobs as OpenAI Batch API input files and
+turns the batch output files back into classification results. Each request is
+built like a ``classify`` request, and each response goes through the same
+post-processing, so a batch job gives the results ``classify`` would have given
+at a fraction of the cost and without holding connections open for hours.
+Submission is done by a BatchSubmitter, so jobs can be sent to the OpenAI API
+or to a local stand-in.
+"""
+
+from typing import Optional, List, Tuple, Union, Any, Dict, Iterable
+from abc import ABC, abstractmethod
+import json
+import os
+
+from spellchecker import SpellChecker
+
+from .classifier import check_options, classification_request, parse_response
+from .exceptions import BatchIncompleteError
+
+#: Endpoint of the requests in a batch input file
+BATCH_ENDPOINT = "/v1/chat/completions"
+
+#: Time within which a submitted batch is processed
+DEFAULT_COMPLETION_WINDOW = "24h"
+
+
+def write_batch(path: Union[str, os.PathLike],
+                compounds: Iterable[Tuple[str, Any]],
+                baseprompt: str,
+                model: str = 'gpt-4o',
+                temperature: float = 0,
+                top_p: float = 0,
+                max_length: int = 250000) -> int:
+    """
+    Write a Batch API input file with one classification request per compound.
+
+    The custom_id of each request is the compound name, so names must be unique.
+
+    Args:
+        path (Union[str, os.PathLike]): Path of the JSONL file to write.
+        compounds (Iterable[Tuple[str, Any]]): The (name, information) pairs to classify.
+        baseprompt (str): Base prompt template for classification.
+        model (str, optional): Name of the language model to use. Defaults to 'gpt-4o'.
+        temperature (float, optional): Temperature parameter for model creativity. Defaults to 0.
+        top_p (float, optional): Top-p parameter for nucleus sampling. Defaults to 0.
+        max_length (int, optional): Maximum length of a prompt in characters. Defaults to 250000.
+
+    Returns:
+        int: The number of requests written.
+
+    Raises:
+        ValueError: If a compound name appears more than once.
+
+    Example:
+        >>> write_batch("job.jsonl", [("aspirin", "pain relief")], BASE_PROMPT)
+        1
+    """
+    names = set()
+    with open(path, "w", encoding="utf-8") as batch_file:
+        for name, input_text in compounds:
+            if name in names:
+                raise ValueError(f"Duplicate compound name in batch: {name!r}")
+            names.add(name)
+            request = {"custom_id": name,
+                       "method": "POST",
+                       "url": BATCH_ENDPOINT,
+                       "body": classification_request(name, input_text, baseprompt, model,
+                                                      temperature, top_p, max_length, None)
+                       }
+            batch_file.write(json.dumps(request) + "\n")
+    return len(names)
+
+
+def read_batch(path: Union[str, os.PathLike],
+               clean_output: bool = False,
+               explanation: bool = False,
+               explanation_separator: str = "EXPLANATION_COMPLETE",
+               output_explanation: bool = False,
+               allowed_categories: Optional[List[str]] = None,
+               spell_checker: Optional[SpellChecker] = None) -> Dict[str, Optional[Union[str, List[str]]]]:
+    """
+    Read the classification results of a Batch API output file.
+
+    Each response is post-processed like a ``classify`` response. Requests that
+    failed, and responses that cannot be post-processed, give None so that those
+    compounds can be classified again.
+
+    Args:
+        path (Union[str, os.PathLike]): Path of the JSONL output file.
+        clean_output (bool, optional): Whether to clean and validate the output. Defaults to False.
+        explanation (bool, optional): Whether to expect and extract explanations from the model
+                                      response. Defaults to False.
+        explanation_separator (str, optional): The delimiter between explanation and classification.
+                                               Defaults to "EXPLANATION_COMPLETE".
+        output_explanation (bool, optional): Whether to return the explanation text alongside the
+                                             classification. Defaults to False.
+        allowed_categories (List[str], optional): List of allowed categories for filtering output.
+        spell_checker (SpellChecker, optional): Spell checker instance for output correction.
+
+    Returns:
+        Dict[str, Optional[Union[str, List[str], Tuple[List[str], str]]]]: A dictionary mapping each
+                                                                          custom_id to its result.
+
+    Raises:
+        ValueError: For the same options ``classify`` rejects.
+
+    Example:
+        >>> read_batch("job_output.jsonl", clean_output=True, allowed_categories=["MEDICAL", "FOOD"])
+        {'aspirin': ['MEDICAL']}
+    """
+    check_options(clean_output, explanation, output_explanation, allowed_categories)
+
+    results = {}
+    with open(path, encoding="utf-8") as batch_file:
+        for line in batch_file:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            content = _response_content(record)
+            try:
+                results[record["custom_id"]] = None if content is None else parse_response(
+                    content, clean_output, explanation, explanation_separator, output_explanation,
+                    allowed_categories, spell_checker)
+            except ValueError:
+                results[record["custom_id"]] = None
+    return results
+
+
+def _response_content(record: dict) -> Optional[str]:
+    """
+    Get the message content of a batch output record, or None if the request failed.
+    """
+    response = record.get("response") or {}
+    if record.get("error") or response.get("status_code") != 200:
+        return None
+    try:
+        return response["body"]["choices"][0]["message"]["content"]
+    except (KeyError, IndexError, TypeError):
+        return None
+
+
+class BatchSubmitter(ABC):
+    """
+    Abstract base class for services that run Batch API jobs.
+
+    Subclasses upload an input file, report the status of the job and download
+    its output file.
+    """
+
+    @abstractmethod
+    def submit(self, path: Union[str, os.PathLike]) -> str:
+        """
+        Submit a batch input file.
+
+        Args:
+            path (Union[str, os.PathLike]): Path of the JSONL input file.
+
+        Returns:
+            str: The ID of the batch.
+        """
+
+    @abstractmethod
+    def status(self, batch_id: str) -> str:
+        """
+        Get the status of a batch.
+
+        Args:
+            batch_id (str): The ID of the batch.
+
+        Returns:
+            str: The status, "completed" once the output can be downloaded.
+        """
+
+    @abstractmethod
+    def download(self, batch_id: str, path: Union[str, os.PathLike]) -> None:
+        """
+        Download the output file of a completed batch.
+
+        Args:
+            batch_id (str): The ID of the batch.
+            path (Union[str, os.PathLike]): Path of the JSONL output file to write.
+
+        Raises:
+            BatchIncompleteError: If the batch has not completed.
+        """
+
+
+class OpenAIBatchSubmitter(BatchSubmitter):
+    """
+    Submitter running batches through the OpenAI Files and Batches APIs.
+
+    Args:
+        client (Any): OpenAI client used for the Files and Batches APIs.
+        completion_window (str, optional): Time within which the batch is processed.
+                                           Defaults to "24h".
+
+    Example:
+        >>> submitter = OpenAIBatchSubmitter(OpenAI(api_key="your_key"))
+        >>> batch_id = submitter.submit("job.jsonl")
+    """
+
+    def __init__(self, client: Any, completion_window: str = DEFAULT_COMPLETION_WINDOW) -> None:
+        self.client = client
+        self.completion_window = completion_window
+
+    def submit(self, path: Union[str, os.PathLike]) -> str:
+        with open(path, "rb") as batch_file:
+            uploaded = self.client.files.create(file=batch_file, purpose="batch")
+        batch = self.client.batches.create(input_file_id=uploaded.id,
+                                           endpoint=BATCH_ENDPOINT,
+                                           completion_window=self.completion_window)
+        return batch.id
+
+    def status(self, batch_id: str) -> str:
+        return self.client.batches.retrieve(batch_id).status
+
+    def download(self, batch_id: str, path: Union[str, os.PathLike]) -> None:
+        batch = self.client.batches.retrieve(batch_id)
+        if batch.status != "completed":
+            raise BatchIncompleteError(f"Batch {batch_id} is {batch.status}, not completed")
+        with open(path, "wb") as output_file:
+            for file_id in (batch.output_file_id, batch.error_file_id):
+                if file_id:
+                    content = self.client.files.content(file_id).content
+                    output_file.write(content if content.endswith(b"\n") else content + b"\n")
@@ -0,0 +1,762 @@
+"""
+Retrieval cache module for chemsource.
+
+This module provides caches for the content returned by the retrieval functions,
+keyed by source, normalized compound name and the source parameters that affect
+the result, so that repeated runs over the same compounds do not fetch the same
+Wikipedia pages and PubMed abstracts again. RetrievalCache persists entries in a
+SQLite file and MemoryCache keeps a byte-bounded LRU set of entries in memory.
+Either can also serve as a negative cache remembering known misses, usually with
+the shorter DEFAULT_NEGATIVE_TTL. Entries may carry a validator (the Wikipedia
+revision id) so that expired entries can be revalidated instead of downloaded again.
+ResponseCache persists raw model completions keyed by a hash of the full request,
+so that classifications repeated with the same prompt, model and sampling
+parameters are not paid for again.
+"""
+
+from typing import Optional, Dict, Any, Tuple, List, Union
+from collections import OrderedDict
+import hashlib
+import json
+import os
+import sqlite3
+import sys
+import threading
+import time
+from .names import canonical_name
+
+#: Default capacity of the in-memory cache in bytes
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+#: Default time-to-live in seconds per source (None never expires)
+DEFAULT_TTL = {"WIKIPEDIA": 30 * 24 * 3600.0,
+               "PUBMED": 7 * 24 * 3600.0
+               }
+
+#: Version of the RetrievalCache schema, stored as the SQLite user_version of the file.
+#: Version 1 keys entries by canonical name; version 0 keyed them by the name with
+#: whitespace collapsed and case folded.
+RETRIEVAL_CACHE_VERSION = 1
+
+#: Default time-to-live in seconds per source for a negative cache of known misses
+DEFAULT_NEGATIVE_TTL = {"WIKIPEDIA": 24 * 3600.0,
+                        "PUBMED": 24 * 3600.0
+                        }
+
+
+def normalize_name(name: str) -> str:
+    """
+    Normalize a compound name for use in cache keys.
+
+    Args:
+        name (str): The compound name.
+
+    Returns:
+        str: The canonical key of the name, see ``canonical_name``.
+    """
+    return canonical_name(name)
+
+
+def _params_key(params: Optional[Dict[str, Any]]) -> str:
+    """
+    Serialize source parameters into a stable cache key component.
+
+    Args:
+        params (Dict[str, Any], optional): The parameters affecting the retrieved content.
+
+    Returns:
+        str: The parameters as sorted JSON.
+    """
+    return json.dumps(params or {}, sort_keys=True, default=str)
+
+
+class RetrievalCache:
+    """
+    Persistent on-disk cache of retrieved texts backed by SQLite.
+
+    Entries are keyed by source, normalized compound name and the parameters that
+    affect the content (e.g. retmax and sort for PubMed), and expire after a per-source
+    time-to-live. The database runs in WAL mode with a busy timeout, so several threads
+    and processes can read and write the same file concurrently. Each thread uses its
+    own connection. An entry can store a validator, such as the Wikipedia revision id
+    it was retrieved at, and the title it was looked up under; expired entries with a
+    validator stay available through ``get_stale`` and are made fresh again with
+    ``touch`` once the validator is confirmed to be current.
+
+    Names are keyed by ``canonical_name``. A file written before canonical keys
+    (schema version 0) is rekeyed when it is opened, so its entries stay reachable.
+
+    Args:
+        path (str): Path of the SQLite database file. Created if it does not exist.
+        ttl (Dict[str, float], optional): Time-to-live in seconds per source; a value of
+                                          None never expires. Sources not listed never
+                                          expire. Defaults to DEFAULT_TTL.
+        timeout (float, optional): Seconds to wait for a lock held by another writer.
+                                   Defaults to 30.
+
+    Attributes:
+        path (str): The database file path.
+        ttl (Dict[str, float]): The per-source time-to-live.
+        hits (int): Number of lookups answered from the cache.
+        misses (int): Number of lookups not found in the cache.
+        expired (int): Number of lookups whose entry had expired (also counted as misses).
+        writes (int): Number of entries stored.
+        revalidated (int): Number of expired entries made fresh again with ``touch``.
+
+    Example:
+        >>> cache = RetrievalCache("retrieval_cache.sqlite")
+        >>> source, content = retrieve("aspirin", cache=cache)
+        >>> print(cache.stats())
+    """
+
+    def __init__(self,
+                 path: str,
+                 ttl: Optional[Dict[str, Optional[float]]] = None,
+                 timeout: float = 30.0) -> None:
+        self.path = os.fspath(path)
+        self.ttl = dict(DEFAULT_TTL if ttl is None else ttl)
+        self.timeout = timeout
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.writes = 0
+        self.revalidated = 0
+        self._local = threading.local()
+        self._stats_lock = threading.Lock()
+
+        connection = self._connection()
+        with connection:
+            connection.execute("CREATE TABLE IF NOT EXISTS retrievals ("
+                               "source TEXT NOT NULL, "
+                               "name TEXT NOT NULL, "
+                               "params TEXT NOT NULL, "
+                               "content TEXT NOT NULL, "
+                               "created REAL NOT NULL, "
+                               "validator TEXT, "
+                               "title TEXT, "
+                               "PRIMARY KEY (source, name, params))")
+            columns = [row[1] for row in connection.execute("PRAGMA table_info(retrievals)")]
+            if "validator" not in columns:
+                connection.execute("ALTER TABLE retrievals ADD COLUMN validator TEXT")
+            if "title" not in columns:
+                connection.execute("ALTER TABLE retrievals ADD COLUMN title TEXT")
+        self._migrate(connection)
+
+    def _migrate(self, connection: sqlite3.Connection) -> None:
+        """
+        Rekey the entries of a cache file written before names were canonicalized.
+
+        Entries of a version 0 file are moved to the canonical key of their name, so they
+        stay reachable. When several entries share a canonical key, the most recent one
+        is kept.
+
+        Args:
+            connection (sqlite3.Connection): The connection of the current thread.
+        """
+        if connection.execute("PRAGMA user_version").fetchone()[0] >= RETRIEVAL_CACHE_VERSION:
+            return
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            # Another connection may have migrated the file while this one waited for the lock
+            if connection.execute("PRAGMA user_version").fetchone()[0] < RETRIEVAL_CACHE_VERSION:
+                rows = connection.execute("SELECT rowid, source, name, params, created FROM retrievals").fetchall()
+                for rowid, source, name, params, created in rows:
+                    key = canonical_name(name)
+                    if key == name:
+                        continue
+                    connection.execute("DELETE FROM retrievals "
+                                       "WHERE source = ? AND name = ? AND params = ? AND created < ?",
+                                       (source, key, params, created))
+                    connection.execute("UPDATE OR IGNORE retrievals SET name = ? WHERE rowid = ?", (key, rowid))
+                    connection.execute("DELETE FROM retrievals WHERE rowid = ? AND name = ?", (rowid, name))
+                connection.execute(f"PRAGMA user_version = {RETRIEVAL_CACHE_VERSION}")
+            connection.commit()
+        except BaseException:
+            connection.rollback()
+            raise
+
+    def _connection(self) -> sqlite3.Connection:
+        """
+        Get the SQLite connection of the current thread, opening it if needed.
+
+        Returns:
+            sqlite3.Connection: The connection of the current thread.
+        """
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=self.timeout)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+        return connection
+
+    def _count(self, counter: str) -> None:
+        with self._stats_lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def _is_fresh(self, source: str, created: float) -> bool:
+        ttl = self.ttl.get(source)
+        return ttl is None or time.time() - created <= ttl
+
+    def get(self, source: str, name: str, params: Optional[Dict[str, Any]] = None) -> Optional[str]:
+        """
+        Look up cached content.
+
+        Args:
+            source (str): The source of the content, e.g. "WIKIPEDIA" or "PUBMED".
+            name (str): The compound name; normalized before lookup.
+            params (Dict[str, Any], optional): The parameters the content was retrieved with.
+
+        Returns:
+            Optional[str]: The cached content, or None if it is missing or expired.
+        """
+        row = self._connection().execute(
+            "SELECT content, created FROM retrievals WHERE source = ? AND name = ? AND params = ?",
+            (source, normalize_name(name), _params_key(params))
+            ).fetchone()
+        if row is None:
+            self._count("misses")
+            return None
+        if not self._is_fresh(source, row[1]):
+            self._count("expired")
+            self._count("misses")
+            return None
+        self._count("hits")
+        return row[0]
+
+    def set(self, 
+            source: str, 
+            name: str, 
+            content: str, 
+            params: Optional[Dict[str, Any]] = None, 
+            validator: Optional[str] = None,
+            title: Optional[str] = None) -> None:
+        """
+        Store content in the cache, replacing any existing entry.
+
+        Args:
+            source (str): The source of the content, e.g. "WIKIPEDIA" or "PUBMED".
+            name (str): The compound name; normalized before storing.
+            content (str): The retrieved content.
+            params (Dict[str, Any], optional): The parameters the content was retrieved with.
+            validator (str, optional): Version identifier of the content, e.g. the Wikipedia
+                                       revision id, used to revalidate the entry once expired.
+            title (str, optional): The title the content was looked up under, used to look it
+                                   up again when revalidating. Defaults to None.
+        """
+        connection = self._connection()
+        with connection:
+            connection.execute("INSERT OR REPLACE INTO retrievals "
+                               "(source, name, params, content, created, validator, title) "
+                               "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                               (source, normalize_name(name), _params_key(params), content, time.time(),
+                                validator, title))
+        self._count("writes")
+
+    def get_stale(self, 
+                  source: str, 
+                  name: str, 
+                  params: Optional[Dict[str, Any]] = None) -> Optional[Tuple[str, Optional[str]]]:
+        """
+        Look up an entry regardless of its age, for revalidation.
+
+        Args:
+            source (str): The source of the content, e.g. "WIKIPEDIA" or "PUBMED".
+            name (str): The compound name; normalized before lookup.
+            params (Dict[str, Any], optional): The parameters the content was retrieved with.
+
+        Returns:
+            Optional[Tuple[str, Optional[str]]]: The (content, validator) of the entry, or None
+                                                 if there is no entry.
+        """
+        row = self._connection().execute(
+            "SELECT content, validator FROM retrievals WHERE source = ? AND name = ? AND params = ?",
+            (source, normalize_name(name), _params_key(params))
+            ).fetchone()
+        return None if row is None else (row[0], row[1])
+
+    def touch(self, source: str, name: str, params: Optional[Dict[str, Any]] = None) -> None:
+        """
+        Mark an entry as fresh again after its validator was confirmed to be current.
+
+        Args:
+            source (str): The source of the content, e.g. "WIKIPEDIA" or "PUBMED".
+            name (str): The compound name; normalized before lookup.
+            params (Dict[str, Any], optional): The parameters the content was retrieved with.
+        """
+        connection = self._connection()
+        with connection:
+            connection.execute("UPDATE retrievals SET created = ? WHERE source = ? AND name = ? AND params = ?",
+                               (time.time(), source, normalize_name(name), _params_key(params)))
+        self._count("revalidated")
+
+    def expired_entries(self, source: str) -> List[Tuple[str, Dict[str, Any], Optional[str], Optional[str]]]:
+        """
+        List the expired entries of a source.
+
+        Args:
+            source (str): The source, e.g. "WIKIPEDIA".
+
+        Returns:
+            List[Tuple[str, Dict[str, Any], Optional[str], Optional[str]]]: The normalized name,
+                parameters, validator and title of each expired entry.
+        """
+        ttl = self.ttl.get(source)
+        if ttl is None:
+            return []
+        rows = self._connection().execute(
+            "SELECT name, params, validator, title FROM retrievals WHERE source = ? AND created < ?",
+            (source, time.time() - ttl)
+            ).fetchall()
+        return [(name, json.loads(params), validator, title) for name, params, validator, title in rows]
+
+    def purge_expired(self) -> int:
+        """
+        Delete all expired entries.
+
+        Returns:
+            int: The number of entries deleted.
+        """
+        connection = self._connection()
+        deleted = 0
+        with connection:
+            for source, ttl in self.ttl.items():
+                if ttl is not None:
+                    deleted += connection.execute("DELETE FROM retrievals WHERE source = ? AND created < ?",
+                                                  (source, time.time() - ttl)).rowcount
+        return deleted
+
+    def clear(self) -> None:
+        """
+        Delete all entries.
+        """
+        connection = self._connection()
+        with connection:
+            connection.execute("DELETE FROM retrievals")
+
+    def stats(self) -> dict:
+        """
+        Get the cache statistics.
+
+        Returns:
+            dict: The number of stored entries, hits, misses, expired lookups, writes,
+                  revalidated entries and hit rate.
+        """
+        entries = self._connection().execute("SELECT COUNT(*) FROM retrievals").fetchone()[0]
+        with self._stats_lock:
+            lookups = self.hits + self.misses
+            return {"entries": entries,
+                    "hits": self.hits,
+                    "misses": self.misses,
+                    "expired": self.expired,
+                    "writes": self.writes,
+                    "revalidated": self.revalidated,
+                    "hit_rate": self.hits / lookups if lookups else 0.0
+                    }
+
+    def close(self) -> None:
+        """
+        Close the connection of the current thread.
+        """
+        connection = getattr(self._local, "connection", None)
+        if connection is not None:
+            connection.close()
+            self._local.connection = None
+
+
+class MemoryCache:
+    """
+    Bounded in-process LRU cache of retrieved texts, sized in bytes.
+
+    Capacity is measured as the memory taken by the cached strings rather than the
+    number of entries, so a few large Wikipedia articles and many short PubMed
+    abstracts share a predictable footprint. When adding an entry would exceed the
+    capacity, the least recently used entries are evicted. Entries larger than the
+    whole capacity are not stored. All operations are thread-safe.
+
+    A MemoryCache can sit in front of a RetrievalCache: lookups that miss in memory
+    fall through to the backing cache, and hits there are copied into memory.
+
+    Args:
+        max_bytes (int, optional): Maximum total size of cached content in bytes.
+                                   Defaults to 256 MiB.
+        backing (RetrievalCache, optional): Slower cache consulted on a miss and written
+                                            through on every store. Defaults to None.
+
+    Attributes:
+        max_bytes (int): The capacity in bytes.
+        size (int): The current size of cached content in bytes.
+        hits (int): Number of lookups answered from memory.
+        misses (int): Number of lookups not found in memory.
+        evictions (int): Number of entries evicted to make room.
+
+    Example:
+        >>> cache = MemoryCache(max_bytes=64 * 1024 * 1024)
+        >>> source, content = retrieve("aspirin", cache=cache)
+        >>> print(cache.stats())
+    """
+
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES, backing: Optional[RetrievalCache] = None) -> None:
+        if max_bytes < 1:
+            raise ValueError("max_bytes must be at least 1")
+
+        self.max_bytes = max_bytes
+        self.backing = backing
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: "OrderedDict[Tuple[str, str, str], str]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def get(self, source: str, name: str, params: Optional[Dict[str, Any]] = None) -> Optional[str]:
+        """
+        Look up cached content, marking it as most recently used.
+
+        Args:
+            source (str): The source of the content, e.g. "WIKIPEDIA" or "PUBMED".
+            name (str): The compound name; normalized before lookup.
+            params (Dict[str, Any], optional): The parameters the content was retrieved with.
+
+        Returns:
+            Optional[str]: The cached content, or None if it is not cached.
+        """
+        key = (source, normalize_name(name), _params_key(params))
+        with self._lock:
+            content = self._entries.get(key)
+            if content is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return content
+            self.misses += 1
+
+        if self.backing is not None:
+            content = self.backing.get(source, name, params)
+            if content is not None:
+                self._store(key, content)
+        return content
+
+    def set(self, 
+            source: str, 
+            name: str, 
+            content: str, 
+            params: Optional[Dict[str, Any]] = None, 
+            validator: Optional[str] = None,
+            title: Optional[str] = None) -> None:
+        """
+        Store content in the cache, evicting least recently used entries if needed.
+
+        Args:
+            source (str): The source of the content, e.g. "WIKIPEDIA" or "PUBMED".
+            name (str): The compound name; normalized before storing.
+            content (str): The retrieved content.
+            params (Dict[str, Any], optional): The parameters the content was retrieved with.
+            validator (str, optional): Version identifier of the content, passed on to the
+                                       backing cache.
+            title (str, optional): The title the content was looked up under, passed on to
+                                   the backing cache.
+        """
+        self._store((source, normalize_name(name), _params_key(params)), content)
+        if self.backing is None:
+            return
+        if validator is None:
+            self.backing.set(source, name, content, params)
+        else:
+            self.backing.set(source, name, content, params, validator=validator, title=title)
+
+    def get_stale(self, 
+                  source: str, 
+                  name: str, 
+                  params: Optional[Dict[str, Any]] = None) -> Optional[Tuple[str, Optional[str]]]:
+        """
+        Look up an expired entry of the backing cache for revalidation.
+
+        In-memory entries never expire, so only the backing cache can hold stale entries.
+
+        Args:
+            source (str): The source of the content, e.g. "WIKIPEDIA" or "PUBMED".
+            name (str): The compound name.
+            params (Dict[str, Any], optional): The parameters the content was retrieved with.
+
+        Returns:
+            Optional[Tuple[str, Optional[str]]]: The (content, validator) of the entry, or None.
+        """
+        if self.backing is None:
+            return None
+        return self.backing.get_stale(source, name, params)
+
+    def touch(self, source: str, name: str, params: Optional[Dict[str, Any]] = None) -> None:
+        """
+        Mark an entry of the backing cache as fresh again.
+
+        Args:
+            source (str): The source of the content, e.g. "WIKIPEDIA" or "PUBMED".
+            name (str): The compound name.
+            params (Dict[str, Any], optional): The parameters the content was retrieved with.
+        """
+        if self.backing is not None:
+            self.backing.touch(source, name, params)
+
+    def _store(self, key: Tuple[str, str, str], content: str) -> None:
+        """
+        Insert an entry under the lock and evict entries until the cache fits.
+
+        Args:
+            key (Tuple[str, str, str]): The (source, normalized name, params) key.
+            content (str): The content to store.
+        """
+        entry_size = sys.getsizeof(content)
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self.size -= sys.getsizeof(previous)
+            if entry_size > self.max_bytes:
+                return
+            while self.size + entry_size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.size -= sys.getsizeof(evicted)
+                self.evictions += 1
+            self._entries[key] = content
+            self.size += entry_size
+
+    def clear(self) -> None:
+        """
+        Delete all in-memory entries. The backing cache is left untouched.
+        """
+        with self._lock:
+            self._entries.clear()
+            self.size = 0
+
+    def stats(self) -> dict:
+        """
+        Get the cache statistics.
+
+        Returns:
+            dict: The number of entries, size and capacity in bytes, hits, misses,
+                  evictions and hit rate.
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {"entries": len(self._entries),
+                    "size": self.size,
+                    "max_bytes": self.max_bytes,
+                    "hits": self.hits,
+                    "misses": self.misses,
+                    "evictions": self.evictions,
+                    "hit_rate": self.hits / lookups if lookups else 0.0
+                    }
+
+
+#: Any cache accepted by the retrieval functions
+Cache = Union[RetrievalCache, MemoryCache]
+
+
+def request_key(request: Dict[str, Any]) -> str:
+    """
+    Get the stable key of a model request.
+
+    Args:
+        request (Dict[str, Any]): The keyword arguments of ``chat.completions.create``,
+                                  i.e. model, messages and sampling parameters.
+
+    Returns:
+        str: The SHA-256 hex digest of the request as sorted JSON.
+    """
+    encoded = json.dumps(request, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """
+    Persistent on-disk cache of raw model completions backed by SQLite.
+
+    Entries are keyed by ``request_key`` of the whole request (model, messages,
+    temperature, top_p and any other parameter), so changing any of them misses.
+    The raw completion is stored and post-processing happens after lookup, so
+    changing clean_output, allowed_categories or the spell checker keeps entries
+    valid. When max_entries or max_bytes is exceeded, the least recently used
+    entries are evicted. Like RetrievalCache, the database runs in WAL mode and
+    each thread uses its own connection.
+
+    Args:
+        path (str): Path of the SQLite database file. Created if it does not exist.
+        max_entries (int, optional): Maximum number of stored completions. Defaults to None (no limit).
+        max_bytes (int, optional): Maximum total size of stored completions in UTF-8 bytes.
+                                   Defaults to None (no limit).
+        ttl (float, optional): Seconds after which an entry expires. Defaults to None (never).
+        timeout (float, optional): Seconds to wait for a lock held by another writer.
+                                   Defaults to 30.
+
+    Attributes:
+        hits (int): Number of lookups answered from the cache.
+        misses (int): Number of lookups not found in the cache or expired.
+        writes (int): Number of completions stored.
+        evictions (int): Number of entries evicted to respect the size limits.
+
+    Raises:
+        ValueError: If a size limit is less than 1.
+
+    Example:
+        >>> chem = ChemSource(model_api_key="your_key", response_cache=ResponseCache("responses.sqlite"))
+        >>> chem.classify("aspirin", "pain relief")  # Later runs are answered from the file
+    """
+
+    def __init__(self,
+                 path: str,
+                 max_entries: Optional[int] = None,
+                 max_bytes: Optional[int] = None,
+                 ttl: Optional[float] = None,
+                 timeout: float = 30.0) -> None:
+        if (max_entries is not None and max_entries < 1) or (max_bytes is not None and max_bytes < 1):
+            raise ValueError("max_entries and max_bytes must be at least 1")
+
+        self.path = os.fspath(path)
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.timeout = timeout
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.evictions = 0
+        self._local = threading.local()
+        self._stats_lock = threading.Lock()
+
+        connection = self._connection()
+        with connection:
+            connection.execute("CREATE TABLE IF NOT EXISTS responses ("
+                               "key TEXT PRIMARY KEY, "
+                               "content TEXT NOT NULL, "
+                               "size INTEGER NOT NULL, "
+                               "created REAL NOT NULL, "
+                               "used REAL NOT NULL)")
+            connection.execute("CREATE INDEX IF NOT EXISTS responses_used ON responses (used)")
+
+    def _connection(self) -> sqlite3.Connection:
+        """
+        Get the SQLite connection of the current thread, opening it if needed.
+
+        Returns:
+            sqlite3.Connection: The connection of the current thread.
+        """
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=self.timeout)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+        return connection
+
+    def _count(self, counter: str, amount: int = 1) -> None:
+        with self._stats_lock:
+            setattr(self, counter, getattr(self, counter) + amount)
+
+    def get(self, request: Dict[str, Any]) -> Optional[str]:
+        """
+        Look up the completion of a request, marking it as most recently used.
+
+        Args:
+            request (Dict[str, Any]): The keyword arguments of ``chat.completions.create``.
+
+        Returns:
+            Optional[str]: The raw completion content, or None if it is not cached or expired.
+        """
+        key = request_key(request)
+        connection = self._connection()
+        row = connection.execute("SELECT content, created FROM responses WHERE key = ?", (key,)).fetchone()
+        if row is None or (self.ttl is not None and time.time() - row[1] > self.ttl):
+            self._count("misses")
+            return None
+        with connection:
+            connection.execute("UPDATE responses SET used = ? WHERE key = ?", (time.time(), key))
+        self._count("hits")
+        return row[0]
+
+    def set(self, request: Dict[str, Any], content: str) -> None:
+        """
+        Store the completion of a request, evicting least recently used entries if needed.
+
+        Completions larger than max_bytes are not stored.
+
+        Args:
+            request (Dict[str, Any]): The keyword arguments of ``chat.completions.create``.
+            content (str): The raw completion content.
+        """
+        size = len(content.encode("utf-8"))
+        if self.max_bytes is not None and size > self.max_bytes:
+            return
+        now = time.time()
+        connection = self._connection()
+        with connection:
+            connection.execute("INSERT OR REPLACE INTO responses (key, content, size, created, used) "
+                               "VALUES (?, ?, ?, ?, ?)",
+                               (request_key(request), content, size, now, now))
+            evicted = self._evict(connection)
+        self._count("writes")
+        if evicted:
+            self._count("evictions", evicted)
+
+    def _evict(self, connection: sqlite3.Connection) -> int:
+        """
+        Delete least recently used entries until the size limits are respected.
+
+        Args:
+            connection (sqlite3.Connection): The connection, inside a transaction.
+
+        Returns:
+            int: The number of entries deleted.
+        """
+        if self.max_entries is None and self.max_bytes is None:
+            return 0
+        entries, total = connection.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses").fetchone()
+        evicted = 0
+        while (self.max_entries is not None and entries > self.max_entries) or \
+              (self.max_bytes is not None and total > self.max_bytes):
+            key, size = connection.execute("SELECT key, size FROM responses ORDER BY used LIMIT 1").fetchone()
+            connection.execute("DELETE FROM responses WHERE key = ?", (key,))
+            entries -= 1
+            total -= size
+            evicted += 1
+        return evicted
+
+    def clear(self) -> None:
+        """
+        Delete all entries.
+        """
+        connection = self._connection()
+        with connection:
+            connection.execute("DELETE FROM responses")
+
+    def stats(self) -> dict:
+        """
+        Get the cache statistics.
+
+        Returns:
+            dict: The number of stored entries, their size in bytes, hits, misses, writes,
+                  evictions and hit rate.
+        """
+        entries, size = self._connection().execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses").fetchone()
+        with self._stats_lock:
+            lookups = self.hits + self.misses
+            return {"entries": entries,
+                    "size": size,
+                    "hits": self.hits,
+                    "misses": self.misses,
+                    "writes": self.writes,
+                    "evictions": self.evictions,
+                    "hit_rate": self.hits / lookups if lookups else 0.0
+                    }
+
+    def close(self) -> None:
+        """
+        Close the connection of the current thread.
+        """
+        connection = getattr(self._local, "connection", None)
+        if connection is not None:
+            connection.close()
+            self._local.connection = None
@@ -5,12 +5,29 @@ This module provides the main ChemSource class that combines configuration manag
 information retrieval, and AI-powered classification of chemical compounds.
 """
 
-from typing import Optional, List, Tuple, Union, Any
+from typing import Optional, List, Tuple, Union, Any, Dict, Iterable, Callable
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
+import os
 from .config import Config
 from .config import BASE_PROMPT
 
 from .classifier import classify as cls
+from .classifier import aclassify as acls
+from .classifier import classify_many as cls_many
+from .classifier import DEFAULT_BATCH_SIZE
 from .retriever import retrieve as ret
+from .retriever import aretrieve as aret
+from .retriever import PubMedQuery, DEFAULT_PUBMED_QUERY
+from .transport import Transport, AsyncTransport
+from .cache import Cache, ResponseCache
+from .offline import WikipediaDump, PubMedIndex
+from .resilience import RetryPolicy, CircuitBreaker
+from .coalesce import SingleFlight, AsyncSingleFlight
+from .adaptive import AdaptiveSourceOrder
+from .names import NameCanonicalizer, canonical_name
+from .clients import ClientPool, get_client_pool, model_base_url
+from .batch import write_batch, read_batch, BatchSubmitter, OpenAIBatchSubmitter
 
 from spellchecker import SpellChecker
 
@@ -41,6 +58,68 @@ class ChemSource(Config):
                                               Defaults to "EXPLANATION_COMPLETE".
         allowed_categories (List[str], optional): List of allowed categories for filtering. Defaults to None.
         custom_client (Any, optional): Custom OpenAI client instance. Defaults to None.
+        transport (Transport, optional): Pooled HTTP transport used for all retrieval requests,
+                                         e.g. Transport(). With a transport, Wikipedia content
+                                         is read from MediaWiki API extracts rather than through
+                                         the wikipedia package, and cached Wikipedia entries are
+                                         revalidated by revision id. Defaults to None (a new
+                                         connection per request).
+        async_transport (AsyncTransport, optional): Pooled asyncio HTTP transport used by the
+                                                    asynchronous methods. Defaults to a new
+                                                    AsyncTransport owned by this instance
+                                                    and closed by ``close`` or ``aclose``.
+        max_concurrency (int, optional): Maximum number of asynchronous lookups running at once.
+                                         Defaults to None (unbounded).
+        cache (Cache, optional): RetrievalCache or MemoryCache of retrieved texts consulted
+                                 before any network request. Defaults to None (no caching).
+        negative_cache (Cache, optional): Cache of known misses consulted before any network request,
+                                          usually a RetrievalCache with DEFAULT_NEGATIVE_TTL.
+                                          Defaults to None.
+        wikipedia_backend (WikipediaDump, optional): Offline backend answering Wikipedia lookups
+                                                     from a local dump. Defaults to None (live site).
+        pubmed_backend (PubMedIndex, optional): Offline backend answering PubMed title searches from
+                                                a local full-text index. Defaults to None (E-utilities).
+        retry_policy (RetryPolicy, optional): Policy retrying transient source failures with jittered
+                                              exponential backoff, e.g. RetryPolicy(). Defaults to
+                                              None (each source is tried once).
+        circuit_breakers (Dict[str, CircuitBreaker], optional): Circuit breaker per source, e.g.
+                                                                ``default_circuit_breakers()``.
+                                                                Defaults to None (sources are
+                                                                never skipped).
+        coalesce (bool, optional): Whether concurrent identical lookups and classifications
+                                   share one in-flight operation, so that duplicate names
+                                   processed by several threads or tasks at once cost a single
+                                   retrieval and model call. Defaults to True.
+        budget_retrieval (bool, optional): Whether to retrieve at most as much Wikipedia text as
+                                           the prompt can hold, as given by ``content_budget``,
+                                           instead of whole articles. Retrieved content is then
+                                           cut to the budget and cached under separate keys.
+                                           Less text is downloaded only with a transport and a
+                                           budget of at most 1200 characters. Defaults to False.
+        wikipedia_intro (bool, optional): Whether to retrieve only the lead section of Wikipedia
+                                          articles. Defaults to False.
+        pubmed_query (PubMedQuery, optional): Default PubMed search (retmax, paging, sort, field,
+                                              date range), overridable per call. Defaults to
+                                              DEFAULT_PUBMED_QUERY.
+        adaptive_order (AdaptiveSourceOrder, optional): Records the hit rate and latency of every
+                                                        source request and, once enough have been
+                                                        observed, tries the sources in the order
+                                                        expected to give useful content soonest
+                                                        instead of the priority order. Defaults to
+                                                        None (priority order).
+        synonyms (Dict[str, str], optional): Mapping of synonyms to the preferred names they are
+                                             looked up, cached and classified under, e.g.
+                                             {"acetylsalicylic acid": "aspirin"}. Names are
+                                             matched after canonicalization (see
+                                             ``canonical_name``). Defaults to None.
+        client_pool (ClientPool, optional): Pool of model clients reused across classification
+                                            calls. Defaults to the process-wide pool from
+                                            ``get_client_pool``.
+        response_cache (ResponseCache, optional): Persistent cache of raw model completions keyed
+                                                  by the full request, so repeated classifications
+                                                  with unchanged prompt, model, sampling parameters
+                                                  and information are not sent again. Defaults to
+                                                  None.
     
     Raises:
         ValueError: If clean_output is True but allowed_categories is None or empty.
@@ -53,6 +132,28 @@ class ChemSource(Config):
         explanation_separator (str): The delimiter for separating explanations.
         allowed_categories (List[str]): The allowed categories list.
         custom_client (Any): The custom client instance.
+        transport (Transport): The pooled HTTP transport reused across retrieval calls, if any.
+        async_transport (AsyncTransport): The pooled asyncio HTTP transport.
+        max_concurrency (int): The bound on concurrent asynchronous lookups.
+        cache (Cache): The retrieval cache, if any.
+        negative_cache (Cache): The cache of known misses, if any.
+        wikipedia_backend (WikipediaDump): The offline Wikipedia backend, if any.
+        pubmed_backend (PubMedIndex): The offline PubMed backend, if any.
+        retry_policy (RetryPolicy): The retry policy for source failures, if any.
+        circuit_breakers (Dict[str, CircuitBreaker]): The circuit breaker of each source, if any.
+        single_flight (SingleFlight): The group coalescing concurrent calls from threads, if enabled.
+        async_single_flight (AsyncSingleFlight): The group coalescing concurrent asynchronous
+                                                 lookups, if enabled.
+        budget_retrieval (bool): Whether retrieval is limited to the content budget.
+        wikipedia_intro (bool): Whether only the lead section of Wikipedia articles is retrieved.
+        pubmed_query (PubMedQuery): The default PubMed search.
+        adaptive_order (AdaptiveSourceOrder): The adaptive source order, if any; its ``stats``
+                                              and ``explain`` show why sources were reordered.
+        canonicalizer (NameCanonicalizer): The canonicalizer of compound names.
+        client_pool (ClientPool): The pool of model clients.
+        response_cache (ResponseCache): The cache of model completions, if any.
+        batch_names (Dict[str, List[str]]): The names as given of each request written by
+                                            ``export_batch``, keyed by custom_id.
     
     Example:
         >>> chem = ChemSource(model_api_key="your_key")
@@ -81,7 +182,24 @@ class ChemSource(Config):
                  explanation_separator: str = "EXPLANATION_COMPLETE",
                  output_explanation: bool = False,
                  allowed_categories: Optional[List[str]] = None,
-                 custom_client: Optional[Any] = None) -> None:
+                 custom_client: Optional[Any] = None,
+                 transport: Optional[Transport] = None,
+                 async_transport: Optional[AsyncTransport] = None,
+                 max_concurrency: Optional[int] = None,
+                 cache: Optional[Cache] = None,
+                 negative_cache: Optional[Cache] = None,
+                 wikipedia_backend: Optional[WikipediaDump] = None,
+                 pubmed_backend: Optional[PubMedIndex] = None,
+                 retry_policy: Optional[RetryPolicy] = None,
+                 circuit_breakers: Optional[Dict[str, CircuitBreaker]] = None,
+                 coalesce: bool = True,
+                 budget_retrieval: bool = False,
+                 wikipedia_intro: bool = False,
+                 pubmed_query: Optional[PubMedQuery] = None,
+                 adaptive_order: Optional[AdaptiveSourceOrder] = None,
+                 synonyms: Optional[Dict[str, str]] = None,
+                 client_pool: Optional[ClientPool] = None,
+                 response_cache: Optional[ResponseCache] = None) -> None:
         super().__init__(model_api_key=model_api_key, 
                          model=model, 
                          ncbi_key=ncbi_key,
@@ -115,8 +233,30 @@ class ChemSource(Config):
         self.clean_output = clean_output
         self.allowed_categories = allowed_categories
         self.custom_client = custom_client
+        self.transport = transport
+        self.async_transport = async_transport if async_transport is not None else AsyncTransport()
+        self._owns_async_transport = async_transport is None
+        self.max_concurrency = max_concurrency
+        self.cache = cache
+        self.negative_cache = negative_cache
+        self.wikipedia_backend = wikipedia_backend
+        self.pubmed_backend = pubmed_backend
+        self.retry_policy = retry_policy
+        self.circuit_breakers = circuit_breakers
+        self.single_flight = SingleFlight() if coalesce else None
+        self.async_single_flight = AsyncSingleFlight() if coalesce else None
+        self.budget_retrieval = budget_retrieval
+        self.wikipedia_intro = wikipedia_intro
+        self.pubmed_query = pubmed_query if pubmed_query is not None else DEFAULT_PUBMED_QUERY
+        self.adaptive_order = adaptive_order
+        self.canonicalizer = NameCanonicalizer(synonyms)
+        self.client_pool = client_pool if client_pool is not None else get_client_pool()
+        self.response_cache = response_cache
+        self.batch_names: Dict[str, List[str]] = {}
+        self._semaphore = None
+        self._semaphore_loop = None
     
-    def chemsource(self, name: str, priority: str = "WIKIPEDIA", single_source: bool = False) -> Union[Tuple[Tuple[Optional[str], Optional[str]], Optional[str]], Tuple[Tuple[Optional[str], Optional[str]], Optional[str], Optional[str]]]:
+    def chemsource(self, name: str, priority: str = "WIKIPEDIA", single_source: bool = False, hedge_delay: Optional[float] = None, pubmed_query: Optional[PubMedQuery] = None) -> Union[Tuple[Tuple[Optional[str], Optional[str]], Optional[str]], Tuple[Tuple[Optional[str], Optional[str]], Optional[str], Optional[str]]]:
         """
         Retrieve information and classify a chemical compound.
         
@@ -129,6 +269,11 @@ class ChemSource(Config):
             priority (str, optional): Priority source for information retrieval. 
                                     Options: "WIKIPEDIA", "PUBMED". Defaults to "WIKIPEDIA".
             single_source (bool, optional): Whether to use only the priority source. Defaults to False.
+            hedge_delay (float, optional): Seconds after which the secondary source is queried
+                                           alongside a still-pending priority source. Defaults to
+                                           None (the secondary source is only queried on failure).
+            pubmed_query (PubMedQuery, optional): PubMed search for this call only. Defaults to
+                                                  the instance's pubmed_query.
         
         Returns:
             Union[Tuple[Tuple[Optional[str], Optional[str]], Optional[str]], 
@@ -158,30 +303,139 @@ class ChemSource(Config):
         if self.model_api_key is None and self.custom_client is None:
             raise ValueError("Either model_api_key or custom_client must be provided")
 
+        name = self.canonicalizer.query(name)
         information = ret(name, 
                          priority,
                          single_source, 
-                         ncbikey=self.ncbi_key
+                         ncbikey=self.ncbi_key,
+                         transport=self.transport,
+                         hedge_delay=hedge_delay,
+                         cache=self.cache,
+                         negative_cache=self.negative_cache,
+                         wikipedia_backend=self.wikipedia_backend,
+                         pubmed_backend=self.pubmed_backend,
+                         retry_policy=self.retry_policy,
+                         circuit_breakers=self.circuit_breakers,
+                         single_flight=self.single_flight,
+                         max_chars=self.content_budget(),
+                         wikipedia_intro=self.wikipedia_intro,
+                         pubmed_query=pubmed_query if pubmed_query is not None else self.pubmed_query,
+                         source_order=self.adaptive_order
                          )
         
         if information[1] == "":
             return (None, None), None
         
-        return information, cls(name, 
-                                information,
-                                self.model_api_key,
-                                self.prompt,
-                                self.model,
-                                self.temperature,
-                                self.top_p,
-                                self.max_tokens,
-                                self.clean_output,
-                                self.explanation,
-                                self.explanation_separator,
-                                self.output_explanation,
-                                self.allowed_categories,
-                                self.custom_client,
-                                self.spell_checker)
+        return information, self._classify(name, information)
+
+    def chemsource_many(self, names: Iterable[str], priority: str = "WIKIPEDIA", single_source: bool = False, hedge_delay: Optional[float] = None, pubmed_query: Optional[PubMedQuery] = None, max_workers: Optional[int] = None, batch_classify: bool = False, max_batch_size: int = DEFAULT_BATCH_SIZE) -> Dict[str, Any]:
+        """
+        Retrieve information and classify many chemical compounds.
+        
+        Names are grouped by canonical key after resolving synonyms, so "Aspirin",
+        "aspirin " and "ASPIRIN" cost one retrieval and one model call. Distinct
+        compounds are processed in parallel threads. With batch_classify, information
+        is retrieved first and the compounds are then classified several per model
+        request with ``classify_many``.
+        
+        Args:
+            names (Iterable[str]): The names of the chemical compounds to process.
+            priority (str, optional): Priority source for information retrieval. 
+                                    Options: "WIKIPEDIA", "PUBMED". Defaults to "WIKIPEDIA".
+            single_source (bool, optional): Whether to use only the priority source. Defaults to False.
+            hedge_delay (float, optional): Seconds after which the secondary source is queried
+                                           alongside a still-pending priority source. Defaults to None.
+            pubmed_query (PubMedQuery, optional): PubMed search for these calls only. Defaults to
+                                                  the instance's pubmed_query.
+            max_workers (int, optional): Maximum number of compounds processed at once. Defaults
+                                         to max_concurrency, or the executor default if unset.
+            batch_classify (bool, optional): Whether to classify several compounds per model
+                                             request. Defaults to False.
+            max_batch_size (int, optional): Maximum number of compounds per model request when
+                                            batch_classify is set. Defaults to 10.
+        
+        Returns:
+            Dict[str, Any]: A dictionary mapping every name as given to the result
+                            ``chemsource`` returns for it.
+        
+        Raises:
+            ValueError: If neither model_api_key nor custom_client is provided.
+        
+        Example:
+            >>> chem = ChemSource(model_api_key="your_key", synonyms={"acetylsalicylic acid": "aspirin"})
+            >>> results = chem.chemsource_many(["Aspirin", "acetylsalicylic acid", "caffeine"])
+            >>> info, classification = results["acetylsalicylic acid"]
+        """
+        if self.model_api_key is None and self.custom_client is None:
+            raise ValueError("Either model_api_key or custom_client must be provided")
+        
+        if not batch_classify:
+            return self._map_unique(self.chemsource, names, max_workers, priority, single_source, hedge_delay, pubmed_query)
+
+        information = self.retrieve_many(names, priority, single_source, hedge_delay, pubmed_query, max_workers)
+        found = {name: info for name, info in information.items() if info[1] != ""}
+        classifications = self.classify_many(found, max_batch_size)
+        return {name: (info, classifications[name]) if name in found else ((None, None), None)
+                for name, info in information.items()}
+
+    async def achemsource(self, name: str, priority: str = "WIKIPEDIA", single_source: bool = False, hedge_delay: Optional[float] = None, pubmed_query: Optional[PubMedQuery] = None) -> Union[Tuple[Tuple[Optional[str], Optional[str]], Optional[str]], Tuple[Tuple[Optional[str], Optional[str]], Optional[str], Optional[str]]]:
+        """
+        Retrieve information and classify a chemical compound without blocking.
+        
+        This is the asyncio counterpart of ``chemsource`` and returns the same result.
+        Retrieval and classification each hold the ``max_concurrency`` semaphore while
+        they run, so one event loop can keep many compounds in flight.
+        
+        Args:
+            name (str): The name of the chemical compound to process.
+            priority (str, optional): Priority source for information retrieval. 
+                                    Options: "WIKIPEDIA", "PUBMED". Defaults to "WIKIPEDIA".
+            single_source (bool, optional): Whether to use only the priority source. Defaults to False.
+            hedge_delay (float, optional): Seconds after which the secondary source is queried
+                                           alongside a still-pending priority source. Defaults to None.
+            pubmed_query (PubMedQuery, optional): PubMed search for this call only. Defaults to
+                                                  the instance's pubmed_query.
+        
+        Returns:
+            Union[Tuple[Tuple[Optional[str], Optional[str]], Optional[str]], 
+                  Tuple[Tuple[Optional[str], Optional[str]], Optional[str], Optional[str]]]: 
+                The same result as ``chemsource``.
+        
+        Raises:
+            ValueError: If neither model_api_key nor custom_client is provided.
+            
+        Example:
+            >>> chem = ChemSource(model_api_key="your_key", max_concurrency=100)
+            >>> results = await asyncio.gather(*(chem.achemsource(name) for name in names))
+        """
+        if self.model_api_key is None and self.custom_client is None:
+            raise ValueError("Either model_api_key or custom_client must be provided")
+
+        name = self.canonicalizer.query(name)
+        information = await aret(name, 
+                                 priority,
+                                 single_source, 
+                                 ncbikey=self.ncbi_key,
+                                 transport=self.async_transport,
+                                 semaphore=self._get_semaphore(),
+                                 hedge_delay=hedge_delay,
+                                 cache=self.cache,
+                                 negative_cache=self.negative_cache,
+                                 wikipedia_backend=self.wikipedia_backend,
+                                 pubmed_backend=self.pubmed_backend,
+                                 retry_policy=self.retry_policy,
+                                 circuit_breakers=self.circuit_breakers,
+                                 single_flight=self.async_single_flight,
+                                 max_chars=self.content_budget(),
+                                 wikipedia_intro=self.wikipedia_intro,
+                                 pubmed_query=pubmed_query if pubmed_query is not None else self.pubmed_query,
+                                 source_order=self.adaptive_order
+                                 )
+        
+        if information[1] == "":
+            return (None, None), None
+        
+        return information, await self._aclassify(name, information)
 
     def classify(self, name: str, information: str) -> Optional[Union[str, List[str]]]:
         """
@@ -215,23 +469,264 @@ class ChemSource(Config):
         if information == "":
             return None
         
-        return cls(name, 
-                   information,
-                   self.model_api_key,
-                   self.prompt,
-                   self.model,
-                   self.temperature,
-                   self.top_p,
-                   self.max_tokens,
-                   self.clean_output,
-                   self.explanation,
-                   self.explanation_separator,
-                   self.output_explanation,
-                   self.allowed_categories,
-                   self.custom_client,
-                   self.spell_checker)
+        return self._classify(self.canonicalizer.query(name), information)
+    
+    def _classify(self, name: str, information: Union[str, Tuple[str, str]]) -> Optional[Union[str, List[str]]]:
+        """
+        Classify a compound, sharing the model call with concurrent identical requests.
+        
+        Args:
+            name (str): The name of the chemical compound to classify.
+            information (Union[str, Tuple[str, str]]): The information, or (source, content) tuple.
+        
+        Returns:
+            Optional[Union[str, List[str]]]: The classification result.
+        """
+        arguments = self._classify_arguments(name, information)
+        if self.single_flight is None:
+            return cls(*arguments)
+        key = ("CLASSIFY", self.model, self.prompt, canonical_name(name), information)
+        return self.single_flight.do(key, cls, *arguments)
+
+    def classify_many(self, information: Dict[str, Union[str, Tuple[str, str]]], max_batch_size: int = DEFAULT_BATCH_SIZE) -> Dict[str, Optional[Union[str, List[str]]]]:
+        """
+        Classify many chemical compounds, several per model request.
+        
+        Compounds are packed into as few requests as the max_tokens budget and
+        max_batch_size allow, and answers are parsed back into the results ``classify``
+        returns. Compounds whose answer cannot be parsed are classified one at a time.
+        Names with the same canonical key and information are classified once.
+        
+        Args:
+            information (Dict[str, Union[str, Tuple[str, str]]]): A dictionary mapping compound
+                                                                  names to their information.
+            max_batch_size (int, optional): Maximum number of compounds per model request.
+                                            Defaults to 10.
+        
+        Returns:
+            Dict[str, Optional[Union[str, List[str]]]]: A dictionary mapping every name as given to
+                                                        its classification result, or None if its
+                                                        information is empty.
+        
+        Raises:
+            ValueError: If neither model_api_key nor custom_client is provided.
+            
+        Example:
+            >>> chem = ChemSource(model_api_key="your_key")
+            >>> chem.classify_many({"aspirin": "pain relief medication", "caffeine": "stimulant in coffee"})
+            {'aspirin': 'MEDICAL', 'caffeine': 'FOOD, MEDICAL'}
+        """
+        if self.model_api_key is None and self.custom_client is None:
+            raise ValueError("Either model_api_key or custom_client must be provided")
+        
+        keys = {}
+        compounds = []
+        for name, info in information.items():
+            if info == "":
+                continue
+            key = (self.canonicalizer.key(name), info)
+            if key not in keys:
+                keys[key] = len(compounds)
+                compounds.append((self.canonicalizer.query(name), info))
+        
+        results = cls_many(compounds, *self._classify_arguments(None, None)[2:], max_batch_size=max_batch_size)
+        return {name: None if info == "" else results[keys[(self.canonicalizer.key(name), info)]]
+                for name, info in information.items()}
+
+    async def aclassify(self, name: str, information: str) -> Optional[Union[str, List[str]]]:
+        """
+        Classify a chemical compound based on provided information without blocking.
+        
+        This is the asyncio counterpart of ``classify`` and returns the same result. At
+        most ``max_concurrency`` asynchronous calls run at once when set.
+        
+        Args:
+            name (str): The name of the chemical compound to classify.
+            information (str): Information about the compound to use for classification.
+        
+        Returns:
+            Optional[Union[str, List[str]]]: Classification result, or None if information is empty.
+        
+        Raises:
+            ValueError: If neither model_api_key nor custom_client is provided.
+            
+        Example:
+            >>> chem = ChemSource(model_api_key="your_key", max_concurrency=100)
+            >>> results = await asyncio.gather(*(chem.aclassify(name, text) for name, text in compounds))
+        """
+        if self.model_api_key is None and self.custom_client is None:
+            raise ValueError("Either model_api_key or custom_client must be provided")
+        
+        if information == "":
+            return None
+        
+        return await self._aclassify(self.canonicalizer.query(name), information)
+
+    async def _aclassify(self, name: str, information: Union[str, Tuple[str, str]]) -> Optional[Union[str, List[str]]]:
+        """
+        Asyncio counterpart of ``_classify``.
+        """
+        arguments = self._classify_arguments(name, information)
+        semaphore = self._get_semaphore()
+        if self.async_single_flight is None:
+            return await acls(*arguments, semaphore=semaphore)
+        key = ("CLASSIFY", self.model, self.prompt, canonical_name(name), information)
+        return await self.async_single_flight.do(key, acls, *arguments, semaphore=semaphore)
+
+    def _classify_arguments(self, name: str, information: Union[str, Tuple[str, str]]) -> tuple:
+        """
+        Get the positional arguments of ``classify`` for a compound and the current settings.
+        """
+        return (name, 
+                information,
+                self.model_api_key,
+                self.prompt,
+                self.model,
+                self.temperature,
+                self.top_p,
+                self.max_tokens,
+                self.clean_output,
+                self.explanation,
+                self.explanation_separator,
+                self.output_explanation,
+                self.allowed_categories,
+                self.custom_client,
+                self.spell_checker,
+                self.client_pool,
+                self.response_cache)
     
-    def retrieve(self, name: str, priority: str = "WIKIPEDIA", single_source: bool = False) -> Tuple[str, str]:
+    def export_batch(self, information: Dict[str, Union[str, Tuple[str, str]]], path: Union[str, os.PathLike]) -> Dict[str, List[str]]:
+        """
+        Write a Batch API input file classifying many chemical compounds.
+        
+        Requests are built with the current prompt and model settings exactly as
+        ``classify`` builds them. Names are grouped by canonical key after resolving
+        synonyms, so "Aspirin" and "aspirin " share one request, whose custom_id is
+        the name looked up. Compounds with empty information are left out. The
+        returned mapping is also kept in ``batch_names`` for ``ingest_batch``.
+        
+        Args:
+            information (Dict[str, Union[str, Tuple[str, str]]]): A dictionary mapping compound
+                                                                  names to their information.
+            path (Union[str, os.PathLike]): Path of the JSONL file to write.
+        
+        Returns:
+            Dict[str, List[str]]: A dictionary mapping the custom_id of each request to the names
+                                  as given that it classifies.
+            
+        Example:
+            >>> chem = ChemSource(model_api_key="your_key")
+            >>> chem.export_batch(chem.retrieve_many(names), "job.jsonl")
+        """
+        names: Dict[str, List[str]] = {}
+        custom_ids: Dict[str, str] = {}
+        compounds = []
+        for name, info in information.items():
+            if info == "":
+                continue
+            key = self.canonicalizer.key(name)
+            if key not in custom_ids:
+                custom_ids[key] = self.canonicalizer.query(name)
+                names[custom_ids[key]] = []
+                compounds.append((custom_ids[key], info))
+            names[custom_ids[key]].append(name)
+        
+        write_batch(path, compounds, self.prompt, self.model, self.temperature, self.top_p, self.max_tokens)
+        self.batch_names.update(names)
+        return names
+    
+    def ingest_batch(self, path: Union[str, os.PathLike], names: Optional[Dict[str, List[str]]] = None) -> Dict[str, Optional[Union[str, List[str]]]]:
+        """
+        Read the classification results of a Batch API output file.
+        
+        Responses are post-processed with the current clean_output, explanation,
+        allowed_categories and spell_checker settings, as ``classify`` does. Failed
+        requests and unusable responses give None. Each result is reported under
+        every name its request was exported for.
+        
+        Args:
+            path (Union[str, os.PathLike]): Path of the JSONL output file.
+            names (Dict[str, List[str]], optional): The mapping returned by ``export_batch``, e.g.
+                                                    when ingesting in another process. Defaults
+                                                    to ``batch_names``.
+        
+        Returns:
+            Dict[str, Optional[Union[str, List[str]]]]: A dictionary mapping each exported name
+                                                        to its classification result.
+            
+        Example:
+            >>> results = chem.ingest_batch("job_output.jsonl")
+            >>> print(results["aspirin"])
+        """
+        if names is None:
+            names = self.batch_names
+        results = read_batch(path, 
+                             self.clean_output, 
+                             self.explanation, 
+                             self.explanation_separator, 
+                             self.output_explanation, 
+                             self.allowed_categories, 
+                             self.spell_checker)
+        return {name: result
+                for custom_id, result in results.items()
+                for name in names.get(custom_id, [custom_id])}
+    
+    def submit_batch(self, path: Union[str, os.PathLike], submitter: Optional[BatchSubmitter] = None) -> str:
+        """
+        Submit a Batch API input file written by ``export_batch``.
+        
+        Args:
+            path (Union[str, os.PathLike]): Path of the JSONL input file.
+            submitter (BatchSubmitter, optional): Service running the batch. Defaults to the
+                                                  OpenAI Batch API with model_api_key.
+        
+        Returns:
+            str: The ID of the batch.
+        
+        Raises:
+            ValueError: If no submitter is given and model_api_key is not provided.
+        """
+        return self._batch_submitter(submitter).submit(path)
+    
+    def download_batch(self, batch_id: str, path: Union[str, os.PathLike], submitter: Optional[BatchSubmitter] = None) -> bool:
+        """
+        Download the output file of a batch if it has completed.
+        
+        Args:
+            batch_id (str): The ID returned by ``submit_batch``.
+            path (Union[str, os.PathLike]): Path of the JSONL output file to write.
+            submitter (BatchSubmitter, optional): Service running the batch. Defaults to the
+                                                  OpenAI Batch API with model_api_key.
+        
+        Returns:
+            bool: True if the output was written, False if the batch has not completed yet.
+        
+        Raises:
+            ValueError: If no submitter is given and model_api_key is not provided.
+            BatchIncompleteError: If the batch failed, expired or was cancelled.
+            
+        Example:
+            >>> batch_id = chem.submit_batch("job.jsonl")
+            >>> if chem.download_batch(batch_id, "job_output.jsonl"):
+            ...     results = chem.ingest_batch("job_output.jsonl")
+        """
+        submitter = self._batch_submitter(submitter)
+        if submitter.status(batch_id) in ("validating", "in_progress", "finalizing"):
+            return False
+        submitter.download(batch_id, path)
+        return True
+    
+    def _batch_submitter(self, submitter: Optional[BatchSubmitter]) -> BatchSubmitter:
+        """
+        Get the given submitter, or one for the OpenAI Batch API.
+        """
+        if submitter is not None:
+            return submitter
+        if self.model_api_key is None:
+            raise ValueError("model_api_key must be provided to submit batches to the OpenAI API")
+        return OpenAIBatchSubmitter(self.client_pool.get(self.model_api_key, model_base_url(self.model)))
+    
+    def retrieve(self, name: str, priority: str = "WIKIPEDIA", single_source: bool = False, hedge_delay: Optional[float] = None, pubmed_query: Optional[PubMedQuery] = None) -> Tuple[str, str]:
         """
         Retrieve information about a chemical compound from various sources.
         
@@ -243,6 +738,11 @@ class ChemSource(Config):
             priority (str, optional): Priority source for information retrieval. 
                                     Options: "WIKIPEDIA", "PUBMED". Defaults to "WIKIPEDIA".
             single_source (bool, optional): Whether to use only the priority source. Defaults to False.
+            hedge_delay (float, optional): Seconds after which the secondary source is queried
+                                           alongside a still-pending priority source. Defaults to
+                                           None (the secondary source is only queried on failure).
+            pubmed_query (PubMedQuery, optional): PubMed search for this call only. Defaults to
+                                                  the instance's pubmed_query.
         
         Returns:
             Tuple[str, str]: A tuple containing (source, content).
@@ -252,8 +752,211 @@ class ChemSource(Config):
             >>> source, content = chem.retrieve("aspirin")
             >>> print(f"Retrieved from {source}: {content[:100]}...")
         """
-        return ret(name, 
+        return ret(self.canonicalizer.query(name), 
                    priority, 
                    single_source,
-                   ncbikey=self.ncbi_key
-                   )
\ No newline at end of file
+                   ncbikey=self.ncbi_key,
+                   transport=self.transport,
+                   hedge_delay=hedge_delay,
+                   cache=self.cache,
+                   negative_cache=self.negative_cache,
+                   wikipedia_backend=self.wikipedia_backend,
+                   pubmed_backend=self.pubmed_backend,
+                   retry_policy=self.retry_policy,
+                   circuit_breakers=self.circuit_breakers,
+                   single_flight=self.single_flight,
+                   max_chars=self.content_budget(),
+                   wikipedia_intro=self.wikipedia_intro,
+                   pubmed_query=pubmed_query if pubmed_query is not None else self.pubmed_query,
+                   source_order=self.adaptive_order
+                   )
+
+    def retrieve_many(self, names: Iterable[str], priority: str = "WIKIPEDIA", single_source: bool = False, hedge_delay: Optional[float] = None, pubmed_query: Optional[PubMedQuery] = None, max_workers: Optional[int] = None) -> Dict[str, Tuple[str, str]]:
+        """
+        Retrieve information about many chemical compounds.
+        
+        Names with the same canonical key after resolving synonyms are retrieved once.
+        Distinct compounds are retrieved in parallel threads.
+        
+        Args:
+            names (Iterable[str]): The names of the chemical compounds to look up.
+            priority (str, optional): Priority source for information retrieval. 
+                                    Options: "WIKIPEDIA", "PUBMED". Defaults to "WIKIPEDIA".
+            single_source (bool, optional): Whether to use only the priority source. Defaults to False.
+            hedge_delay (float, optional): Seconds after which the secondary source is queried
+                                           alongside a still-pending priority source. Defaults to None.
+            pubmed_query (PubMedQuery, optional): PubMed search for these calls only. Defaults to
+                                                  the instance's pubmed_query.
+            max_workers (int, optional): Maximum number of compounds retrieved at once. Defaults
+                                         to max_concurrency, or the executor default if unset.
+        
+        Returns:
+            Dict[str, Tuple[str, str]]: A dictionary mapping every name as given to its
+                                        (source, content) tuple.
+        
+        Example:
+            >>> chem = ChemSource()
+            >>> results = chem.retrieve_many(["Aspirin", "aspirin", "caffeine"])
+        """
+        return self._map_unique(self.retrieve, names, max_workers, priority, single_source, hedge_delay, pubmed_query)
+
+    async def aretrieve(self, name: str, priority: str = "WIKIPEDIA", single_source: bool = False, hedge_delay: Optional[float] = None, pubmed_query: Optional[PubMedQuery] = None) -> Tuple[str, str]:
+        """
+        Retrieve information about a chemical compound without blocking.
+        
+        This is the asyncio counterpart of ``retrieve``. Lookups share the instance's
+        AsyncTransport, and at most ``max_concurrency`` of them run at once when set.
+        
+        Args:
+            name (str): The name of the chemical compound to look up.
+            priority (str, optional): Priority source for information retrieval. 
+                                    Options: "WIKIPEDIA", "PUBMED". Defaults to "WIKIPEDIA".
+            single_source (bool, optional): Whether to use only the priority source. Defaults to False.
+            hedge_delay (float, optional): Seconds after which the secondary source is queried
+                                           alongside a still-pending priority source. Defaults to
+                                           None (the secondary source is only queried on failure).
+            pubmed_query (PubMedQuery, optional): PubMed search for this call only. Defaults to
+                                                  the instance's pubmed_query.
+        
+        Returns:
+            Tuple[str, str]: A tuple containing (source, content).
+            
+        Example:
+            >>> chem = ChemSource(max_concurrency=100)
+            >>> results = await asyncio.gather(*(chem.aretrieve(name) for name in names))
+        """
+        return await aret(self.canonicalizer.query(name), 
+                          priority, 
+                          single_source,
+                          ncbikey=self.ncbi_key,
+                          transport=self.async_transport,
+                          semaphore=self._get_semaphore(),
+                          hedge_delay=hedge_delay,
+                          cache=self.cache,
+                          negative_cache=self.negative_cache,
+                          wikipedia_backend=self.wikipedia_backend,
+                          pubmed_backend=self.pubmed_backend,
+                          retry_policy=self.retry_policy,
+                          circuit_breakers=self.circuit_breakers,
+                          single_flight=self.async_single_flight,
+                          max_chars=self.content_budget(),
+                          wikipedia_intro=self.wikipedia_intro,
+                          pubmed_query=pubmed_query if pubmed_query is not None else self.pubmed_query,
+                          source_order=self.adaptive_order
+                          )
+
+    def content_budget(self) -> Optional[int]:
+        """
+        Get the number of characters of retrieved content the classification prompt can hold.
+        
+        The prompt is cut to ``max_tokens`` characters, of which the prompt template takes
+        its own length, so any content beyond the rest would never reach the model.
+        
+        Returns:
+            Optional[int]: The content budget in characters (at least 1), or None if
+                           budget_retrieval is disabled.
+        
+        Example:
+            >>> ChemSource(max_tokens=4000, budget_retrieval=True).content_budget()
+            2517
+        """
+        if not self.budget_retrieval:
+            return None
+        return max(1, self.max_tokens - len(self.prompt.replace("COMPOUND_NAME", "")))
+    
+    def breaker_stats(self) -> Dict[str, dict]:
+        """
+        Get the state of the circuit breaker of each source.
+        
+        Returns:
+            Dict[str, dict]: A dictionary mapping each source to its breaker statistics,
+                             including its state ("CLOSED", "OPEN" or "HALF_OPEN"). Empty
+                             if circuit_breakers is not set.
+        
+        Example:
+            >>> chem = ChemSource(circuit_breakers=default_circuit_breakers())
+            >>> chem.breaker_stats()["PUBMED"]["state"]
+            'CLOSED'
+        """
+        if self.circuit_breakers is None:
+            return {}
+        return {source: breaker.stats() for source, breaker in self.circuit_breakers.items()}
+    
+    def close(self) -> None:
+        """
+        Close the asynchronous HTTP transport created by this instance and its connections.
+        
+        Transports passed in by the caller are left open for the caller to close.
+        Inside an event loop that used the asynchronous methods, use ``aclose`` instead.
+        
+        Raises:
+            RuntimeError: If called from an event loop with open asynchronous connections.
+        
+        Example:
+            >>> with ChemSource(model_api_key="your_key") as chem:
+            ...     info, classification = chem.chemsource("aspirin")
+        """
+        if self._owns_async_transport:
+            self.async_transport.close()
+    
+    async def aclose(self) -> None:
+        """
+        Close the asynchronous HTTP transport created by this instance, from inside an event loop.
+        
+        Example:
+            >>> async with ChemSource(model_api_key="your_key") as chem:
+            ...     info, classification = await chem.achemsource("aspirin")
+        """
+        if self._owns_async_transport:
+            await self.async_transport.aclose()
+    
+    def __enter__(self) -> "ChemSource":
+        return self
+    
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+    
+    async def __aenter__(self) -> "ChemSource":
+        return self
+    
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self.aclose()
+    
+    def _map_unique(self, func: Callable[..., Any], names: Iterable[str], max_workers: Optional[int], *args: Any) -> Dict[str, Any]:
+        """
+        Call a function once per canonical key and report the results under the given names.
+        
+        Args:
+            func (Callable[..., Any]): Function taking a name and args.
+            names (Iterable[str]): The names as given.
+            max_workers (int, optional): Maximum number of calls running at once.
+            *args: Further positional arguments for func.
+        
+        Returns:
+            Dict[str, Any]: A dictionary mapping every name as given to the result for its key.
+        """
+        names = list(names)
+        keys = [self.canonicalizer.key(name) for name in names]
+        if max_workers is None:
+            max_workers = self.max_concurrency
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {}
+            for name, key in zip(names, keys):
+                if key not in futures:
+                    futures[key] = executor.submit(func, name, *args)
+            return {name: futures[key].result() for name, key in zip(names, keys)}
+    
+    def _get_semaphore(self) -> Optional[asyncio.Semaphore]:
+        """
+        Get the semaphore bounding concurrent asynchronous calls for the running event loop.
+        
+        Returns:
+            Optional[asyncio.Semaphore]: The semaphore, or None if max_concurrency is not set.
+        """
+        if self.max_concurrency is None:
+            return None
+        loop = asyncio.get_running_loop()
+        if self._semaphore is None or self._semaphore_loop is not loop:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._semaphore_loop = loop
+        return self._semaphore
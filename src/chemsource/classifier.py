@@ -5,9 +5,20 @@ This module provides AI-powered classification functionality for chemical
 entities and compounds.
 """
 
-from typing import Optional, List, Union, Any
-from openai import OpenAI
+from typing import Optional, List, Union, Any, Tuple, Dict, Iterator
+from contextlib import AsyncExitStack
+import asyncio
+import functools
+import inspect
+import json
+from openai import OpenAI, AsyncOpenAI
 from spellchecker import SpellChecker
+from .clients import ClientPool, DEEPSEEK_BASE_URL, model_base_url
+from .config import BATCH_COMPOUND_NAME, BATCH_INSTRUCTIONS
+from .cache import ResponseCache
+
+#: Default maximum number of compounds classified in one request by classify_many
+DEFAULT_BATCH_SIZE = 10
 
 
 def classify(name: str,
@@ -24,7 +35,9 @@ def classify(name: str,
              output_explanation: bool = False,
              allowed_categories: Optional[List[str]] = None,
              custom_client: Optional[Any] = None,
-             spell_checker: Optional[SpellChecker] = None) -> Union[str, List[str]]:
+             spell_checker: Optional[SpellChecker] = None,
+             client_pool: Optional[ClientPool] = None,
+             response_cache: Optional[ResponseCache] = None) -> Union[str, List[str]]:
     """
     Classify a chemical compound using an AI language model.
     
@@ -56,6 +69,13 @@ def classify(name: str,
         allowed_categories (List[str], optional): List of allowed categories for filtering output.
         custom_client (Any, optional): Custom OpenAI client instance.
         spell_checker (SpellChecker, optional): Spell checker instance for output correction.
+        client_pool (ClientPool, optional): Pool providing a reused client for api_key and the
+                                            model's base URL. If None and no custom_client is
+                                            given, a new client is created for this call.
+        response_cache (ResponseCache, optional): Cache of raw completions keyed by the full request.
+                                                  A cached completion is post-processed like a new
+                                                  one, and only completions that post-process without
+                                                  error are stored. Defaults to None.
     
     Returns:
         Union[str, List[str], Tuple[List[str], str]]: 
@@ -93,42 +113,468 @@ def classify(name: str,
         >>> print(explanation)  # "Aspirin is widely used as a pain reliever..."
     """
     
-    if custom_client is not None:
-        client = custom_client
-    elif model == "deepseek-chat":
-        client = OpenAI(
-                        api_key=api_key,
-                        base_url="https://api.deepseek.com"
-                        )
+    check_options(clean_output, explanation, output_explanation, allowed_categories)
+    
+    request = classification_request(name, input_text, baseprompt, model, temperature, top_p, max_length,
+                                     custom_client)
+    cached = None if response_cache is None else response_cache.get(request)
+    if cached is None:
+        client = _client(api_key, model, custom_client, client_pool)
+        content = client.chat.completions.create(**request).choices[0].message.content
     else:
-        client = OpenAI(
-                        api_key=api_key
-                        )
+        content = cached
+    result = parse_response(content,
+                            clean_output,
+                            explanation,
+                            explanation_separator,
+                            output_explanation,
+                            allowed_categories,
+                            spell_checker)
+    if cached is None:
+        _cache_response(response_cache, request, content)
+    return result
+
 
+def classify_many(compounds: List[Tuple[str, Optional[str]]],
+                  api_key: Optional[str] = None, 
+                  baseprompt: Optional[str] = None,
+                  model: str = 'gpt-4o', 
+                  temperature: float = 0,
+                  top_p: float = 0,
+                  max_length: int = 250000,
+                  clean_output: bool = False,
+                  explanation: bool = False,
+                  explanation_separator: str = "EXPLANATION_COMPLETE",
+                  output_explanation: bool = False,
+                  allowed_categories: Optional[List[str]] = None,
+                  custom_client: Optional[Any] = None,
+                  spell_checker: Optional[SpellChecker] = None,
+                  client_pool: Optional[ClientPool] = None,
+                  response_cache: Optional[ResponseCache] = None,
+                  max_batch_size: int = DEFAULT_BATCH_SIZE) -> List[Union[str, List[str]]]:
+    """
+    Classify several chemical compounds with as few model requests as possible.
+    
+    Compounds are packed into requests that send the prompt instructions once,
+    followed by the numbered compounds and their information, and ask for a JSON
+    object with one answer per compound. A request holds as many compounds as fit
+    in max_length characters, up to max_batch_size. Each answer is turned into the
+    same result ``classify`` returns; compounds whose answer is missing or cannot be
+    parsed, and compounds too long to share a request, are classified with ``classify``.
+    
+    Args:
+        compounds (List[Tuple[str, Optional[str]]]): The (name, information) pairs to classify.
+        api_key (str, optional): API key for the language model service.
+        baseprompt (str, optional): Base prompt template for classification.
+        model (str, optional): Name of the language model to use. Defaults to 'gpt-4o'.
+        temperature (float, optional): Temperature parameter for model creativity. Defaults to 0.
+        top_p (float, optional): Top-p parameter for nucleus sampling. Defaults to 0.
+        max_length (int, optional): Maximum length of a prompt in characters. Defaults to 250000.
+        clean_output (bool, optional): Whether to clean and validate the output. Defaults to False.
+        explanation (bool, optional): Whether to expect and extract explanations from the model
+                                      response. Defaults to False.
+        explanation_separator (str, optional): The delimiter between explanation and classification.
+                                               Defaults to "EXPLANATION_COMPLETE".
+        output_explanation (bool, optional): Whether to return the explanation text alongside the
+                                             classification. Defaults to False.
+        allowed_categories (List[str], optional): List of allowed categories for filtering output.
+        custom_client (Any, optional): Custom OpenAI client instance.
+        spell_checker (SpellChecker, optional): Spell checker instance for output correction.
+        client_pool (ClientPool, optional): Pool providing a reused client. Defaults to None.
+        response_cache (ResponseCache, optional): Cache of raw completions, consulted before
+                                                  each request. Defaults to None.
+        max_batch_size (int, optional): Maximum number of compounds per request. Defaults to 10.
+    
+    Returns:
+        List[Union[str, List[str], Tuple[List[str], str]]]: The result of each compound, in order.
+    
+    Raises:
+        ValueError: If max_batch_size is less than 1, or for the same options ``classify`` rejects.
+        
+    Example:
+        >>> classify_many([("aspirin", "pain relief"), ("caffeine", "stimulant in coffee")],
+        ...               api_key="your_key", baseprompt=BASE_PROMPT)
+        ['MEDICAL', 'FOOD, MEDICAL']
+    """
+    if max_batch_size < 1:
+        raise ValueError("max_batch_size must be at least 1")
+    check_options(clean_output, explanation, output_explanation, allowed_categories)
+
+    options = (clean_output, explanation, explanation_separator, output_explanation, allowed_categories, spell_checker)
+    results: List[Any] = [None] * len(compounds)
+    single = []
+    client = None
+    for batch in _batches(compounds, baseprompt, max_length, max_batch_size):
+        if len(batch) == 1:
+            single.extend(batch)
+            continue
+        prompt = _batch_prompt(baseprompt, [compounds[index] for index in batch])
+        request = _completion_request(prompt, model, temperature, top_p, custom_client)
+        content = None if response_cache is None else response_cache.get(request)
+        if content is None:
+            if client is None:
+                client = _client(api_key, model, custom_client, client_pool)
+            content = client.chat.completions.create(**request).choices[0].message.content
+        answers = _parse_batch_response(content, len(batch))
+        if answers:
+            _cache_response(response_cache, request, content)
+        for number, index in enumerate(batch, 1):
+            if number in answers:
+                try:
+                    results[index] = parse_response(answers[number], *options)
+                    continue
+                except ValueError:
+                    pass
+            single.append(index)
+
+    for index in single:
+        name, input_text = compounds[index]
+        results[index] = classify(name, input_text, api_key, baseprompt, model, temperature, top_p, max_length,
+                                  clean_output, explanation, explanation_separator, output_explanation,
+                                  allowed_categories, custom_client, spell_checker, client_pool, response_cache)
+    return results
+
+
+async def aclassify(name: str,
+                    input_text: Optional[str] = None, 
+                    api_key: Optional[str] = None, 
+                    baseprompt: Optional[str] = None,
+                    model: str = 'gpt-4o', 
+                    temperature: float = 0,
+                    top_p: float = 0,
+                    max_length: int = 250000,
+                    clean_output: bool = False,
+                    explanation: bool = False,
+                    explanation_separator: str = "EXPLANATION_COMPLETE",
+                    output_explanation: bool = False,
+                    allowed_categories: Optional[List[str]] = None,
+                    custom_client: Optional[Any] = None,
+                    spell_checker: Optional[SpellChecker] = None,
+                    client_pool: Optional[ClientPool] = None,
+                    response_cache: Optional[ResponseCache] = None,
+                    semaphore: Optional[asyncio.Semaphore] = None) -> Union[str, List[str]]:
+    """
+    Classify a chemical compound using an AI language model without blocking.
+    
+    This coroutine is the asyncio counterpart of ``classify``: it sends the same
+    request and returns the same result (raw string, cleaned list, or (list,
+    explanation) tuple), so a single event loop can keep many model calls in
+    flight. Cancelling it cancels the underlying request.
+    
+    Args:
+        name (str): The name of the chemical compound to classify.
+        input_text (str, optional): Additional information about the compound.
+        api_key (str, optional): API key for the language model service.
+        baseprompt (str, optional): Base prompt template for classification.
+        model (str, optional): Name of the language model to use. Defaults to 'gpt-4o'.
+        temperature (float, optional): Temperature parameter for model creativity. Defaults to 0.
+        top_p (float, optional): Top-p parameter for nucleus sampling. Defaults to 0.
+        max_length (int, optional): Maximum length of the prompt in characters. Defaults to 250000.
+        clean_output (bool, optional): Whether to clean and validate the output. Defaults to False.
+        explanation (bool, optional): Whether to expect and extract explanations from the model
+                                      response. Defaults to False.
+        explanation_separator (str, optional): The delimiter between explanation and classification.
+                                               Defaults to "EXPLANATION_COMPLETE".
+        output_explanation (bool, optional): Whether to return the explanation text alongside the
+                                             classification. Defaults to False.
+        allowed_categories (List[str], optional): List of allowed categories for filtering output.
+        custom_client (Any, optional): Custom client instance. A synchronous OpenAI client is
+                                       called in the default executor, where cancellation cannot
+                                       stop a call already running. Other clients, such as
+                                       AsyncOpenAI, are called directly and their result is
+                                       awaited if it is awaitable.
+        spell_checker (SpellChecker, optional): Spell checker instance for output correction.
+        client_pool (ClientPool, optional): Pool providing a reused AsyncOpenAI client for the
+                                            running event loop. If None and no custom_client is
+                                            given, a new client is used for this call.
+        response_cache (ResponseCache, optional): Cache of raw completions, consulted before
+                                                  the request. Defaults to None.
+        semaphore (asyncio.Semaphore, optional): Semaphore held for the model call, bounding
+                                                 how many calls run concurrently.
+    
+    Returns:
+        Union[str, List[str], Tuple[List[str], str]]: The same result as ``classify``.
+    
+    Raises:
+        ValueError: If clean_output is True but allowed_categories is None, if
+                   output_explanation=True but explanation=False, or if the explanation
+                   separator is missing from the response.
+        
+    Example:
+        >>> results = await asyncio.gather(*(aclassify(name, text, api_key="your_key")
+        ...                                  for name, text in compounds))
+    """
+    check_options(clean_output, explanation, output_explanation, allowed_categories)
+    request = classification_request(name, input_text, baseprompt, model, temperature, top_p, max_length,
+                                     custom_client)
+    cached = None if response_cache is None else response_cache.get(request)
+    content = cached if cached is not None else await _acreate(request, api_key, model, custom_client,
+                                                               client_pool, semaphore)
+    result = parse_response(content,
+                            clean_output,
+                            explanation,
+                            explanation_separator,
+                            output_explanation,
+                            allowed_categories,
+                            spell_checker)
+    if cached is None:
+        _cache_response(response_cache, request, content)
+    return result
+
+
+async def _acreate(request: dict, 
+                   api_key: Optional[str], 
+                   model: str, 
+                   custom_client: Optional[Any], 
+                   client_pool: Optional[ClientPool], 
+                   semaphore: Optional[asyncio.Semaphore]) -> Optional[str]:
+    """
+    Send a chat completion request without blocking and return the content of the response.
+    """
+    async with AsyncExitStack() as stack:
+        if semaphore is not None:
+            await stack.enter_async_context(semaphore)
+        if isinstance(custom_client, OpenAI):
+            loop = asyncio.get_running_loop()
+            response = await loop.run_in_executor(None, functools.partial(custom_client.chat.completions.create,
+                                                                          **request))
+        elif custom_client is not None:
+            response = custom_client.chat.completions.create(**request)
+            if inspect.isawaitable(response):
+                response = await response
+        elif client_pool is not None:
+            response = await client_pool.get_async(api_key, model_base_url(model)).chat.completions.create(**request)
+        else:
+            client = await stack.enter_async_context(AsyncOpenAI(api_key=api_key, base_url=model_base_url(model)))
+            response = await client.chat.completions.create(**request)
+
+    return response.choices[0].message.content
+
+
+def _cache_response(response_cache: Optional[ResponseCache], request: dict, content: Optional[str]) -> None:
+    """
+    Store the content of a response in the response cache, if any.
+    """
+    if response_cache is not None and content is not None:
+        response_cache.set(request, content)
+
+
+def check_options(clean_output: bool, 
+                  explanation: bool, 
+                  output_explanation: bool, 
+                  allowed_categories: Optional[List[str]]) -> None:
+    """
+    Validate the output options of a classification.
+    
+    Args:
+        clean_output (bool): Whether to clean and validate the output.
+        explanation (bool): Whether to expect explanations in the model response.
+        output_explanation (bool): Whether to return the explanation alongside the classification.
+        allowed_categories (List[str], optional): List of allowed categories for filtering output.
+    
+    Raises:
+        ValueError: If clean_output is True but allowed_categories is None, or if
+                   output_explanation=True but explanation=False.
+    """
     if clean_output and allowed_categories is None:
         raise ValueError("If clean_output is True, a list in allowed_categories must be provided to filter the output.")
     
     if output_explanation and not explanation:
         raise ValueError("If output_explanation is True, explanation must also be True.")
 
+
+def _client(api_key: Optional[str], 
+            model: str, 
+            custom_client: Optional[Any], 
+            client_pool: Optional[ClientPool]) -> Any:
+    """
+    Get the client for a classification: the custom client, a pooled client or a new one.
+    """
+    if custom_client is not None:
+        return custom_client
+    elif client_pool is not None:
+        return client_pool.get(api_key, model_base_url(model))
+    elif model == "deepseek-chat":
+        return OpenAI(
+                      api_key=api_key,
+                      base_url=DEEPSEEK_BASE_URL
+                      )
+    return OpenAI(
+                  api_key=api_key
+                  )
+
+
+def classification_request(name: str, 
+                           input_text: Optional[str], 
+                           baseprompt: str, 
+                           model: str, 
+                           temperature: float, 
+                           top_p: float, 
+                           max_length: int, 
+                           custom_client: Optional[Any]) -> dict:
+    """
+    Build the arguments of the chat completion request classifying a compound.
+    
+    Args:
+        name (str): The name of the compound to classify.
+        input_text (str, optional): Information about the compound.
+        baseprompt (str): Base prompt template for classification.
+        model (str): Name of the language model to use.
+        temperature (float): Temperature parameter for model creativity.
+        top_p (float): Top-p parameter for nucleus sampling.
+        max_length (int): Maximum length of the prompt in characters.
+        custom_client (Any, optional): Custom client the request is sent to, if any.
+    
+    Returns:
+        dict: The keyword arguments of ``chat.completions.create``.
+    """
     split_base = baseprompt.split("COMPOUND_NAME")
     prompt = split_base[0] + str(name) + split_base[1] + str(input_text)
     prompt = prompt[:max_length]
+    return _completion_request(prompt, model, temperature, top_p, custom_client)
+
 
+def _completion_request(prompt: str, 
+                        model: str, 
+                        temperature: float, 
+                        top_p: float, 
+                        custom_client: Optional[Any]) -> dict:
+    """
+    Build the arguments of a chat completion request for a prompt.
+    
+    Returns:
+        dict: The keyword arguments of ``chat.completions.create``.
+    """
     # Use user role for custom clients (like Gemini) that may not support system messages
     message_role = "user" if custom_client is not None else "system"
     
-    response = client.chat.completions.create(
-        model=model,
-        messages=[{"role": message_role, "content": prompt}],
-        temperature=temperature,
-        top_p=top_p,
-        stream=False
-        )
+    return {"model": model,
+            "messages": [{"role": message_role, "content": prompt}],
+            "temperature": temperature,
+            "top_p": top_p,
+            "stream": False
+            }
+
+
+def _batch_header(baseprompt: str) -> str:
+    """
+    Get the instructions of a multi-compound prompt.
+    """
+    split_base = baseprompt.split("COMPOUND_NAME")
+    return split_base[0] + BATCH_COMPOUND_NAME + split_base[1] + BATCH_INSTRUCTIONS
+
+
+def _batch_entry(number: int, name: str, input_text: Optional[str]) -> str:
+    """
+    Get the section of a multi-compound prompt describing one compound.
+    """
+    return f"\n### COMPOUND {number}: {name}\n{input_text}\n"
+
+
+def _batch_prompt(baseprompt: str, compounds: List[Tuple[str, Optional[str]]]) -> str:
+    """
+    Build the prompt classifying several compounds in one request.
+    """
+    return _batch_header(baseprompt) + "".join(_batch_entry(number, name, input_text)
+                                                for number, (name, input_text) in enumerate(compounds, 1))
+
+
+def _batches(compounds: List[Tuple[str, Optional[str]]], 
+             baseprompt: str, 
+             max_length: int, 
+             max_batch_size: int) -> Iterator[List[int]]:
+    """
+    Group compounds, in order, into requests that fit the prompt length budget.
+    
+    Yields:
+        List[int]: The indices of the compounds of one request. A compound that does not
+                   fit in a request with any other compound is yielded alone.
+    """
+    header = len(_batch_header(baseprompt))
+    batch: List[int] = []
+    length = header
+    for index, (name, input_text) in enumerate(compounds):
+        entry = len(_batch_entry(len(batch) + 1, name, input_text))
+        if batch and (len(batch) >= max_batch_size or length + entry > max_length):
+            yield batch
+            batch = []
+            length = header
+            entry = len(_batch_entry(1, name, input_text))
+        batch.append(index)
+        length += entry
+    if batch:
+        yield batch
+
+
+def _parse_batch_response(content: Optional[str], count: int) -> Dict[int, str]:
+    """
+    Read the per-compound answers of a multi-compound response.
+    
+    The first JSON object in the content is used, so surrounding text or code fences
+    are ignored. Answers given as lists are joined with commas.
+    
+    Args:
+        content (str, optional): The content of the model response.
+        count (int): The number of compounds in the request.
+    
+    Returns:
+        Dict[int, str]: The answer of each compound number that was answered; empty if
+                        the response cannot be parsed.
+    """
+    if not content:
+        return {}
+    start = content.find("{")
+    end = content.rfind("}")
+    try:
+        data = json.loads(content[start:end + 1]) if 0 <= start < end else None
+    except ValueError:
+        return {}
+    if not isinstance(data, dict):
+        return {}
+
+    answers = {}
+    for key, value in data.items():
+        try:
+            number = int(str(key).strip().lstrip("#"))
+        except ValueError:
+            continue
+        if isinstance(value, list) and all(isinstance(item, str) for item in value):
+            value = ", ".join(value)
+        if 1 <= number <= count and isinstance(value, str):
+            answers[number] = value
+    return answers
+
+
+def parse_response(content: str,
+                   clean_output: bool,
+                   explanation: bool,
+                   explanation_separator: str,
+                   output_explanation: bool,
+                   allowed_categories: Optional[List[str]],
+                   spell_checker: Optional[SpellChecker]) -> Union[str, List[str], Tuple[List[str], str]]:
+    """
+    Turn the content of a model response into the classification result.
+    
+    Args:
+        content (str): The content of the model response.
+        clean_output (bool): Whether to clean and validate the output.
+        explanation (bool): Whether to expect and extract explanations from the response.
+        explanation_separator (str): The delimiter between explanation and classification.
+        output_explanation (bool): Whether to return the explanation alongside the classification.
+        allowed_categories (List[str], optional): List of allowed categories for filtering output.
+        spell_checker (SpellChecker, optional): Spell checker instance for output correction.
+    
+    Returns:
+        Union[str, List[str], Tuple[List[str], str]]: The raw content, the list of categories,
+                                                      or the categories and the explanation.
+    
+    Raises:
+        ValueError: If explanation=True but the separator is not found in the response.
+    """
     if not clean_output:
-        return response.choices[0].message.content
+        return content
     else:
-        cleaned_response_string = response.choices[0].message.content.replace("\n", " ").replace("  ", " ").strip()
+        cleaned_response_string = content.replace("\n", " ").replace("  ", " ").strip()
 
         if explanation:
             # Split by separator and extract classification part
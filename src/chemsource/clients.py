@@ -0,0 +1,285 @@
+"""
+Model client pool module for chemsource.
+
+This module provides a thread-safe pool of OpenAI-compatible clients keyed by
+API key, base URL and timeouts, so that classification calls reuse one client
+and its open HTTP connections instead of building a new client, and paying a
+new TCP and TLS handshake, on every call. Asynchronous clients are pooled per
+event loop, since their connections belong to the loop they were opened in.
+"""
+
+from typing import Optional, Dict, Tuple, List, Any
+import asyncio
+import threading
+import weakref
+
+import httpx
+from openai import OpenAI, AsyncOpenAI, DefaultHttpxClient, DefaultAsyncHttpxClient
+
+#: Base URL of the DeepSeek API, used for the "deepseek-chat" model
+DEEPSEEK_BASE_URL = "https://api.deepseek.com"
+
+#: Default maximum number of concurrent connections per client
+DEFAULT_MAX_CONNECTIONS = 100
+
+#: Default maximum number of idle connections kept open per client
+DEFAULT_MAX_KEEPALIVE_CONNECTIONS = 20
+
+#: Default connect timeout in seconds
+DEFAULT_CONNECT_TIMEOUT = 5.0
+
+#: Default timeout in seconds for reading a model response
+DEFAULT_READ_TIMEOUT = 600.0
+
+
+def model_base_url(model: str) -> Optional[str]:
+    """
+    Get the API base URL of a model.
+
+    Args:
+        model (str): The name of the model.
+
+    Returns:
+        Optional[str]: DEEPSEEK_BASE_URL for "deepseek-chat", otherwise None (the OpenAI API).
+    """
+    return DEEPSEEK_BASE_URL if model == "deepseek-chat" else None
+
+
+class ClientPool:
+    """
+    Thread-safe pool of OpenAI-compatible clients.
+
+    One client is created per (api_key, base_url, connect timeout, read timeout) and
+    returned to every later caller with the same key. Each client keeps up to
+    ``max_keepalive_connections`` connections open, so consecutive and concurrent
+    classification calls skip the connection setup. Clients are safe to share
+    between threads.
+
+    Args:
+        max_connections (int, optional): Maximum number of concurrent connections per client.
+                                         Defaults to 100.
+        max_keepalive_connections (int, optional): Maximum number of idle connections kept
+                                                   open per client. Defaults to 20.
+        connect_timeout (float, optional): Default seconds to wait for a connection. Defaults to 5.0.
+        read_timeout (float, optional): Default seconds to wait for a response. Defaults to 600.0.
+        max_retries (int, optional): Retries of failed requests made by each client. Defaults to 2.
+
+    Raises:
+        ValueError: If a connection limit is less than 1.
+
+    Example:
+        >>> pool = ClientPool(max_connections=50)
+        >>> classify("aspirin", "pain relief", api_key="your_key", client_pool=pool)
+    """
+
+    def __init__(self,
+                 max_connections: int = DEFAULT_MAX_CONNECTIONS,
+                 max_keepalive_connections: int = DEFAULT_MAX_KEEPALIVE_CONNECTIONS,
+                 connect_timeout: float = DEFAULT_CONNECT_TIMEOUT,
+                 read_timeout: float = DEFAULT_READ_TIMEOUT,
+                 max_retries: int = 2) -> None:
+        if max_connections < 1 or max_keepalive_connections < 1:
+            raise ValueError("max_connections and max_keepalive_connections must be at least 1")
+
+        self.max_connections = max_connections
+        self.max_keepalive_connections = max_keepalive_connections
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.max_retries = max_retries
+        self.created = 0
+        self.reused = 0
+        self._lock = threading.Lock()
+        self._clients: Dict[Tuple[Optional[str], Optional[str], float, float], OpenAI] = {}
+        self._async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[tuple, AsyncOpenAI]]" = \
+            weakref.WeakKeyDictionary()
+
+    def get(self,
+            api_key: Optional[str],
+            base_url: Optional[str] = None,
+            connect_timeout: Optional[float] = None,
+            read_timeout: Optional[float] = None) -> OpenAI:
+        """
+        Get the pooled client for an API key, base URL and timeouts.
+
+        Args:
+            api_key (str, optional): API key for the language model service.
+            base_url (str, optional): API base URL. Defaults to None (the OpenAI API).
+            connect_timeout (float, optional): Seconds to wait for a connection. Defaults to
+                                               the pool's connect_timeout.
+            read_timeout (float, optional): Seconds to wait for a response. Defaults to the
+                                            pool's read_timeout.
+
+        Returns:
+            OpenAI: The shared client.
+        """
+        key = self._key(api_key, base_url, connect_timeout, read_timeout)
+        with self._lock:
+            client = self._clients.get(key)
+            if client is not None:
+                self.reused += 1
+                return client
+            client = self._clients[key] = self._create(*key)
+            self.created += 1
+            return client
+
+    def get_async(self,
+                  api_key: Optional[str],
+                  base_url: Optional[str] = None,
+                  connect_timeout: Optional[float] = None,
+                  read_timeout: Optional[float] = None) -> AsyncOpenAI:
+        """
+        Get the pooled asynchronous client for the running event loop.
+
+        Args:
+            api_key (str, optional): API key for the language model service.
+            base_url (str, optional): API base URL. Defaults to None (the OpenAI API).
+            connect_timeout (float, optional): Seconds to wait for a connection. Defaults to
+                                               the pool's connect_timeout.
+            read_timeout (float, optional): Seconds to wait for a response. Defaults to the
+                                            pool's read_timeout.
+
+        Returns:
+            AsyncOpenAI: The client shared by callers in the running event loop.
+
+        Raises:
+            RuntimeError: If no event loop is running.
+        """
+        loop = asyncio.get_running_loop()
+        key = self._key(api_key, base_url, connect_timeout, read_timeout)
+        with self._lock:
+            clients = self._async_clients.setdefault(loop, {})
+            client = clients.get(key)
+            if client is not None:
+                self.reused += 1
+                return client
+            client = clients[key] = self._create_async(*key)
+            self.created += 1
+            return client
+
+    def stats(self) -> dict:
+        """
+        Get pool statistics.
+
+        Returns:
+            dict: The number of pooled clients, clients created and calls served by an
+                  existing client.
+        """
+        with self._lock:
+            clients = len(self._clients) + sum(len(clients) for clients in self._async_clients.values())
+            return {"clients": clients, "created": self.created, "reused": self.reused}
+
+    def close(self) -> None:
+        """
+        Close every pooled client and its connections.
+
+        Asynchronous clients are closed in their own event loop. Clients of an event loop
+        that has already closed can no longer be closed and are dropped, so close the pool
+        with ``aclose`` before ending a loop that used it.
+
+        Raises:
+            RuntimeError: If called from an event loop that has pooled asynchronous clients;
+                          use ``aclose`` there instead.
+        """
+        with self._lock:
+            try:
+                running_loop = asyncio.get_running_loop()
+            except RuntimeError:
+                running_loop = None
+            if running_loop is not None and self._async_clients.get(running_loop):
+                raise RuntimeError("The running event loop has pooled asynchronous clients; use aclose() instead")
+            clients = list(self._clients.values())
+            async_clients = [(loop, list(loop_clients.values()))
+                             for loop, loop_clients in self._async_clients.items()]
+            self._clients.clear()
+            self._async_clients.clear()
+        for client in clients:
+            client.close()
+        for loop, loop_clients in async_clients:
+            if loop.is_closed():
+                continue
+            if loop.is_running():
+                asyncio.run_coroutine_threadsafe(_aclose_all(loop_clients), loop).result()
+            else:
+                loop.run_until_complete(_aclose_all(loop_clients))
+
+    async def aclose(self) -> None:
+        """
+        Close every pooled client, closing the asynchronous clients of the running event loop here.
+        """
+        with self._lock:
+            async_clients = list(self._async_clients.pop(asyncio.get_running_loop(), {}).values())
+        await _aclose_all(async_clients)
+        self.close()
+
+    def __enter__(self) -> "ClientPool":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def _key(self,
+             api_key: Optional[str],
+             base_url: Optional[str],
+             connect_timeout: Optional[float],
+             read_timeout: Optional[float]) -> Tuple[Optional[str], Optional[str], float, float]:
+        return (api_key,
+                base_url,
+                self.connect_timeout if connect_timeout is None else connect_timeout,
+                self.read_timeout if read_timeout is None else read_timeout)
+
+    def _limits(self) -> httpx.Limits:
+        return httpx.Limits(max_connections=self.max_connections,
+                            max_keepalive_connections=self.max_keepalive_connections)
+
+    def _create(self,
+                api_key: Optional[str],
+                base_url: Optional[str],
+                connect_timeout: float,
+                read_timeout: float) -> OpenAI:
+        timeout = httpx.Timeout(read_timeout, connect=connect_timeout)
+        return OpenAI(api_key=api_key,
+                      base_url=base_url,
+                      timeout=timeout,
+                      max_retries=self.max_retries,
+                      http_client=DefaultHttpxClient(limits=self._limits(), timeout=timeout))
+
+    def _create_async(self,
+                      api_key: Optional[str],
+                      base_url: Optional[str],
+                      connect_timeout: float,
+                      read_timeout: float) -> AsyncOpenAI:
+        timeout = httpx.Timeout(read_timeout, connect=connect_timeout)
+        return AsyncOpenAI(api_key=api_key,
+                           base_url=base_url,
+                           timeout=timeout,
+                           max_retries=self.max_retries,
+                           http_client=DefaultAsyncHttpxClient(limits=self._limits(), timeout=timeout))
+
+
+async def _aclose_all(clients: List[AsyncOpenAI]) -> None:
+    """
+    Close asynchronous clients in the running event loop.
+    """
+    for client in clients:
+        await client.close()
+
+
+_client_pool: Optional[ClientPool] = None
+_client_pool_lock = threading.Lock()
+
+
+def get_client_pool() -> ClientPool:
+    """
+    Get the process-wide client pool.
+
+    Returns:
+        ClientPool: The shared pool, created with default limits on first use.
+
+    Example:
+        >>> client = get_client_pool().get("your_key")
+    """
+    global _client_pool
+    with _client_pool_lock:
+        if _client_pool is None:
+            _client_pool = ClientPool()
+        return _client_pool
@@ -0,0 +1,196 @@
+"""
+Coalescing module for chemsource.
+
+This module provides single-flight groups that collapse concurrent identical
+operations into one: while an operation for a key is in flight, every other
+caller asking for the same key waits for it and receives its result (or its
+exception) instead of starting a duplicate retrieval or model call. Nothing is
+remembered once the operation finishes; caching is left to the cache module.
+"""
+
+from typing import Dict, Hashable, Callable, Awaitable, Any, Tuple
+import asyncio
+import threading
+
+
+class _Call:
+    """
+    An in-flight operation of a SingleFlight group.
+
+    Attributes:
+        done (threading.Event): Set once the operation has finished.
+        result (Any): The return value of the operation.
+        error (BaseException): The exception the operation raised, if any.
+    """
+
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class _AsyncCall:
+    """
+    An in-flight operation of an AsyncSingleFlight group.
+
+    Attributes:
+        task (asyncio.Task): The task running the operation.
+        waiters (int): Number of callers awaiting the task.
+    """
+
+    def __init__(self, task: asyncio.Task) -> None:
+        self.task = task
+        self.waiters = 0
+
+
+class SingleFlight:
+    """
+    Thread-safe group coalescing concurrent calls with the same key.
+
+    The first caller for a key runs the function; callers arriving with the same key
+    before it returns block until it does and share its outcome. Callers sharing a
+    group must use keys that identify everything the result depends on.
+
+    Attributes:
+        calls (int): Number of operations actually run.
+        shared (int): Number of callers served by an operation started by another caller.
+
+    Example:
+        >>> flight = SingleFlight()
+        >>> content = flight.do(("WIKIPEDIA", "aspirin"), wikipedia_retrieve, "aspirin")
+    """
+
+    def __init__(self) -> None:
+        self.calls = 0
+        self.shared = 0
+        self._lock = threading.Lock()
+        self._in_flight: Dict[Hashable, _Call] = {}
+
+    def do(self, key: Hashable, func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """
+        Run a function, or wait for the in-flight call with the same key.
+
+        Args:
+            key (Hashable): Key identifying the operation.
+            func (Callable[..., Any]): The function to run.
+            *args: Positional arguments for func.
+            **kwargs: Keyword arguments for func.
+
+        Returns:
+            Any: The return value of the call for this key.
+
+        Raises:
+            Exception: Whatever the call for this key raised.
+        """
+        with self._lock:
+            call = self._in_flight.get(key)
+            leader = call is None
+            if leader:
+                call = self._in_flight[key] = _Call()
+                self.calls += 1
+            else:
+                self.shared += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = func(*args, **kwargs)
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._in_flight[key]
+            call.done.set()
+
+    def stats(self) -> dict:
+        """
+        Get coalescing statistics.
+
+        Returns:
+            dict: The number of operations run, shared callers and operations in flight.
+        """
+        with self._lock:
+            return {"calls": self.calls, "shared": self.shared, "in_flight": len(self._in_flight)}
+
+
+class AsyncSingleFlight:
+    """
+    Asyncio group coalescing concurrent coroutine calls with the same key.
+
+    The first caller for a key starts the coroutine as a task; callers arriving with
+    the same key before it finishes await the same task. The task is shielded from
+    the cancellation of any single caller, so a cancelled caller does not cancel the
+    operation the others are waiting for; once every caller has been cancelled, the
+    task is cancelled too. Groups can be shared across event loops; operations are
+    only coalesced within the same loop.
+
+    Attributes:
+        calls (int): Number of operations actually run.
+        shared (int): Number of callers served by an operation started by another caller.
+
+    Example:
+        >>> flight = AsyncSingleFlight()
+        >>> content = await flight.do(("WIKIPEDIA", "aspirin"), awikipedia_retrieve, "aspirin")
+    """
+
+    def __init__(self) -> None:
+        self.calls = 0
+        self.shared = 0
+        self._in_flight: Dict[Tuple[asyncio.AbstractEventLoop, Hashable], _AsyncCall] = {}
+
+    async def do(self, key: Hashable, func: Callable[..., Awaitable[Any]], *args: Any, **kwargs: Any) -> Any:
+        """
+        Run a coroutine function, or await the in-flight call with the same key.
+
+        Args:
+            key (Hashable): Key identifying the operation.
+            func (Callable[..., Awaitable[Any]]): The coroutine function to run.
+            *args: Positional arguments for func.
+            **kwargs: Keyword arguments for func.
+
+        Returns:
+            Any: The return value of the call for this key.
+
+        Raises:
+            Exception: Whatever the call for this key raised.
+        """
+        flight_key = (asyncio.get_running_loop(), key)
+        call = self._in_flight.get(flight_key)
+        if call is None:
+            call = self._in_flight[flight_key] = _AsyncCall(asyncio.ensure_future(func(*args, **kwargs)))
+            call.task.add_done_callback(lambda _: self._finish(flight_key, call))
+            self.calls += 1
+        else:
+            self.shared += 1
+
+        call.waiters += 1
+        try:
+            return await asyncio.shield(call.task)
+        finally:
+            call.waiters -= 1
+            if call.waiters == 0 and not call.task.done():
+                # Every caller has been cancelled, so nobody needs the result
+                self._finish(flight_key, call)
+                call.task.cancel()
+
+    def _finish(self, flight_key: Tuple[asyncio.AbstractEventLoop, Hashable], call: _AsyncCall) -> None:
+        """
+        Stop coalescing new callers into a call that has finished or been cancelled.
+        """
+        if self._in_flight.get(flight_key) is call:
+            del self._in_flight[flight_key]
+
+    def stats(self) -> dict:
+        """
+        Get coalescing statistics.
+
+        Returns:
+            dict: The number of operations run, shared callers and operations in flight.
+        """
+        return {"calls": self.calls, "shared": self.shared, "in_flight": len(self._in_flight)}
@@ -29,6 +29,16 @@ by commas, and provide only the categories listed (either list a \
 combination of INDUSTRIAL, ENDOGENOUS, PERSONAL CARE, MEDICAL, FOOD or \
 list INFO), with no justification. Provided Information:\n")
 
+#: Text standing in for COMPOUND_NAME when several compounds are classified in one request
+BATCH_COMPOUND_NAME = "(each of the numbered compounds below, independently)"
+
+#: Instructions appended to the prompt when several compounds are classified in one request
+BATCH_INSTRUCTIONS = ("\nThe information is given separately for each numbered compound below. "
+                      "Classify each compound using only its own information. Respond with only a "
+                      "JSON object mapping each compound number to the answer you would give for "
+                      "that compound alone, as a string, for example "
+                      "{\"1\": \"MEDICAL, FOOD\", \"2\": \"INFO\"}.\n")
+
 
 class Config:
     """
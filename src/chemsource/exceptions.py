@@ -93,4 +93,92 @@ class WikipediaRetrievalError(Exception):
     """
     def __init__(self, message: str = "Failed to retrieve content from Wikipedia") -> None:
         self.message = message
-        super().__init__(message)
\ No newline at end of file
+        super().__init__(message)
+
+
+class WikipediaPageNotFoundError(WikipediaRetrievalError):
+    """
+    Raised when no Wikipedia page exists for the requested title.
+    
+    This exception is raised when Wikipedia answers that the page is missing
+    or the title is invalid, as opposed to a failure to reach Wikipedia.
+    
+    Args:
+        message (str): The error message. Defaults to a standard message.
+    """
+    def __init__(self, message: str = "No Wikipedia page exists for the requested title") -> None:
+        super().__init__(message)
+
+
+class WikipediaDisambiguationError(WikipediaRetrievalError):
+    """
+    Raised when the requested title is a Wikipedia disambiguation page.
+    
+    This exception is raised when the title may refer to multiple pages, so
+    there is no single article describing the compound.
+    
+    Args:
+        message (str): The error message. Defaults to a standard message.
+    """
+    def __init__(self, message: str = "The requested title is a Wikipedia disambiguation page") -> None:
+        super().__init__(message)
+
+
+class RetryableError(Exception):
+    """
+    Base class for errors after which a later attempt may succeed.
+    
+    Retrieval backends can raise subclasses of this exception to mark a failure
+    as transient, so that it is retried with backoff and counted by circuit breakers.
+    
+    Args:
+        message (str): The error message. Defaults to a standard message.
+    """
+    def __init__(self, message: str = "Transient failure while retrieving content") -> None:
+        self.message = message
+        super().__init__(message)
+
+
+class CircuitOpenError(Exception):
+    """
+    Raised when a source is skipped because its circuit breaker is open.
+    
+    This exception is raised without contacting the source while the source
+    is in its cooldown window after repeated failures.
+    
+    Args:
+        message (str): The error message. Defaults to a standard message.
+    """
+    def __init__(self, message: str = "Circuit breaker is open; skipping the source") -> None:
+        self.message = message
+        super().__init__(message)
+
+
+class CassetteMissError(LookupError):
+    """
+    Raised when a replayed request was never recorded in the cassette.
+    
+    This exception is raised by replaying transports and clients instead of
+    contacting the live service, so that an incomplete cassette is noticed.
+    
+    Args:
+        message (str): The error message. Defaults to a standard message.
+    """
+    def __init__(self, message: str = "The request was not recorded in the cassette") -> None:
+        self.message = message
+        super().__init__(message)
+
+
+class BatchIncompleteError(Exception):
+    """
+    Raised when the output of a batch that has not completed is requested.
+    
+    This exception is raised by batch submitters while the batch is still being
+    processed, or when it failed, expired or was cancelled.
+    
+    Args:
+        message (str): The error message. Defaults to a standard message.
+    """
+    def __init__(self, message: str = "The batch has not completed") -> None:
+        self.message = message
+        super().__init__(message)
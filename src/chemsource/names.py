@@ -0,0 +1,117 @@
+"""
+Name canonicalization module for chemsource.
+
+This module maps the different spellings of a compound name to one canonical
+key, so that "Aspirin", "aspirin " and "ASPIRIN" (and, with a synonym map,
+"acetylsalicylic acid") share cache entries, coalesced requests and batch work.
+Canonical keys are only used for matching; lookups are still made with a real
+name and results are still reported under the names the caller passed in.
+"""
+
+from typing import Dict, Optional
+import re
+import unicodedata
+
+#: Greek letters and their spelled-out names
+GREEK_LETTERS = {"α": "alpha", "β": "beta", "γ": "gamma", "δ": "delta", "ε": "epsilon",
+                 "ζ": "zeta", "η": "eta", "θ": "theta", "ι": "iota", "κ": "kappa",
+                 "λ": "lambda", "μ": "mu", "ν": "nu", "ξ": "xi", "ο": "omicron",
+                 "π": "pi", "ρ": "rho", "σ": "sigma", "ς": "sigma", "τ": "tau",
+                 "υ": "upsilon", "φ": "phi", "χ": "chi", "ψ": "psi", "ω": "omega"
+                 }
+
+_DASHES = re.compile(r"[‐‑‒–—−﹣－]")
+_GREEK = re.compile("|".join(GREEK_LETTERS))
+_STEREO_PREFIX = re.compile(r"^\(([\d\s,+\-/±rszedl]+)\)\s*-?\s*")
+_RACEMIC_PREFIX = re.compile(r"^(?:rac|dl)-")
+_RACEMIC = {"±", "+/-", "+-", "rs", "r,s", "sr", "s,r", "dl"}
+
+
+def canonical_name(name: str) -> str:
+    """
+    Get the canonical key of a compound name.
+
+    The name is Unicode (NFKC) normalized, dashes are replaced by hyphens, Greek
+    letters are spelled out, whitespace is collapsed and case is folded. A leading
+    stereo descriptor is written in one form: "( S ) ibuprofen" becomes "(s)-ibuprofen"
+    and the racemic forms "(+/-)-", "(RS)-", "(R,S)-", "rac-" and "DL-" become "(±)-".
+    Different stereoisomers keep different keys.
+
+    Args:
+        name (str): The compound name.
+
+    Returns:
+        str: The canonical key.
+
+    Example:
+        >>> canonical_name("  α-Tocopherol ")
+        'alpha-tocopherol'
+    """
+    name = unicodedata.normalize("NFKC", name)
+    name = _DASHES.sub("-", name)
+    name = ' '.join(name.split()).casefold()
+    name = _GREEK.sub(lambda match: GREEK_LETTERS[match.group(0)], name)
+
+    match = _STEREO_PREFIX.match(name)
+    if match is not None:
+        descriptor = ''.join(match.group(1).split())
+        if descriptor in _RACEMIC:
+            descriptor = "±"
+        name = f"({descriptor})-" + name[match.end():]
+    else:
+        name = _RACEMIC_PREFIX.sub("(±)-", name)
+    return name
+
+
+class NameCanonicalizer:
+    """
+    Canonicalizer of compound names with an optional synonym map.
+
+    Synonyms map a name to the name it should be looked up and cached under; both
+    sides are matched by canonical key, so the map need not list every spelling.
+    Synonyms are not followed transitively.
+
+    Args:
+        synonyms (Dict[str, str], optional): Mapping of synonyms to preferred names,
+                                             e.g. {"acetylsalicylic acid": "aspirin"}.
+                                             Defaults to None.
+
+    Example:
+        >>> names = NameCanonicalizer({"acetylsalicylic acid": "Aspirin"})
+        >>> names.key("Acetylsalicylic  acid") == names.key("ASPIRIN")
+        True
+        >>> names.query("acetylsalicylic acid")
+        'Aspirin'
+    """
+
+    def __init__(self, synonyms: Optional[Dict[str, str]] = None) -> None:
+        self.synonyms = {canonical_name(synonym): preferred
+                         for synonym, preferred in (synonyms or {}).items()}
+
+    def query(self, name: str) -> str:
+        """
+        Get the name to look up for a compound.
+
+        Args:
+            name (str): The compound name as given.
+
+        Returns:
+            str: The preferred name if the name is a known synonym, otherwise the name
+                 with surrounding and repeated whitespace removed.
+        """
+        preferred = self.synonyms.get(canonical_name(name))
+        if preferred is not None:
+            return preferred
+        return ' '.join(name.split())
+
+    def key(self, name: str) -> str:
+        """
+        Get the canonical key of a compound, after resolving synonyms.
+
+        Args:
+            name (str): The compound name as given.
+
+        Returns:
+            str: The canonical key of the name to look up.
+        """
+        return canonical_name(self.query(name))
@@ -0,0 +1,550 @@
+"""
+Offline retrieval backends for chemsource.
+
+This module provides retrieval backends that answer lookups from local data
+instead of live web services, so that chemsource can run at high throughput
+and in air-gapped environments.
+"""
+
+from typing import Optional, Iterable, Union
+from collections import OrderedDict
+import bz2
+import gzip
+import html
+import os
+import re
+import sqlite3
+import threading
+
+from lxml import etree
+
+from .exceptions import (
+    WikipediaPageNotFoundError,
+    WikipediaDisambiguationError,
+    PubMedSearchResultsError
+)
+from .retriever import (
+    _clean_wikipedia_text,
+    _wikipedia_error,
+    _abstract_text,
+    _join_abstracts,
+    SEARCH_PARAMS,
+    PubMedQuery
+)
+
+#: Memory-mapped size of the title index in bytes
+INDEX_MMAP_SIZE = 1024 * 1024 * 1024
+
+#: Maximum number of redirects followed for a single lookup
+MAX_REDIRECTS = 5
+
+#: Number of articles written per transaction during PubMed ingestion
+INGEST_BATCH_SIZE = 10000
+
+#: Templates marking a page as a disambiguation page
+_DISAMBIGUATION_PATTERN = re.compile(r"\{\{\s*(disambiguation|disambig|dab|hndis|geodis|chemistry index)\s*[|}]",
+                                     re.IGNORECASE)
+
+_HEADING_PATTERN = re.compile(r"^=+[^=\n].*?=+[ \t]*$", re.MULTILINE)
+
+#: FTS5 column filter of each supported PubMedQuery field; None searches all columns
+_PUBMED_FIELD_COLUMNS = {"ti": "{title} : ", "tiab": "{title abstract} : ", None: ""}
+
+_SUBSTITUTIONS = [
+    (re.compile(r"<!--.*?-->", re.DOTALL), ""),
+    (re.compile(r"<ref[^>]*/>", re.IGNORECASE), ""),
+    (re.compile(r"<ref[^>]*>.*?</ref>", re.IGNORECASE | re.DOTALL), ""),
+    (re.compile(r"\[\[(?:File|Image|Category):(?:[^\[\]]|\[\[[^\[\]]*\]\])*\]\]", re.IGNORECASE), ""),
+    (re.compile(r"\[\[[^\[\]|]*\|([^\[\]]*)\]\]"), r"\1"),
+    (re.compile(r"\[\[([^\[\]]*)\]\]"), r"\1"),
+    (re.compile(r"\[(?:https?:)?//[^\s\]]+\s+([^\]]*)\]"), r"\1"),
+    (re.compile(r"\[(?:https?:)?//[^\]]*\]"), ""),
+    (re.compile(r"'{2,}"), ""),
+    (re.compile(r"^=+\s*(.*?)\s*=+\s*$", re.MULTILINE), r"\1"),
+    (re.compile(r"<[^>]+>"), ""),
+]
+
+
+def _strip_nested(text: str, open_token: str, close_token: str) -> str:
+    """
+    Remove possibly nested spans delimited by open_token and close_token.
+
+    Args:
+        text (str): The text to strip.
+        open_token (str): The opening delimiter, e.g. "{{".
+        close_token (str): The closing delimiter, e.g. "}}".
+
+    Returns:
+        str: The text with all delimited spans removed.
+    """
+    pieces = []
+    depth = 0
+    start = 0
+    pattern = re.compile(re.escape(open_token) + "|" + re.escape(close_token))
+    for match in pattern.finditer(text):
+        if match.group() == open_token:
+            if depth == 0:
+                pieces.append(text[start:match.start()])
+            depth += 1
+        elif depth > 0:
+            depth -= 1
+            if depth == 0:
+                start = match.end()
+    if depth == 0:
+        pieces.append(text[start:])
+    return "".join(pieces)
+
+
+def wikitext_to_text(wikitext: str) -> str:
+    """
+    Convert MediaWiki markup to plain text.
+
+    Removes comments, references, templates, tables, files and categories, keeps
+    the visible text of links and headings, and drops formatting and HTML tags.
+
+    Args:
+        wikitext (str): The raw wikitext of a page.
+
+    Returns:
+        str: The plain text of the page.
+    """
+    text = _strip_nested(wikitext, "{{", "}}")
+    text = _strip_nested(text, "{|", "|}")
+    for pattern, replacement in _SUBSTITUTIONS:
+        text = pattern.sub(replacement, text)
+    return html.unescape(text)
+
+
+def normalize_title(title: str) -> str:
+    """
+    Normalize a page title the way MediaWiki does.
+
+    Args:
+        title (str): The page title or compound name.
+
+    Returns:
+        str: The title with underscores replaced by spaces, whitespace collapsed and
+             the first letter capitalized.
+    """
+    title = " ".join(title.replace("_", " ").split())
+    return title[:1].upper() + title[1:]
+
+
+class WikipediaDump:
+    """
+    Offline Wikipedia backend reading a local multistream dump.
+
+    A ``pages-articles-multistream.xml.bz2`` dump consists of independent bz2 streams
+    of about 100 pages each, and the companion ``-index.txt.bz2`` file lists the stream
+    offset of every title. On first use the companion index is converted into a SQLite
+    title index next to the dump; afterwards the index is opened read-only and
+    memory-mapped, so a lookup is one B-tree search followed by decompressing the
+    single stream that holds the page. Redirects are followed and the wikitext is
+    converted to plain text and cleaned like ``wikipedia_retrieve`` output. Recently
+    decompressed streams are kept in a small LRU cache.
+
+    Args:
+        dump_path (str): Path of the ``pages-articles-multistream.xml.bz2`` file.
+        multistream_index_path (str, optional): Path of the companion
+                                                ``pages-articles-multistream-index.txt.bz2``
+                                                file. Defaults to the dump path with
+                                                ``.xml.bz2`` replaced by ``-index.txt.bz2``.
+        index_path (str, optional): Path of the SQLite title index. Defaults to the dump
+                                    path with ``.index.sqlite`` appended.
+        block_cache_size (int, optional): Number of decompressed streams kept in memory.
+                                          Defaults to 8.
+
+    Example:
+        >>> dump = WikipediaDump("enwiki-latest-pages-articles-multistream.xml.bz2")
+        >>> source, content = retrieve("aspirin", wikipedia_backend=dump)
+    """
+
+    def __init__(self,
+                 dump_path: str,
+                 multistream_index_path: Optional[str] = None,
+                 index_path: Optional[str] = None,
+                 block_cache_size: int = 8) -> None:
+        self.dump_path = os.fspath(dump_path)
+        if multistream_index_path is None:
+            multistream_index_path = re.sub(r"\.xml\.bz2$", "", self.dump_path) + "-index.txt.bz2"
+        self.multistream_index_path = os.fspath(multistream_index_path)
+        self.index_path = os.fspath(index_path) if index_path is not None else self.dump_path + ".index.sqlite"
+        self.block_cache_size = block_cache_size
+        self._blocks: "OrderedDict[int, dict]" = OrderedDict()
+        self._blocks_lock = threading.Lock()
+        self._local = threading.local()
+
+        if not os.path.exists(self.index_path):
+            self.build_index()
+
+    def build_index(self) -> None:
+        """
+        Build the SQLite title index from the companion multistream index file.
+
+        Each line of the companion file has the form ``offset:page_id:title``. Offsets
+        appear in increasing order, so the end of each stream is the offset of the next
+        one, and the last stream ends where the dump file ends. The index is written to
+        a temporary file and moved into place once complete.
+        """
+        temporary_path = self.index_path + ".tmp"
+        if os.path.exists(temporary_path):
+            os.remove(temporary_path)
+        connection = sqlite3.connect(temporary_path)
+        connection.execute("PRAGMA journal_mode=OFF")
+        connection.execute("PRAGMA synchronous=OFF")
+        connection.execute("CREATE TABLE titles (title TEXT PRIMARY KEY, offset INTEGER NOT NULL) WITHOUT ROWID")
+        connection.execute("CREATE TABLE blocks (offset INTEGER PRIMARY KEY, end INTEGER NOT NULL)")
+
+        def rows(blocks):
+            with bz2.open(self.multistream_index_path, "rt", encoding="utf-8") as index_file:
+                for line in index_file:
+                    offset, _, title = line.rstrip("\n").split(":", 2)
+                    offset = int(offset)
+                    if not blocks or blocks[-1] != offset:
+                        blocks.append(offset)
+                    yield title, offset
+
+        blocks = []
+        connection.executemany("INSERT OR IGNORE INTO titles VALUES (?, ?)", rows(blocks))
+        ends = blocks[1:] + [os.path.getsize(self.dump_path)]
+        connection.executemany("INSERT INTO blocks VALUES (?, ?)", zip(blocks, ends))
+        connection.commit()
+        connection.close()
+        os.replace(temporary_path, self.index_path)
+
+    def _connection(self) -> sqlite3.Connection:
+        """
+        Get the read-only, memory-mapped index connection of the current thread.
+
+        Returns:
+            sqlite3.Connection: The connection of the current thread.
+        """
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(f"file:{self.index_path}?mode=ro", uri=True)
+            connection.execute(f"PRAGMA mmap_size={INDEX_MMAP_SIZE}")
+            self._local.connection = connection
+        return connection
+
+    def _block(self, offset: int) -> dict:
+        """
+        Decompress the stream starting at offset and map its titles to pages.
+
+        Args:
+            offset (int): The byte offset of the stream in the dump.
+
+        Returns:
+            dict: A dictionary mapping each title in the stream to its page element.
+        """
+        with self._blocks_lock:
+            if offset in self._blocks:
+                self._blocks.move_to_end(offset)
+                return self._blocks[offset]
+
+        end = self._connection().execute("SELECT end FROM blocks WHERE offset = ?", (offset,)).fetchone()[0]
+        with open(self.dump_path, "rb") as dump_file:
+            dump_file.seek(offset)
+            data = bz2.BZ2Decompressor().decompress(dump_file.read(end - offset))
+        root = etree.fromstring(b"<pages>" + data + b"</pages>", etree.XMLParser(huge_tree=True))
+        pages = {page.findtext("title"): page for page in root.iter("page")}
+
+        with self._blocks_lock:
+            self._blocks[offset] = pages
+            while len(self._blocks) > self.block_cache_size:
+                self._blocks.popitem(last=False)
+        return pages
+
+    def page_wikitext(self, title: str) -> str:
+        """
+        Get the raw wikitext of a page, following redirects.
+
+        Args:
+            title (str): The page title or compound name.
+
+        Returns:
+            str: The wikitext of the page.
+
+        Raises:
+            WikipediaPageNotFoundError: If the page does not exist.
+            LookupError: If the page redirects too many times.
+        """
+        title = normalize_title(title)
+        for _ in range(MAX_REDIRECTS + 1):
+            row = self._connection().execute("SELECT offset FROM titles WHERE title = ?", (title,)).fetchone()
+            if row is None:
+                raise WikipediaPageNotFoundError(f"Page id \"{title}\" does not match any pages.")
+            page = self._block(row[0]).get(title)
+            if page is None:
+                raise LookupError(f"Page \"{title}\" is missing from its dump stream.")
+            redirect = page.find("redirect")
+            if redirect is None:
+                return page.findtext("revision/text") or ""
+            title = normalize_title(redirect.get("title"))
+        raise LookupError(f"Too many redirects for \"{title}\".")
+
+    def retrieve(self, drug: str, max_chars: Optional[int] = None, intro_only: bool = False) -> str:
+        """
+        Retrieve the cleaned plain text of a compound's Wikipedia page from the dump.
+
+        Args:
+            drug (str): The name of the compound to look up.
+            max_chars (int, optional): Maximum length of the returned content, as for
+                                       ``wikipedia_retrieve``. Defaults to None (no limit).
+            intro_only (bool, optional): Whether to return only the lead section, the text
+                                         before the first heading. Defaults to False.
+
+        Returns:
+            str: The processed Wikipedia content with cleaned formatting.
+
+        Raises:
+            WikipediaPageNotFoundError: If the page does not exist.
+            WikipediaDisambiguationError: If the page is a disambiguation page.
+            WikipediaRetrievalError: If the page cannot be read.
+        """
+        try:
+            wikitext = self.page_wikitext(drug)
+            if _DISAMBIGUATION_PATTERN.search(wikitext):
+                raise WikipediaDisambiguationError(f"\"{drug}\" may refer to multiple pages.")
+            if intro_only:
+                heading = _HEADING_PATTERN.search(wikitext)
+                if heading is not None:
+                    wikitext = wikitext[:heading.start()]
+            return _clean_wikipedia_text(wikitext_to_text(wikitext), max_chars)
+        except Exception as e:
+            raise _wikipedia_error(e)(f"Failed to retrieve Wikipedia content for '{drug}': {str(e)}")
+
+    def close(self) -> None:
+        """
+        Close the index connection of the current thread and drop cached streams.
+        """
+        connection = getattr(self._local, "connection", None)
+        if connection is not None:
+            connection.close()
+            self._local.connection = None
+        with self._blocks_lock:
+            self._blocks.clear()
+
+
+class PubMedIndex:
+    """
+    Offline PubMed backend backed by a local SQLite FTS5 full-text index.
+
+    The index holds the title and abstract of every article, keyed by PMID, and is
+    filled by streaming the PubMed baseline and update files (``pubmedYYnNNNN.xml.gz``)
+    through ``ingest``. Update files may be ingested after the baseline: revised
+    articles replace their previous version and ``DeleteCitation`` entries remove
+    articles. Lookups answer the same title query as ``pubmed_retrieve``, ordered by
+    BM25 relevance and limited to ``retmax`` articles, and return the abstracts in
+    the same format.
+
+    Args:
+        path (str): Path of the SQLite index file. Created if it does not exist.
+        retmax (int, optional): Maximum number of articles returned per lookup without a
+                                PubMedQuery. Defaults to SEARCH_PARAMS['retmax'].
+
+    Example:
+        >>> index = PubMedIndex("pubmed.sqlite")
+        >>> index.ingest(glob.glob("baseline/pubmed*.xml.gz"))
+        >>> source, content = retrieve("aspirin", priority="PUBMED", pubmed_backend=index)
+    """
+
+    def __init__(self, path: str, retmax: Optional[int] = None) -> None:
+        self.path = os.fspath(path)
+        self.retmax = retmax
+        self._local = threading.local()
+
+        connection = self._connection()
+        with connection:
+            connection.execute("CREATE VIRTUAL TABLE IF NOT EXISTS articles USING fts5(title, abstract)")
+
+    def _connection(self) -> sqlite3.Connection:
+        """
+        Get the SQLite connection of the current thread, opening it if needed.
+
+        Returns:
+            sqlite3.Connection: The connection of the current thread.
+        """
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute(f"PRAGMA mmap_size={INDEX_MMAP_SIZE}")
+            self._local.connection = connection
+        return connection
+
+    def ingest(self, paths: Union[str, Iterable[str]]) -> int:
+        """
+        Stream PubMed baseline or update XML files into the index.
+
+        Files are parsed incrementally and every article is cleared once written, so
+        memory use stays flat regardless of file size. Gzip-compressed files are read
+        transparently.
+
+        Args:
+            paths (Union[str, Iterable[str]]): One path or several paths of PubMed XML
+                                               files, ingested in the given order.
+
+        Returns:
+            int: The number of articles added or replaced.
+        """
+        if isinstance(paths, (str, os.PathLike)):
+            paths = [paths]
+
+        connection = self._connection()
+        ingested = 0
+        for path in paths:
+            opener = gzip.open if os.fspath(path).endswith(".gz") else open
+            with opener(path, "rb") as xml_file:
+                rows = []
+                for _, element in etree.iterparse(xml_file, tag=("PubmedArticle", "DeleteCitation")):
+                    if element.tag == "DeleteCitation":
+                        # Write pending articles first, so a deletion also removes
+                        # an article added or revised earlier in the same file
+                        ingested += self._write(rows)
+                        with connection:
+                            connection.executemany("DELETE FROM articles WHERE rowid = ?",
+                                                   [(int(pmid.text),) for pmid in element.iter("PMID")])
+                    else:
+                        rows.append(_pubmed_article_row(element))
+                    element.clear()
+                    while element.getprevious() is not None:
+                        del element.getparent()[0]
+                    if len(rows) >= INGEST_BATCH_SIZE:
+                        ingested += self._write(rows)
+                ingested += self._write(rows)
+        return ingested
+
+    def _write(self, rows: list) -> int:
+        """
+        Insert or replace a batch of articles in one transaction and empty the batch.
+
+        Args:
+            rows (list): The (pmid, title, abstract) rows to write.
+
+        Returns:
+            int: The number of rows written.
+        """
+        count = len(rows)
+        if count:
+            connection = self._connection()
+            with connection:
+                connection.executemany("INSERT OR REPLACE INTO articles(rowid, title, abstract) VALUES (?, ?, ?)",
+                                       rows)
+            rows.clear()
+        return count
+
+    def search(self, 
+               drug: str, 
+               retmax: Optional[int] = None, 
+               field: Optional[str] = "ti", 
+               retstart: int = 0) -> list:
+        """
+        Search article titles for a compound, most relevant first.
+
+        Args:
+            drug (str): The name of the compound to search for in titles.
+            retmax (int, optional): Maximum number of articles returned. Defaults to the
+                                    retmax of the index.
+            field (str, optional): Search field, "ti" (titles), "tiab" (titles and abstracts)
+                                   or None (all fields). Defaults to "ti".
+            retstart (int, optional): Number of matching articles skipped. Defaults to 0.
+
+        Returns:
+            list: The (pmid, title, abstract) rows of the matching articles.
+
+        Raises:
+            ValueError: If the field is not supported by the index.
+        """
+        if field not in _PUBMED_FIELD_COLUMNS:
+            raise ValueError(f"The offline PubMed index cannot search the field {field!r}")
+        if retmax is None:
+            retmax = self.retmax if self.retmax is not None else int(SEARCH_PARAMS['retmax'])
+        query = _PUBMED_FIELD_COLUMNS[field] + '"' + drug.replace('"', '""') + '"'
+        return self._connection().execute(
+            "SELECT rowid, title, abstract FROM articles WHERE articles MATCH ? ORDER BY rank LIMIT ? OFFSET ?",
+            (query, retmax, retstart)
+            ).fetchall()
+
+    def check_query(self, query: PubMedQuery) -> None:
+        """
+        Check that the index can answer a PubMed search the way PubMed would.
+
+        The index holds no dates and only ranks by relevance, so queries with a date
+        range or another sort order are rejected rather than answered differently
+        from PubMed.
+
+        Args:
+            query (PubMedQuery): The PubMed search.
+
+        Raises:
+            ValueError: If the query uses a field, sort order or date range the index
+                        does not support.
+        """
+        if query.field not in _PUBMED_FIELD_COLUMNS:
+            raise ValueError(f"The offline PubMed index cannot search the field {query.field!r}")
+        if query.sort != "relevance" or query.mindate is not None:
+            raise ValueError("The offline PubMed index only supports relevance order without a date range")
+
+    def retrieve(self, drug: str, query: Optional[PubMedQuery] = None) -> str:
+        """
+        Retrieve the abstracts of the most relevant articles whose title mentions a compound.
+
+        With a query, its retmax, retstart and field are honored in place of the index
+        defaults. Abstracts are joined like ``pubmed_retrieve`` joins them.
+
+        Args:
+            drug (str): The name of the compound to search for in PubMed titles.
+            query (PubMedQuery, optional): The PubMed search. Defaults to a title search for
+                                           the retmax of the index.
+
+        Returns:
+            str: Concatenated abstract texts, or 'NO_RESULTS' if no articles were found.
+
+        Raises:
+            PubMedSearchResultsError: If the index cannot be searched.
+            ValueError: If the query is not supported by the index (see ``check_query``).
+        """
+        if query is not None:
+            self.check_query(query)
+        try:
+            if query is None:
+                rows = self.search(drug)
+            else:
+                rows = self.search(drug, query.retmax, query.field, query.retstart)
+        except sqlite3.Error:
+            raise PubMedSearchResultsError()
+        if len(rows) == 0:
+            return 'NO_RESULTS'
+        return _join_abstracts(abstract.strip() for _, _, abstract in rows if abstract.strip())
+
+    def __len__(self) -> int:
+        return self._connection().execute("SELECT COUNT(*) FROM articles").fetchone()[0]
+
+    def close(self) -> None:
+        """
+        Close the connection of the current thread.
+        """
+        connection = getattr(self._local, "connection", None)
+        if connection is not None:
+            connection.close()
+            self._local.connection = None
+
+
+def _pubmed_article_row(article: etree._Element) -> tuple:
+    """
+    Extract the PMID, title and abstract of a PubmedArticle element.
+
+    Abstract sections are concatenated the way ``pubmed_retrieve`` concatenates them.
+
+    Args:
+        article (etree._Element): The PubmedArticle element.
+
+    Returns:
+        tuple: The (pmid, title, abstract) row.
+    """
+    pmid = int(article.findtext("MedlineCitation/PMID"))
+    title_element = article.find("MedlineCitation/Article/ArticleTitle")
+    title = "".join(title_element.itertext()) if title_element is not None else ""
+    abstract = _join_abstracts(text for text in map(_abstract_text, article.iter("AbstractText"))
+                               if text is not None)
+    return pmid, title, abstract
@@ -0,0 +1,147 @@
+"""
+Rate limiting module for chemsource.
+
+This module provides a token-bucket rate limiter and the process-wide limiters
+that keep all NCBI E-utilities requests within the published rate limits of
+3 requests per second without an API key and 10 requests per second with one.
+"""
+
+from typing import Dict, Optional
+import asyncio
+import threading
+import time
+
+#: NCBI E-utilities requests per second allowed without an API key
+NCBI_RATE_WITHOUT_KEY = 3.0
+
+#: NCBI E-utilities requests per second allowed with an API key
+NCBI_RATE_WITH_KEY = 10.0
+
+
+class RateLimiter:
+    """
+    Thread- and asyncio-safe token-bucket rate limiter.
+
+    Each call to ``acquire`` (or ``aacquire`` from a coroutine) takes one token from
+    the bucket, waiting until a token is available if necessary. Tokens are reserved
+    under a lock and the wait happens outside of it, so threads and coroutines
+    sharing a limiter are served in arrival order without blocking each other while
+    sleeping.
+
+    Args:
+        rate (float): Number of tokens added to the bucket per second.
+        burst (int, optional): Maximum number of tokens the bucket can hold, i.e. the
+                               number of calls allowed back to back. Defaults to 1.
+
+    Attributes:
+        rate (float): The refill rate in tokens per second.
+        burst (int): The bucket capacity.
+        calls (int): Number of tokens handed out so far.
+        total_wait (float): Cumulative seconds callers have waited for tokens.
+        max_wait (float): Longest single wait in seconds.
+
+    Example:
+        >>> limiter = RateLimiter(rate=3)
+        >>> waited = limiter.acquire()
+        >>> print(limiter.stats())
+    """
+
+    def __init__(self, rate: float, burst: int = 1) -> None:
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        if burst < 1:
+            raise ValueError("burst must be at least 1")
+
+        self.rate = rate
+        self.burst = burst
+        self.calls = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self._interval = 1.0 / rate
+        self._next_free = time.monotonic() - burst * self._interval
+        self._lock = threading.Lock()
+
+    def _reserve(self) -> float:
+        """
+        Reserve one token and return how long the caller must wait before using it.
+
+        Returns:
+            float: Seconds to wait before the reserved token becomes available.
+        """
+        with self._lock:
+            now = time.monotonic()
+            earliest = max(self._next_free, now - (self.burst - 1) * self._interval)
+            delay = max(0.0, earliest - now)
+            self._next_free = earliest + self._interval
+            self.calls += 1
+            self.total_wait += delay
+            self.max_wait = max(self.max_wait, delay)
+            return delay
+
+    def acquire(self) -> float:
+        """
+        Take one token, blocking the current thread until it is available.
+
+        Returns:
+            float: Seconds the caller waited.
+        """
+        delay = self._reserve()
+        if delay > 0:
+            time.sleep(delay)
+        return delay
+
+    async def aacquire(self) -> float:
+        """
+        Take one token, suspending the current coroutine until it is available.
+
+        Returns:
+            float: Seconds the caller waited.
+        """
+        delay = self._reserve()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        return delay
+
+    def stats(self) -> dict:
+        """
+        Get the usage statistics of the limiter.
+
+        Returns:
+            dict: The rate, number of calls, and total, mean and maximum wait in seconds.
+        """
+        with self._lock:
+            return {"rate": self.rate,
+                    "calls": self.calls,
+                    "total_wait": self.total_wait,
+                    "mean_wait": self.total_wait / self.calls if self.calls else 0.0,
+                    "max_wait": self.max_wait
+                    }
+
+
+_ncbi_limiters: Dict[Optional[str], RateLimiter] = {}
+_ncbi_limiters_lock = threading.Lock()
+
+
+def get_ncbi_limiter(ncbikey: Optional[str] = None) -> RateLimiter:
+    """
+    Get the process-wide rate limiter for NCBI E-utilities requests.
+
+    Requests without an API key share one limiter at 3 requests per second. Each
+    API key gets its own limiter at 10 requests per second, matching the NCBI
+    policy of counting requests per key.
+
+    Args:
+        ncbikey (str, optional): API key for NCBI/PubMed access.
+
+    Returns:
+        RateLimiter: The shared limiter for the given key.
+
+    Example:
+        >>> get_ncbi_limiter("your_ncbi_key").stats()["rate"]
+        10.0
+    """
+    with _ncbi_limiters_lock:
+        if ncbikey not in _ncbi_limiters:
+            rate = NCBI_RATE_WITHOUT_KEY if ncbikey is None else NCBI_RATE_WITH_KEY
+            _ncbi_limiters[ncbikey] = RateLimiter(rate)
+        return _ncbi_limiters[ncbikey]
@@ -0,0 +1,569 @@
+"""
+Record/replay module for chemsource.
+
+This module provides transports and a model client that record real request and
+response pairs to a cassette file and replay them later without network access,
+optionally with simulated latency and injected failures. Passing a replaying
+CassetteTransport, AsyncCassetteTransport and CassetteClient to ``retrieve``,
+``aretrieve`` or ``ChemSource`` makes lookups and classifications deterministic,
+so their performance can be measured offline and compared between versions.
+NCBI API keys are neither written to cassettes nor used to match requests.
+"""
+
+from typing import Optional, Dict, Any, List, Tuple, AsyncIterator
+from contextlib import asynccontextmanager
+from http import HTTPStatus
+from types import SimpleNamespace
+import asyncio
+import base64
+import json
+import os
+import random
+import threading
+import time
+
+import httpx
+import requests
+from requests.structures import CaseInsensitiveDict
+
+from .transport import Transport, AsyncTransport
+from .exceptions import CassetteMissError, RetryableError
+
+#: Mode writing every request and response to the cassette
+MODE_RECORD = "record"
+
+#: Mode answering every request from the cassette
+MODE_REPLAY = "replay"
+
+#: Request parameters neither stored in cassettes nor used to match requests
+REDACTED_PARAMS = frozenset({"api_key"})
+
+#: Response headers not stored, since cassettes hold decoded bodies
+_DROPPED_HEADERS = frozenset({"content-encoding", "content-length", "transfer-encoding", "connection"})
+
+
+class Cassette:
+    """
+    Thread-safe store of recorded interactions, optionally backed by a JSON file.
+
+    Interactions are matched by kind and request. When the same request was recorded
+    several times its responses are replayed in recording order, and the last one is
+    repeated once they are used up, so a cassette can be replayed any number of times.
+
+    Args:
+        path (str, optional): JSON file the cassette is loaded from, if it exists, and
+                              saved to. Defaults to None (in memory only).
+
+    Example:
+        >>> with Cassette("aspirin.json") as cassette:
+        ...     retrieve("aspirin", transport=CassetteTransport(cassette, mode=MODE_RECORD))
+        >>> retrieve("aspirin", transport=CassetteTransport(Cassette("aspirin.json")))
+    """
+
+    def __init__(self, path: Optional[str] = None) -> None:
+        self.path = path
+        self.interactions: List[dict] = []
+        self._lock = threading.Lock()
+        self._index: Dict[str, List[int]] = {}
+        self._positions: Dict[str, int] = {}
+        if path is not None and os.path.exists(path):
+            with open(path, encoding="utf-8") as cassette_file:
+                for interaction in json.load(cassette_file)["interactions"]:
+                    self._add(interaction)
+
+    def record(self, kind: str, request: dict, response: dict, elapsed: float) -> None:
+        """
+        Add an interaction.
+
+        Args:
+            kind (str): The kind of interaction, "http" or "chat".
+            request (dict): The JSON-serializable request.
+            response (dict): The JSON-serializable response.
+            elapsed (float): The duration of the interaction in seconds.
+        """
+        with self._lock:
+            self._add({"kind": kind, "request": request, "response": response, "elapsed": elapsed})
+
+    def play(self, kind: str, request: dict) -> dict:
+        """
+        Get the next recorded interaction for a request.
+
+        Args:
+            kind (str): The kind of interaction, "http" or "chat".
+            request (dict): The JSON-serializable request.
+
+        Returns:
+            dict: The interaction, with its "response" and "elapsed" seconds.
+
+        Raises:
+            CassetteMissError: If the request was not recorded.
+        """
+        key = _match_key(kind, request)
+        with self._lock:
+            positions = self._index.get(key)
+            if positions is None:
+                raise CassetteMissError(f"No {kind} interaction recorded for {request}")
+            position = self._positions.get(key, 0)
+            self._positions[key] = position + 1
+            return self.interactions[positions[min(position, len(positions) - 1)]]
+
+    def rewind(self) -> None:
+        """
+        Replay every request from its first recorded response again.
+        """
+        with self._lock:
+            self._positions.clear()
+
+    def save(self, path: Optional[str] = None) -> None:
+        """
+        Write the cassette to a JSON file.
+
+        Args:
+            path (str, optional): The file to write. Defaults to the cassette's path.
+
+        Raises:
+            ValueError: If neither path nor the cassette's path is set.
+        """
+        path = path if path is not None else self.path
+        if path is None:
+            raise ValueError("A path is required to save an in-memory cassette")
+        with self._lock:
+            content = json.dumps({"interactions": self.interactions}, indent=1)
+        with open(path, "w", encoding="utf-8") as cassette_file:
+            cassette_file.write(content)
+
+    def __len__(self) -> int:
+        return len(self.interactions)
+
+    def __enter__(self) -> "Cassette":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        if self.path is not None:
+            self.save()
+
+    def _add(self, interaction: dict) -> None:
+        key = _match_key(interaction["kind"], interaction["request"])
+        self._index.setdefault(key, []).append(len(self.interactions))
+        self.interactions.append(interaction)
+
+
+class _Player:
+    """
+    Replay settings shared by the cassette transports and client.
+
+    Attributes:
+        injected (int): Number of failures injected so far.
+    """
+
+    def __init__(self,
+                 cassette: Cassette,
+                 mode: str,
+                 latency: float,
+                 latency_scale: Optional[float],
+                 error_rate: float,
+                 seed: Optional[int]) -> None:
+        if mode not in (MODE_RECORD, MODE_REPLAY):
+            raise ValueError(f"mode must be {MODE_RECORD!r} or {MODE_REPLAY!r}")
+        if latency < 0 or (latency_scale is not None and latency_scale < 0):
+            raise ValueError("latency and latency_scale must not be negative")
+        if not 0 <= error_rate <= 1:
+            raise ValueError("error_rate must be between 0 and 1")
+
+        self.cassette = cassette
+        self.mode = mode
+        self.latency = latency
+        self.latency_scale = latency_scale
+        self.error_rate = error_rate
+        self.injected = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def inject(self) -> bool:
+        """
+        Decide whether the current replayed request fails.
+        """
+        with self._lock:
+            failed = self._random.random() < self.error_rate
+            self.injected += int(failed)
+        return failed
+
+    def delay(self, interaction: Optional[dict]) -> float:
+        """
+        Get the simulated latency of a replayed interaction in seconds.
+        """
+        delay = self.latency
+        if self.latency_scale is not None and interaction is not None:
+            delay += self.latency_scale * interaction["elapsed"]
+        return delay
+
+
+class CassetteTransport(Transport):
+    """
+    Transport recording to, or replaying from, a cassette.
+
+    In record mode every request is sent over the pooled session and stored with its
+    response and duration. In replay mode no request leaves the process: responses
+    come from the cassette after the simulated latency, and a share of the requests
+    can be failed on purpose to exercise retries, circuit breakers and fallbacks.
+
+    Args:
+        cassette (Cassette): The cassette to record to or replay from.
+        mode (str, optional): MODE_RECORD or MODE_REPLAY. Defaults to MODE_REPLAY.
+        latency (float, optional): Seconds added to every replayed request. Defaults to 0.
+        latency_scale (float, optional): Factor applied to the recorded duration of each
+                                         request and added to its latency; 1.0 replays at
+                                         recorded speed. Defaults to None (not used).
+        error_rate (float, optional): Probability that a replayed request fails. Defaults to 0.
+        error_status (int, optional): HTTP status of the response returned for an injected
+                                      failure, e.g. 503. Defaults to None (raise a timeout).
+        seed (int, optional): Seed of the injected failures. Defaults to None.
+        **kwargs: Further arguments for Transport.
+
+    Raises:
+        ValueError: If mode, latency or error_rate is invalid.
+
+    Example:
+        >>> transport = CassetteTransport(Cassette("run.json"), latency_scale=1.0, error_rate=0.1, seed=0)
+        >>> source, content = retrieve("aspirin", transport=transport)
+    """
+
+    def __init__(self,
+                 cassette: Cassette,
+                 mode: str = MODE_REPLAY,
+                 latency: float = 0.0,
+                 latency_scale: Optional[float] = None,
+                 error_rate: float = 0.0,
+                 error_status: Optional[int] = None,
+                 seed: Optional[int] = None,
+                 **kwargs: Any) -> None:
+        super().__init__(**kwargs)
+        self.player = _Player(cassette, mode, latency, latency_scale, error_rate, seed)
+        self.error_status = error_status
+
+    def request(self,
+                method: str,
+                url: str,
+                params: Optional[Dict[str, Any]] = None,
+                data: Optional[Dict[str, Any]] = None,
+                stream: bool = False) -> requests.Response:
+        """
+        Send, or replay, an HTTP request.
+
+        Args:
+            method (str): The HTTP method, e.g. "GET" or "POST".
+            url (str): The URL to request.
+            params (Dict[str, Any], optional): Query string parameters.
+            data (Dict[str, Any], optional): Form-encoded request body.
+            stream (bool, optional): Whether to defer downloading the body. Recorded and
+                                     replayed bodies are always read in full.
+
+        Returns:
+            requests.Response: The live or replayed response.
+
+        Raises:
+            requests.Timeout: If a timeout is injected.
+            CassetteMissError: If the request was not recorded.
+        """
+        request = _http_request(method, url, params, data)
+        if self.player.mode == MODE_RECORD:
+            started = time.monotonic()
+            response = super().request(method, url, params=params, data=data, stream=stream)
+            self.player.cassette.record("http", request, _http_response(response.status_code,
+                                                                          response.headers,
+                                                                          response.content),
+                                        time.monotonic() - started)
+            return response
+
+        interaction, failed = _replay(self.player, "http", request, self.error_status is None)
+        time.sleep(self.player.delay(interaction))
+        if failed:
+            raise requests.Timeout(f"Injected timeout for {url}")
+        recorded = interaction["response"] if interaction is not None else _http_response(self.error_status, {}, b"")
+        return _requests_response(method, url, params, data, recorded)
+
+
+class AsyncCassetteTransport(AsyncTransport):
+    """
+    Asyncio counterpart of CassetteTransport.
+
+    Args:
+        cassette (Cassette): The cassette to record to or replay from.
+        mode (str, optional): MODE_RECORD or MODE_REPLAY. Defaults to MODE_REPLAY.
+        latency (float, optional): Seconds added to every replayed request. Defaults to 0.
+        latency_scale (float, optional): Factor applied to the recorded duration of each
+                                         request and added to its latency. Defaults to None.
+        error_rate (float, optional): Probability that a replayed request fails. Defaults to 0.
+        error_status (int, optional): HTTP status of the response returned for an injected
+                                      failure. Defaults to None (raise a timeout).
+        seed (int, optional): Seed of the injected failures. Defaults to None.
+        **kwargs: Further arguments for AsyncTransport.
+
+    Raises:
+        ValueError: If mode, latency or error_rate is invalid.
+
+    Example:
+        >>> transport = AsyncCassetteTransport(Cassette("run.json"), latency=0.05)
+        >>> source, content = await aretrieve("aspirin", transport=transport)
+    """
+
+    def __init__(self,
+                 cassette: Cassette,
+                 mode: str = MODE_REPLAY,
+                 latency: float = 0.0,
+                 latency_scale: Optional[float] = None,
+                 error_rate: float = 0.0,
+                 error_status: Optional[int] = None,
+                 seed: Optional[int] = None,
+                 **kwargs: Any) -> None:
+        super().__init__(**kwargs)
+        self.player = _Player(cassette, mode, latency, latency_scale, error_rate, seed)
+        self.error_status = error_status
+
+    async def request(self,
+                      method: str,
+                      url: str,
+                      params: Optional[Dict[str, Any]] = None,
+                      data: Optional[Dict[str, Any]] = None) -> httpx.Response:
+        """
+        Send, or replay, an HTTP request.
+
+        Args:
+            method (str): The HTTP method, e.g. "GET" or "POST".
+            url (str): The URL to request.
+            params (Dict[str, Any], optional): Query string parameters.
+            data (Dict[str, Any], optional): Form-encoded request body.
+
+        Returns:
+            httpx.Response: The live or replayed response.
+
+        Raises:
+            httpx.ReadTimeout: If a timeout is injected.
+            CassetteMissError: If the request was not recorded.
+        """
+        request = _http_request(method, url, params, data)
+        if self.player.mode == MODE_RECORD:
+            started = time.monotonic()
+            response = await super().request(method, url, params=params, data=data)
+            self.player.cassette.record("http", request, _http_response(response.status_code,
+                                                                          response.headers,
+                                                                          response.content),
+                                        time.monotonic() - started)
+            return response
+
+        interaction, failed = _replay(self.player, "http", request, self.error_status is None)
+        await asyncio.sleep(self.player.delay(interaction))
+        http_request = httpx.Request(method, url, params=params, data=data)
+        if failed:
+            raise httpx.ReadTimeout(f"Injected timeout for {url}", request=http_request)
+        recorded = interaction["response"] if interaction is not None else _http_response(self.error_status, {}, b"")
+        return httpx.Response(recorded["status"],
+                              headers=recorded["headers"],
+                              content=_body(recorded),
+                              request=http_request)
+
+    @asynccontextmanager
+    async def stream(self,
+                     method: str,
+                     url: str,
+                     params: Optional[Dict[str, Any]] = None,
+                     data: Optional[Dict[str, Any]] = None) -> AsyncIterator[httpx.Response]:
+        """
+        Send, or replay, an HTTP request whose body is read incrementally.
+
+        Recorded and replayed bodies are read in full and then served in chunks.
+
+        Args:
+            method (str): The HTTP method, e.g. "GET" or "POST".
+            url (str): The URL to request.
+            params (Dict[str, Any], optional): Query string parameters.
+            data (Dict[str, Any], optional): Form-encoded request body.
+
+        Returns:
+            AsyncIterator[httpx.Response]: A context manager yielding the response.
+        """
+        yield await self.request(method, url, params=params, data=data)
+
+
+class CassetteClient:
+    """
+    OpenAI-compatible model client recording to, or replaying from, a cassette.
+
+    The client exposes ``chat.completions.create`` like an OpenAI client and can be
+    passed to ``ChemSource`` or ``classify`` as ``custom_client``. In record mode
+    calls are forwarded to the wrapped client; in replay mode completions come from
+    the cassette as objects with the same attributes. Since ``classify`` sends
+    custom clients a user message, recordings must be made through this client too.
+
+    Args:
+        cassette (Cassette): The cassette to record to or replay from.
+        client (Any, optional): The real client, required in record mode.
+        mode (str, optional): MODE_RECORD or MODE_REPLAY. Defaults to MODE_REPLAY.
+        latency (float, optional): Seconds added to every replayed call. Defaults to 0.
+        latency_scale (float, optional): Factor applied to the recorded duration of each
+                                         call and added to its latency. Defaults to None.
+        error_rate (float, optional): Probability that a replayed call raises RetryableError.
+                                      Defaults to 0.
+        seed (int, optional): Seed of the injected failures. Defaults to None.
+
+    Raises:
+        ValueError: If mode, latency or error_rate is invalid, or if no client is given
+                    in record mode.
+
+    Example:
+        >>> client = CassetteClient(Cassette("run.json"), latency_scale=1.0)
+        >>> chem = ChemSource(custom_client=client, transport=CassetteTransport(client.player.cassette))
+    """
+
+    def __init__(self,
+                 cassette: Cassette,
+                 client: Optional[Any] = None,
+                 mode: str = MODE_REPLAY,
+                 latency: float = 0.0,
+                 latency_scale: Optional[float] = None,
+                 error_rate: float = 0.0,
+                 seed: Optional[int] = None) -> None:
+        if mode == MODE_RECORD and client is None:
+            raise ValueError("A client is required to record model calls")
+        self.player = _Player(cassette, mode, latency, latency_scale, error_rate, seed)
+        self.client = client
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    def create(self, **kwargs: Any) -> Any:
+        """
+        Create, or replay, a chat completion.
+
+        Args:
+            **kwargs: The arguments of ``chat.completions.create``.
+
+        Returns:
+            Any: The live completion, or the replayed completion as nested objects.
+
+        Raises:
+            RetryableError: If a failure is injected.
+            CassetteMissError: If the call was not recorded.
+        """
+        request = json.loads(json.dumps(kwargs, default=str))
+        if self.player.mode == MODE_RECORD:
+            started = time.monotonic()
+            response = self.client.chat.completions.create(**kwargs)
+            self.player.cassette.record("chat", request, _completion_dict(response), time.monotonic() - started)
+            return response
+
+        interaction, failed = _replay(self.player, "chat", request, True)
+        time.sleep(self.player.delay(interaction))
+        if failed:
+            raise RetryableError("Injected model failure")
+        return _namespace(interaction["response"])
+
+
+def _match_key(kind: str, request: dict) -> str:
+    """
+    Serialize an interaction kind and request into a matching key.
+    """
+    return json.dumps([kind, request], sort_keys=True, default=str)
+
+
+def _replay(player: _Player, kind: str, request: dict, raise_failure: bool) -> Tuple[Optional[dict], bool]:
+    """
+    Look up a replayed interaction, unless a failure is injected.
+
+    Args:
+        player (_Player): The replay settings.
+        kind (str): The kind of interaction.
+        request (dict): The request.
+        raise_failure (bool): Whether an injected failure raises, rather than replacing
+                              the response.
+
+    Returns:
+        Tuple[Optional[dict], bool]: The interaction (None if an injected failure replaces
+                                     it) and whether the request should raise.
+    """
+    if player.inject():
+        return None, raise_failure
+    return player.cassette.play(kind, request), False
+
+
+def _pairs(values: Optional[Dict[str, Any]]) -> Optional[List[List[str]]]:
+    """
+    Get the sorted, redacted name/value pairs of request parameters.
+    """
+    if values is None:
+        return None
+    return sorted([str(name), str(value)] for name, value in values.items() if name not in REDACTED_PARAMS)
+
+
+def _http_request(method: str,
+                  url: str,
+                  params: Optional[Dict[str, Any]],
+                  data: Optional[Dict[str, Any]]) -> dict:
+    """
+    Describe an HTTP request for storing and matching.
+    """
+    return {"method": method.upper(), "url": url, "params": _pairs(params), "data": _pairs(data)}
+
+
+def _http_response(status: int, headers: Any, content: bytes) -> dict:
+    """
+    Describe an HTTP response for storing, as text when the body is UTF-8.
+    """
+    response = {"status": status,
+                "headers": {name: value for name, value in headers.items() if name.lower() not in _DROPPED_HEADERS}}
+    try:
+        response["body"] = content.decode("utf-8")
+    except UnicodeDecodeError:
+        response["body_base64"] = base64.b64encode(content).decode("ascii")
+    return response
+
+
+def _body(recorded: dict) -> bytes:
+    """
+    Get the body of a stored HTTP response.
+    """
+    if "body_base64" in recorded:
+        return base64.b64decode(recorded["body_base64"])
+    return recorded["body"].encode("utf-8")
+
+
+def _requests_response(method: str,
+                       url: str,
+                       params: Optional[Dict[str, Any]],
+                       data: Optional[Dict[str, Any]],
+                       recorded: dict) -> requests.Response:
+    """
+    Build a fully read ``requests.Response`` from a stored response.
+    """
+    response = requests.Response()
+    response.request = requests.Request(method, url, params=params, data=data).prepare()
+    response.url = response.request.url
+    response.status_code = recorded["status"]
+    try:
+        response.reason = HTTPStatus(recorded["status"]).phrase
+    except ValueError:
+        response.reason = ""
+    response.headers = CaseInsensitiveDict(recorded["headers"])
+    response.encoding = requests.utils.get_encoding_from_headers(response.headers)
+    response._content = _body(recorded)
+    response._content_consumed = True
+    return response
+
+
+def _completion_dict(response: Any) -> dict:
+    """
+    Convert a chat completion into a JSON-serializable dictionary.
+    """
+    if hasattr(response, "model_dump"):
+        return response.model_dump(mode="json")
+    return {"choices": [{"message": {"role": "assistant", "content": choice.message.content}}
+                        for choice in response.choices]}
+
+
+def _namespace(value: Any) -> Any:
+    """
+    Convert nested dictionaries into objects with attribute access.
+    """
+    if isinstance(value, dict):
+        return SimpleNamespace(**{name: _namespace(item) for name, item in value.items()})
+    if isinstance(value, list):
+        return [_namespace(item) for item in value]
+    return value
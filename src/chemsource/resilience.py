@@ -0,0 +1,416 @@
+"""
+Resilience module for chemsource.
+
+This module classifies retrieval errors as retryable or not, retries retryable
+failures with jittered exponential backoff, and provides per-source circuit
+breakers that skip a failing source for a cooldown window instead of paying a
+full timeout on every compound during an outage.
+"""
+
+from typing import Optional, Callable, Awaitable, Any
+import asyncio
+import random
+import threading
+import time
+
+import httpx
+import requests
+import wikipedia
+
+from .exceptions import (
+    RetryableError,
+    CircuitOpenError,
+    WikipediaPageNotFoundError,
+    WikipediaDisambiguationError
+)
+
+#: HTTP status codes after which a later attempt may succeed
+RETRYABLE_STATUS_CODES = frozenset({408, 425, 429, 500, 502, 503, 504})
+
+#: Exceptions after which a later attempt may succeed
+RETRYABLE_EXCEPTIONS = (RetryableError,
+                        requests.ConnectionError,
+                        requests.Timeout,
+                        httpx.TimeoutException,
+                        httpx.NetworkError,
+                        httpx.RemoteProtocolError,
+                        wikipedia.exceptions.HTTPTimeoutError
+                        )
+
+#: Exceptions that are never retried, even if caused by a retryable one
+NON_RETRYABLE_EXCEPTIONS = (CircuitOpenError,
+                            WikipediaPageNotFoundError,
+                            WikipediaDisambiguationError
+                            )
+
+
+def _status_code(error: BaseException) -> Optional[int]:
+    """
+    Get the HTTP status code of an HTTP error, if it is one.
+
+    Args:
+        error (BaseException): The error to inspect.
+
+    Returns:
+        Optional[int]: The status code, or None if the error is not an HTTP status error.
+    """
+    if isinstance(error, (requests.HTTPError, httpx.HTTPStatusError)):
+        return getattr(getattr(error, "response", None), "status_code", None)
+    return None
+
+
+def is_retryable(error: BaseException) -> bool:
+    """
+    Classify an error as retryable or not.
+
+    The retrieval functions wrap low-level failures in the exceptions of
+    ``chemsource.exceptions``, so the error and the chain of exceptions it was raised
+    from are inspected. Connection errors, timeouts, HTTP 408, 425, 429 and 5xx
+    responses and RetryableError subclasses are retryable. Missing and disambiguation
+    pages, open circuits, other HTTP errors and parse errors without a retryable
+    cause are not.
+
+    Args:
+        error (BaseException): The error to classify.
+
+    Returns:
+        bool: True if a later attempt may succeed.
+
+    Example:
+        >>> is_retryable(PubMedSearchXMLParseError())
+        False
+    """
+    seen = set()
+    while error is not None and id(error) not in seen:
+        seen.add(id(error))
+        if isinstance(error, NON_RETRYABLE_EXCEPTIONS):
+            return False
+        if isinstance(error, RETRYABLE_EXCEPTIONS):
+            return True
+        status = _status_code(error)
+        if status is not None:
+            return status in RETRYABLE_STATUS_CODES
+        error = error.__cause__ or error.__context__
+    return False
+
+
+def _retry_after(error: BaseException) -> Optional[float]:
+    """
+    Get the delay requested by a Retry-After header in the chain of an error.
+
+    Args:
+        error (BaseException): The error to inspect.
+
+    Returns:
+        Optional[float]: The requested delay in seconds, or None.
+    """
+    seen = set()
+    while error is not None and id(error) not in seen:
+        seen.add(id(error))
+        if _status_code(error) is not None:
+            try:
+                return float(error.response.headers["Retry-After"])
+            except (KeyError, TypeError, ValueError, AttributeError):
+                return None
+        error = error.__cause__ or error.__context__
+    return None
+
+
+class RetryPolicy:
+    """
+    Retry retryable failures with jittered exponential backoff.
+
+    The n-th retry waits a random time between 0 and ``min(max_delay, base_delay * 2**(n-1))``
+    seconds ("full jitter"), so that many workers hitting the same failure do not
+    retry in lockstep. A Retry-After header on a 429 or 503 response raises the wait
+    to the requested delay, capped at max_delay. Errors that are not retryable are
+    raised immediately.
+
+    Args:
+        max_attempts (int, optional): Maximum number of attempts, including the first.
+                                      Defaults to 3.
+        base_delay (float, optional): Backoff before the first retry in seconds. Defaults to 0.5.
+        max_delay (float, optional): Maximum backoff in seconds. Defaults to 8.0.
+        jitter (bool, optional): Whether to randomize the backoff. Defaults to True.
+
+    Attributes:
+        retries (int): Number of retries performed so far.
+
+    Example:
+        >>> policy = RetryPolicy(max_attempts=4, base_delay=1.0)
+        >>> source, content = retrieve("aspirin", retry_policy=policy)
+    """
+
+    def __init__(self,
+                 max_attempts: int = 3,
+                 base_delay: float = 0.5,
+                 max_delay: float = 8.0,
+                 jitter: bool = True) -> None:
+        if max_attempts < 1:
+            raise ValueError("max_attempts must be at least 1")
+
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.jitter = jitter
+        self.retries = 0
+        self._lock = threading.Lock()
+
+    def delay(self, attempt: int, error: Optional[BaseException] = None) -> float:
+        """
+        Get the backoff after a failed attempt.
+
+        Args:
+            attempt (int): The number of the failed attempt, starting at 1.
+            error (BaseException, optional): The error of the failed attempt.
+
+        Returns:
+            float: Seconds to wait before the next attempt.
+        """
+        backoff = min(self.max_delay, self.base_delay * 2 ** (attempt - 1))
+        if self.jitter:
+            backoff = random.uniform(0, backoff)
+        retry_after = _retry_after(error) if error is not None else None
+        if retry_after is not None:
+            backoff = max(backoff, min(retry_after, self.max_delay))
+        return backoff
+
+    def _should_retry(self, attempt: int, error: BaseException) -> bool:
+        if attempt >= self.max_attempts or not is_retryable(error):
+            return False
+        with self._lock:
+            self.retries += 1
+        return True
+
+    def call(self, func: Callable[..., Any], *args: Any) -> Any:
+        """
+        Call a function, retrying retryable failures.
+
+        Args:
+            func (Callable[..., Any]): The function to call.
+            *args (Any): Positional arguments for the function.
+
+        Returns:
+            Any: The return value of the first successful attempt.
+
+        Raises:
+            Exception: The error of the last attempt, or the first non-retryable error.
+        """
+        for attempt in range(1, self.max_attempts + 1):
+            try:
+                return func(*args)
+            except Exception as e:
+                if not self._should_retry(attempt, e):
+                    raise
+                time.sleep(self.delay(attempt, e))
+
+    async def acall(self, func: Callable[..., Awaitable[Any]], *args: Any) -> Any:
+        """
+        Await a coroutine function, retrying retryable failures.
+
+        Args:
+            func (Callable[..., Awaitable[Any]]): The coroutine function to await.
+            *args (Any): Positional arguments for the function.
+
+        Returns:
+            Any: The result of the first successful attempt.
+
+        Raises:
+            Exception: The error of the last attempt, or the first non-retryable error.
+        """
+        for attempt in range(1, self.max_attempts + 1):
+            try:
+                return await func(*args)
+            except Exception as e:
+                if not self._should_retry(attempt, e):
+                    raise
+                await asyncio.sleep(self.delay(attempt, e))
+
+
+class CircuitBreaker:
+    """
+    Thread-safe circuit breaker guarding a single source.
+
+    The breaker starts CLOSED and lets every call through. After ``failure_threshold``
+    consecutive retryable failures it opens, and calls are rejected with
+    CircuitOpenError without touching the source. Once ``cooldown`` seconds have
+    passed it becomes HALF_OPEN and lets one trial call through: success closes the
+    breaker, failure opens it for another cooldown. Non-retryable errors such as a
+    missing page show that the source is answering and count as successes.
+
+    Args:
+        name (str, optional): Name of the guarded source, used in messages. Defaults to "source".
+        failure_threshold (int, optional): Consecutive failures that open the breaker.
+                                           Defaults to 5.
+        cooldown (float, optional): Seconds the breaker stays open before a trial call.
+                                    Defaults to 30.0.
+
+    Attributes:
+        state (str): "CLOSED", "OPEN" or "HALF_OPEN".
+        failures (int): Current number of consecutive failures.
+        total_failures (int): Number of failures recorded so far.
+        rejected (int): Number of calls rejected while open.
+
+    Example:
+        >>> breakers = {"PUBMED": CircuitBreaker("PUBMED", cooldown=60)}
+        >>> source, content = retrieve("aspirin", circuit_breakers=breakers)
+        >>> print(breakers["PUBMED"].stats())
+    """
+
+    CLOSED = "CLOSED"
+    OPEN = "OPEN"
+    HALF_OPEN = "HALF_OPEN"
+
+    def __init__(self, name: str = "source", failure_threshold: int = 5, cooldown: float = 30.0) -> None:
+        if failure_threshold < 1:
+            raise ValueError("failure_threshold must be at least 1")
+
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.failures = 0
+        self.total_failures = 0
+        self.rejected = 0
+        self._state = self.CLOSED
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        """
+        The current state, "CLOSED", "OPEN" or "HALF_OPEN".
+        """
+        with self._lock:
+            if self._state == self.OPEN and time.monotonic() - self._opened_at >= self.cooldown:
+                return self.HALF_OPEN
+            return self._state
+
+    def allow(self) -> bool:
+        """
+        Check whether a call may go through, reserving the trial call when half-open.
+
+        Returns:
+            bool: True if the call may go through.
+        """
+        with self._lock:
+            if self._state == self.OPEN and time.monotonic() - self._opened_at >= self.cooldown:
+                self._state = self.HALF_OPEN
+            if self._state == self.CLOSED:
+                return True
+            if self._state == self.HALF_OPEN and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+            self.rejected += 1
+            return False
+
+    def record_success(self) -> None:
+        """
+        Record a call that reached the source, closing the breaker.
+        """
+        with self._lock:
+            self.failures = 0
+            self._state = self.CLOSED
+            self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        """
+        Record a retryable failure, opening the breaker at the threshold or after a failed trial.
+        """
+        with self._lock:
+            self.failures += 1
+            self.total_failures += 1
+            if self._state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                self._state = self.OPEN
+                self._opened_at = time.monotonic()
+            self._trial_in_flight = False
+
+    def _reject(self) -> CircuitOpenError:
+        return CircuitOpenError(f"Circuit breaker for {self.name} is open; skipping the source")
+
+    def _record(self, error: BaseException) -> None:
+        if is_retryable(error):
+            self.record_failure()
+        else:
+            self.record_success()
+
+    def call(self, func: Callable[..., Any], *args: Any) -> Any:
+        """
+        Call a function through the breaker.
+
+        Args:
+            func (Callable[..., Any]): The function to call.
+            *args (Any): Positional arguments for the function.
+
+        Returns:
+            Any: The return value of the function.
+
+        Raises:
+            CircuitOpenError: If the breaker is open.
+        """
+        if not self.allow():
+            raise self._reject()
+        try:
+            result = func(*args)
+        except Exception as e:
+            self._record(e)
+            raise
+        self.record_success()
+        return result
+
+    async def acall(self, func: Callable[..., Awaitable[Any]], *args: Any) -> Any:
+        """
+        Await a coroutine function through the breaker.
+
+        Args:
+            func (Callable[..., Awaitable[Any]]): The coroutine function to await.
+            *args (Any): Positional arguments for the function.
+
+        Returns:
+            Any: The result of the coroutine.
+
+        Raises:
+            CircuitOpenError: If the breaker is open.
+        """
+        if not self.allow():
+            raise self._reject()
+        try:
+            result = await func(*args)
+        except asyncio.CancelledError:
+            with self._lock:
+                self._trial_in_flight = False
+            raise
+        except Exception as e:
+            self._record(e)
+            raise
+        self.record_success()
+        return result
+
+    def stats(self) -> dict:
+        """
+        Get the state and statistics of the breaker.
+
+        Returns:
+            dict: The state, consecutive and total failures, rejected calls and the
+                  seconds left until a trial call is allowed.
+        """
+        state = self.state
+        with self._lock:
+            retry_in = max(0.0, self.cooldown - (time.monotonic() - self._opened_at)) if state == self.OPEN else 0.0
+            return {"name": self.name,
+                    "state": state,
+                    "failures": self.failures,
+                    "total_failures": self.total_failures,
+                    "rejected": self.rejected,
+                    "retry_in": retry_in
+                    }
+
+
+def default_circuit_breakers() -> dict:
+    """
+    Create one circuit breaker per retrieval source with the default settings.
+
+    Returns:
+        dict: A dictionary mapping "WIKIPEDIA" and "PUBMED" to their breakers.
+    """
+    return {"WIKIPEDIA": CircuitBreaker("WIKIPEDIA"), "PUBMED": CircuitBreaker("PUBMED")}
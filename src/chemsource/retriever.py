@@ -5,21 +5,46 @@ This module handles the retrieval of information from various sources such as
 PubMed and Wikipedia for chemical research purposes.
 """
 
-from typing import Optional, Tuple
+from typing import Optional, Tuple, List, Dict, Iterable, Callable, Awaitable, TYPE_CHECKING
+from concurrent.futures import ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from contextlib import AsyncExitStack
+import asyncio
 from .exceptions import (
     PubMedSearchXMLParseError, 
     PubMedSearchResultsError,
     PubMedAbstractXMLParseError, 
-    PubMedAbstractRetrievalError, 
-    PubMedAbstractConcatenationError,
-    WikipediaRetrievalError
+    WikipediaRetrievalError,
+    WikipediaPageNotFoundError,
+    WikipediaDisambiguationError,
+    CircuitOpenError
 )
 
+from .transport import Transport, AsyncTransport
+from .ratelimit import get_ncbi_limiter
+from .cache import Cache, RetrievalCache, normalize_name
+from .resilience import RetryPolicy, CircuitBreaker
+from .coalesce import SingleFlight, AsyncSingleFlight
+from .adaptive import AdaptiveSourceOrder
+
+if TYPE_CHECKING:
+    from .offline import WikipediaDump, PubMedIndex
+
 from lxml import etree
 import re
+import time
 import requests as r
 import wikipedia
 
+#: PubMed E-utilities search endpoint
+PUBMED_SEARCH_URL = "https://eutils.ncbi.nlm.nih.gov/entrez/eutils/esearch.fcgi"
+
+#: PubMed E-utilities abstract retrieval endpoint
+PUBMED_FETCH_URL = "https://eutils.ncbi.nlm.nih.gov/entrez/eutils/efetch.fcgi"
+
+#: MediaWiki Action API endpoint used when a transport is provided
+WIKIPEDIA_API_URL = "https://en.wikipedia.org/w/api.php"
+
 #: Default parameters for PubMed search API
 SEARCH_PARAMS = {'db': 'pubmed',
                  'term': '',
@@ -39,7 +64,203 @@ XML_RETRIEVAL_PARAMS = {'db': 'pubmed',
                         }
 
 
-def retrieve(name: str, priority: str = "WIKIPEDIA", single_source: bool = False, ncbikey: Optional[str] = None) -> Tuple[str, str]:
+
+@dataclass(frozen=True)
+class PubMedQuery:
+    """
+    Immutable description of a PubMed search.
+    
+    A query is passed to each call instead of modifying SEARCH_PARAMS, so calls with
+    different queries can run concurrently. The defaults reproduce the built-in search:
+    the three most relevant articles whose title contains the compound name.
+    
+    Args:
+        retmax (int, optional): Number of articles retrieved. Defaults to 3.
+        retstart (int, optional): Index of the first article retrieved, for paging through
+                                  the search results. Defaults to 0.
+        sort (str, optional): E-utilities sort order, e.g. "relevance", "pub_date" or
+                              "first_author". Defaults to "relevance".
+        field (str, optional): Search field tag the compound name must match, e.g. "ti" for
+                               titles or "tiab" for titles and abstracts. None searches all
+                               fields. Defaults to "ti".
+        mindate (str, optional): Start of the date range, as YYYY, YYYY/MM or YYYY/MM/DD.
+        maxdate (str, optional): End of the date range, in the same format as mindate.
+        datetype (str, optional): Date the range applies to: "pdat" (publication), "edat"
+                                  (Entrez) or "mdat" (modification). Defaults to "pdat".
+        usehistory (bool, optional): Whether esearch stores the results on the History
+                                     server. Defaults to False.
+    
+    Raises:
+        ValueError: If retmax is less than 1, retstart is negative, or only one of mindate
+                    and maxdate is given.
+    
+    Example:
+        >>> recent = PubMedQuery(retmax=10, sort="pub_date", field="tiab", mindate="2020", maxdate="2025")
+        >>> abstracts = pubmed_retrieve("aspirin", query=recent)
+    """
+    
+    retmax: int = 3
+    retstart: int = 0
+    sort: str = "relevance"
+    field: Optional[str] = "ti"
+    mindate: Optional[str] = None
+    maxdate: Optional[str] = None
+    datetype: str = "pdat"
+    usehistory: bool = False
+    
+    def __post_init__(self) -> None:
+        if self.retmax < 1:
+            raise ValueError("retmax must be at least 1")
+        if self.retstart < 0:
+            raise ValueError("retstart cannot be negative")
+        if (self.mindate is None) != (self.maxdate is None):
+            raise ValueError("mindate and maxdate must be given together")
+    
+    def term(self, drug: str) -> str:
+        """
+        Build the search term for a compound.
+        
+        Args:
+            drug (str): The name of the compound to search for.
+        
+        Returns:
+            str: The esearch term.
+        """
+        return drug if self.field is None else f"{drug}[{self.field}]"
+    
+    def search_params(self, drug: str, ncbikey: Optional[str] = None) -> dict:
+        """
+        Build the esearch parameters for a compound.
+        
+        Args:
+            drug (str): The name of the compound to search for.
+            ncbikey (str, optional): API key for NCBI/PubMed access.
+        
+        Returns:
+            dict: The esearch query parameters.
+        """
+        params = {'db': 'pubmed',
+                  'term': self.term(drug),
+                  'retmax': str(self.retmax),
+                  'usehistory': 'y' if self.usehistory else 'n',
+                  'sort': self.sort
+                  }
+        if self.retstart:
+            params['retstart'] = str(self.retstart)
+        if self.mindate is not None:
+            params.update(mindate=self.mindate, maxdate=self.maxdate, datetype=self.datetype)
+        if ncbikey is not None:
+            params['api_key'] = ncbikey
+        return params
+    
+    def fetch_params(self, web_env: str, ncbikey: Optional[str] = None) -> dict:
+        """
+        Build the efetch parameters for the search results stored under a WebEnv.
+        
+        Args:
+            web_env (str): The WebEnv returned by esearch.
+            ncbikey (str, optional): API key for NCBI/PubMed access.
+        
+        Returns:
+            dict: The efetch query parameters.
+        """
+        params = {'db': 'pubmed',
+                  'query_key': '1',
+                  'WebEnv': web_env,
+                  'rettype': 'abstract',
+                  'retmax': str(self.retmax)
+                  }
+        if self.retstart:
+            params['retstart'] = str(self.retstart)
+        if ncbikey is not None:
+            params['api_key'] = ncbikey
+        return params
+    
+    def cache_params(self) -> dict:
+        """
+        Get the parameters that affect the retrieved abstracts, for cache keys.
+        
+        Parameters left at their default are omitted, except retmax and sort.
+        
+        Returns:
+            dict: The cache key parameters of the query.
+        """
+        params = {'retmax': str(self.retmax), 'sort': self.sort}
+        if self.retstart:
+            params['retstart'] = str(self.retstart)
+        if self.field != "ti":
+            params['field'] = self.field
+        if self.mindate is not None:
+            params.update(mindate=self.mindate, maxdate=self.maxdate, datetype=self.datetype)
+        return params
+
+
+#: Query used when none is given, equivalent to SEARCH_PARAMS
+DEFAULT_PUBMED_QUERY = PubMedQuery()
+
+#: Maximum number of PubMed IDs requested in a single efetch POST
+EFETCH_BATCH_SIZE = 200
+
+#: Default number of titles requested in a single MediaWiki API query
+WIKIPEDIA_BATCH_SIZE = 20
+
+#: Maximum number of titles the MediaWiki API accepts in a single query
+WIKIPEDIA_MAX_BATCH_SIZE = 50
+
+#: Negative cache cause recorded when Wikipedia has no page for a title
+MISS_PAGE_NOT_FOUND = "PAGE_NOT_FOUND"
+
+#: Negative cache cause recorded when a title is a Wikipedia disambiguation page
+MISS_DISAMBIGUATION = "DISAMBIGUATION"
+
+#: Negative cache cause recorded when a PubMed title search has no hits
+MISS_NO_RESULTS = "NO_RESULTS"
+
+#: Number of bytes read from a streamed efetch response at a time
+STREAM_CHUNK_SIZE = 64 * 1024
+
+#: Default parameters for Wikipedia plaintext extract retrieval via the MediaWiki API
+WIKIPEDIA_PARAMS = {'action': 'query',
+                    'format': 'json',
+                    'formatversion': '2',
+                    'prop': 'extracts|info|pageprops',
+                    'explaintext': '1',
+                    'exlimit': 'max',
+                    'ppprop': 'disambiguation',
+                    'redirects': '1',
+                    'titles': ''
+                    }
+
+#: Largest character count the TextExtracts API accepts for exchars
+WIKIPEDIA_MAX_EXCHARS = 1200
+
+#: MediaWiki API parameters for looking up the current revision id of pages
+WIKIPEDIA_REVISION_PARAMS = {'action': 'query',
+                             'format': 'json',
+                             'formatversion': '2',
+                             'prop': 'info',
+                             'redirects': '1',
+                             'titles': ''
+                             }
+
+
+def retrieve(name: str, 
+             priority: str = "WIKIPEDIA", 
+             single_source: bool = False, 
+             ncbikey: Optional[str] = None,
+             transport: Optional[Transport] = None,
+             hedge_delay: Optional[float] = None,
+             cache: Optional[Cache] = None,
+             negative_cache: Optional[Cache] = None,
+             wikipedia_backend: Optional["WikipediaDump"] = None,
+             pubmed_backend: Optional["PubMedIndex"] = None,
+             retry_policy: Optional[RetryPolicy] = None,
+             circuit_breakers: Optional[Dict[str, CircuitBreaker]] = None,
+             single_flight: Optional[SingleFlight] = None,
+             max_chars: Optional[int] = None,
+             wikipedia_intro: bool = False,
+             pubmed_query: Optional[PubMedQuery] = None,
+             source_order: Optional[AdaptiveSourceOrder] = None) -> Tuple[str, str]:
     """
     Retrieve information about a chemical compound from various sources.
     
@@ -52,6 +273,60 @@ def retrieve(name: str, priority: str = "WIKIPEDIA", single_source: bool = False
                                 Options: "WIKIPEDIA", "PUBMED". Defaults to "WIKIPEDIA".
         single_source (bool, optional): Whether to use only the priority source. Defaults to False.
         ncbikey (str, optional): API key for NCBI/PubMed access.
+        transport (Transport, optional): Pooled HTTP transport reused for every request.
+                                         If None, each request opens a new connection.
+        hedge_delay (float, optional): If set and single_source is False, start the secondary
+                                       source after this many seconds instead of waiting for
+                                       the priority source to fail. 0 queries both at once.
+                                       The priority source's content is still returned whenever
+                                       it succeeds. Defaults to None (sequential fallback).
+        cache (Cache, optional): RetrievalCache or MemoryCache consulted before, and filled
+                                 after, every source request. A cached priority source
+                                 answers without any network call. With a transport,
+                                 Wikipedia entries are stored with their revision id and an
+                                 expired entry is revalidated with a revision lookup,
+                                 downloading the article only if it has changed.
+                                 Defaults to None.
+        negative_cache (Cache, optional): Cache of known misses (no Wikipedia page, disambiguation
+                                          page, no PubMed hits) consulted before every source
+                                          request, usually a RetrievalCache with
+                                          DEFAULT_NEGATIVE_TTL. A known miss costs no network
+                                          call. Defaults to None.
+        wikipedia_backend (WikipediaDump, optional): Offline backend answering Wikipedia
+                                                     lookups from a local dump instead of
+                                                     the live site. Defaults to None.
+        pubmed_backend (PubMedIndex, optional): Offline backend answering PubMed title searches
+                                                from a local full-text index instead of
+                                                E-utilities, with the retmax, retstart and
+                                                field of pubmed_query. Defaults to None.
+        retry_policy (RetryPolicy, optional): Policy retrying retryable failures of a source
+                                              (timeouts, connection errors, HTTP 429 and 5xx)
+                                              with jittered exponential backoff before falling
+                                              back. Defaults to None (no retries).
+        circuit_breakers (Dict[str, CircuitBreaker], optional): Circuit breaker per source name.
+                                                                A source whose breaker is open is
+                                                                skipped without a request.
+                                                                Defaults to None.
+        single_flight (SingleFlight, optional): Group shared by concurrent callers; while a
+                                                source is being fetched for a name, other
+                                                threads asking the same source for the same
+                                                normalized name wait for that fetch instead
+                                                of repeating it. Defaults to None.
+        max_chars (int, optional): Content budget in characters. Wikipedia content is cut to
+                                   this length before cleaning, and budgets of at most 1200
+                                   characters are requested from the API with ``exchars``.
+                                   Defaults to None (whole article).
+        wikipedia_intro (bool, optional): Whether to retrieve only the lead section of Wikipedia
+                                          articles. Defaults to False.
+        pubmed_query (PubMedQuery, optional): The PubMed search to run. Defaults to
+                                              DEFAULT_PUBMED_QUERY.
+        source_order (AdaptiveSourceOrder, optional): Observations of source hit rates and
+                                                      latencies. Every source request is
+                                                      recorded, and once enough have been
+                                                      observed the sources are tried in the
+                                                      order expected to give useful content
+                                                      soonest instead of the priority order.
+                                                      Defaults to None.
     
     Returns:
         Tuple[str, str]: A tuple containing (source, content) where source indicates
@@ -61,69 +336,402 @@ def retrieve(name: str, priority: str = "WIKIPEDIA", single_source: bool = False
         PubMedSearchXMLParseError: If PubMed search XML cannot be parsed.
         PubMedSearchResultsError: If search results cannot be retrieved from PubMed.
         PubMedAbstractXMLParseError: If PubMed abstract XML cannot be parsed.
-        PubMedAbstractRetrievalError: If abstracts cannot be retrieved from PubMed.
-        PubMedAbstractConcatenationError: If abstract texts cannot be concatenated.
         WikipediaRetrievalError: If Wikipedia content cannot be retrieved.
+        ValueError: If PubMed is a source and pubmed_backend cannot answer pubmed_query.
         
     Example:
         >>> source, content = retrieve("aspirin")
         >>> print(f"Retrieved from {source}: {content[:100]}...")
     """
-    if (priority == "WIKIPEDIA" and not single_source):
+    sources = _source_order(priority, single_source)
+    if source_order is not None:
+        sources = source_order.order(name, sources)
+    if pubmed_backend is not None and "PUBMED" in sources:
+        pubmed_backend.check_query(DEFAULT_PUBMED_QUERY if pubmed_query is None else pubmed_query)
+
+    params = {info_source: _source_params(info_source, max_chars, wikipedia_intro, pubmed_query)
+              for info_source in sources}
+    miss_params = {info_source: _source_params(info_source, pubmed_query=pubmed_query) for info_source in sources}
+    cached = _cache_get(cache, sources[0], name, params[sources[0]])
+    if cached is not None:
+        return sources[0], cached
+
+    validators = {}
+
+    def request(info_source: str) -> str:
+        if info_source == "WIKIPEDIA" and wikipedia_backend is not None:
+            return wikipedia_backend.retrieve(name, max_chars, wikipedia_intro)
+        elif info_source == "WIKIPEDIA" and cache is not None and transport is not None:
+            description, validators[info_source] = _wikipedia_revalidate(cache, name, transport,
+                                                                         max_chars, wikipedia_intro)
+            return description
+        elif info_source == "WIKIPEDIA":
+            return wikipedia_retrieve(name, transport, max_chars, wikipedia_intro)
+        elif pubmed_backend is not None:
+            return pubmed_backend.retrieve(name, DEFAULT_PUBMED_QUERY if pubmed_query is None else pubmed_query)
+        return pubmed_retrieve(name, ncbikey, transport, pubmed_query)
+
+    def fetch(info_source: str) -> str:
+        if single_flight is None:
+            return fetch_source(info_source)
+        key = (info_source, normalize_name(name), tuple(sorted(params[info_source].items())))
+        return single_flight.do(key, fetch_source, info_source)
+
+    def fetch_source(info_source: str) -> str:
+        if info_source != sources[0]:
+            cached = _cache_get(cache, info_source, name, params[info_source])
+            if cached is not None:
+                return cached
+        known_miss = _negative_get(negative_cache, info_source, name, miss_params[info_source])
+        if known_miss is not None:
+            return known_miss
+        started = time.monotonic()
         try:
-            description = wikipedia_retrieve(name)
-            info_source = "WIKIPEDIA"
-        except:
-            try:
-                description = pubmed_retrieve(name, ncbikey)
-                info_source = "PUBMED"
-            except:
-                description = None
-                info_source = None
-    elif (priority == "PUBMED" and not single_source):
+            description = _guarded_call(request, info_source, retry_policy, circuit_breakers)
+        except Exception as e:
+            _observe(source_order, name, info_source, started, e)
+            if isinstance(e, WikipediaRetrievalError):
+                _negative_set(negative_cache, info_source, name, e, miss_params[info_source])
+            raise
+        _observe(source_order, name, info_source, started, description)
+        _result_set(cache, negative_cache, info_source, name, description, 
+                    validators.get(info_source), params[info_source], miss_params[info_source])
+        return description
+
+    if hedge_delay is not None and len(sources) == 2:
+        return _hedged_fetch(sources, fetch, hedge_delay)
+
+    for info_source in sources:
         try:
-            description = pubmed_retrieve(name, ncbikey)
-            info_source = "PUBMED"
-        except:
-            try:
-                description = wikipedia_retrieve(name)
-                info_source = "WIKIPEDIA"
-            except:
-                description = None
-                info_source = None
+            return info_source, fetch(info_source)
+        except Exception:
+            continue
+    return None, None
+
+
+def _source_order(priority: str, single_source: bool) -> List[str]:
+    """
+    Get the sources to try, in order, for a priority and single_source setting.
     
-    elif (priority == "WIKIPEDIA" and single_source):
-        try:
-            description = wikipedia_retrieve(name)
-            info_source = "WIKIPEDIA"
-        except:
-            description = None
-            info_source = None
+    Args:
+        priority (str): Priority source, "WIKIPEDIA" or "PUBMED".
+        single_source (bool): Whether to use only the priority source.
     
-    elif (priority == "PUBMED" and single_source):
-        try:
-            description = pubmed_retrieve(name, ncbikey)
-            info_source = "PUBMED"
-        except:
-            description = None
-            info_source = None
+    Returns:
+        List[str]: The sources in the order they should be tried.
     
+    Raises:
+        ValueError: If priority is not "WIKIPEDIA" or "PUBMED".
+    """
+    if priority == "WIKIPEDIA":
+        return ["WIKIPEDIA"] if single_source else ["WIKIPEDIA", "PUBMED"]
+    elif priority == "PUBMED":
+        return ["PUBMED"] if single_source else ["PUBMED", "WIKIPEDIA"]
+    raise ValueError("priority must be either WIKIPEDIA or PUBMED" 
+                     + "and single_source must be a boolean value")
+
+
+def _source_params(info_source: str, 
+                   max_chars: Optional[int] = None, 
+                   wikipedia_intro: bool = False,
+                   pubmed_query: Optional[PubMedQuery] = None) -> dict:
+    """
+    Get the parameters that affect the content retrieved from a source.
+    
+    Args:
+        info_source (str): The source, "WIKIPEDIA" or "PUBMED".
+        max_chars (int, optional): The Wikipedia content budget in characters.
+        wikipedia_intro (bool, optional): Whether only the lead section of Wikipedia articles is retrieved.
+        pubmed_query (PubMedQuery, optional): The PubMed search. Defaults to DEFAULT_PUBMED_QUERY.
+    
+    Returns:
+        dict: The parameters that are part of the cache key for the source.
+    """
+    if info_source == "PUBMED":
+        return (DEFAULT_PUBMED_QUERY if pubmed_query is None else pubmed_query).cache_params()
+    params = {}
+    if wikipedia_intro:
+        params['exintro'] = '1'
+    if max_chars is not None:
+        params['max_chars'] = str(max_chars)
+    return params
+
+
+def _cache_get(cache: Optional[Cache], info_source: str, name: str, params: Optional[dict] = None) -> Optional[str]:
+    """
+    Look up the cached content of a source, if a cache is in use.
+    
+    Args:
+        cache (Cache, optional): The cache to consult.
+        info_source (str): The source, "WIKIPEDIA" or "PUBMED".
+        name (str): The compound name.
+        params (dict, optional): The cache key parameters. Defaults to those of the source.
+    
+    Returns:
+        Optional[str]: The cached content, or None.
+    """
+    if cache is None:
+        return None
+    return cache.get(info_source, name, _source_params(info_source) if params is None else params)
+
+
+def _cache_set(cache: Optional[Cache], 
+               info_source: str, 
+               name: str, 
+               content: str, 
+               validator: Optional[str] = None,
+               params: Optional[dict] = None) -> None:
+    """
+    Store the content of a source, if a cache is in use.
+    
+    Args:
+        cache (Cache, optional): The cache to fill.
+        info_source (str): The source, "WIKIPEDIA" or "PUBMED".
+        name (str): The compound name.
+        content (str): The retrieved content.
+        validator (str, optional): The revision id the content was retrieved at. The name is
+                                   stored with it as the title to revalidate the entry with.
+        params (dict, optional): The cache key parameters. Defaults to those of the source.
+    """
+    if cache is None:
+        return
+    if params is None:
+        params = _source_params(info_source)
+    if validator is None:
+        cache.set(info_source, name, content, params)
+    else:
+        cache.set(info_source, name, content, params, validator=validator, title=name)
+
+
+def _negative_get(negative_cache: Optional[Cache], 
+                  info_source: str, 
+                  name: str, 
+                  params: Optional[dict] = None) -> Optional[str]:
+    """
+    Check whether a source is a known miss for a name, if a negative cache is in use.
+    
+    Args:
+        negative_cache (Cache, optional): The negative cache to consult.
+        info_source (str): The source, "WIKIPEDIA" or "PUBMED".
+        name (str): The compound name.
+        params (dict, optional): The cache key parameters. Defaults to those of the source.
+    
+    Returns:
+        Optional[str]: 'NO_RESULTS' for a known PubMed miss, or None if the miss is not known.
+    
+    Raises:
+        WikipediaPageNotFoundError: If Wikipedia is known to have no page for the name.
+        WikipediaDisambiguationError: If the name is known to be a disambiguation page.
+    """
+    if negative_cache is None:
+        return None
+    cause = negative_cache.get(info_source, name, _source_params(info_source) if params is None else params)
+    if cause == MISS_PAGE_NOT_FOUND:
+        raise WikipediaPageNotFoundError(f"Failed to retrieve Wikipedia content for '{name}': known missing page")
+    if cause == MISS_DISAMBIGUATION:
+        raise WikipediaDisambiguationError(f"Failed to retrieve Wikipedia content for '{name}': known disambiguation page")
+    return cause
+
+
+def _negative_set(negative_cache: Optional[Cache], 
+                  info_source: str, 
+                  name: str, 
+                  error: Exception, 
+                  params: Optional[dict] = None) -> None:
+    """
+    Remember a failed lookup in the negative cache if it failed because the page does not exist.
+    
+    Failures that may succeed on a later attempt, such as network errors, are not recorded.
+    
+    Args:
+        negative_cache (Cache, optional): The negative cache to fill.
+        info_source (str): The source, "WIKIPEDIA" or "PUBMED".
+        name (str): The compound name.
+        error (Exception): The error the lookup failed with.
+        params (dict, optional): The cache key parameters. Defaults to those of the source.
+    """
+    if negative_cache is None:
+        return
+    if params is None:
+        params = _source_params(info_source)
+    if isinstance(error, WikipediaPageNotFoundError):
+        negative_cache.set(info_source, name, MISS_PAGE_NOT_FOUND, params)
+    elif isinstance(error, WikipediaDisambiguationError):
+        negative_cache.set(info_source, name, MISS_DISAMBIGUATION, params)
+
+
+def _result_set(cache: Optional[Cache], 
+                negative_cache: Optional[Cache], 
+                info_source: str, 
+                name: str, 
+                content: str,
+                validator: Optional[str] = None,
+                params: Optional[dict] = None,
+                miss_params: Optional[dict] = None) -> None:
+    """
+    Store retrieved content, sending 'NO_RESULTS' to the negative cache instead of the cache.
+    
+    Args:
+        cache (Cache, optional): The cache of retrieved content.
+        negative_cache (Cache, optional): The cache of known misses.
+        info_source (str): The source, "WIKIPEDIA" or "PUBMED".
+        name (str): The compound name.
+        content (str): The retrieved content.
+        validator (str, optional): The revision id the content was retrieved at.
+        params (dict, optional): The cache key parameters. Defaults to those of the source.
+        miss_params (dict, optional): The negative cache key parameters. Defaults to those
+                                      of the source.
+    """
+    if content == MISS_NO_RESULTS:
+        if negative_cache is not None:
+            negative_cache.set(info_source, name, MISS_NO_RESULTS, 
+                               _source_params(info_source) if miss_params is None else miss_params)
     else:
-        raise ValueError("priority must be either WIKIPEDIA or PUBMED" 
-                         + "and single_source must be a boolean value")
+        _cache_set(cache, info_source, name, content, validator, params)
 
-    return info_source, description
+
+def _checked(response):
+    """
+    Raise for an HTTP error status and return the response otherwise.
     
-def pubmed_retrieve(drug: str, ncbikey: Optional[str] = None) -> str:
+    Args:
+        response: A ``requests.Response`` or ``httpx.Response``.
+    
+    Returns:
+        The same response.
+    
+    Raises:
+        requests.HTTPError or httpx.HTTPStatusError: If the status code is 4xx or 5xx.
+    """
+    response.raise_for_status()
+    return response
+
+
+def _guarded_call(request: Callable[[str], str], 
+                  info_source: str, 
+                  retry_policy: Optional[RetryPolicy], 
+                  circuit_breakers: Optional[Dict[str, CircuitBreaker]]) -> str:
+    """
+    Request a source through its circuit breaker and the retry policy, if any.
+    
+    Retries happen inside the breaker, so an exhausted retry sequence counts as
+    one failure.
+    
+    Args:
+        request (Callable[[str], str]): Function retrieving the content of a source.
+        info_source (str): The source, "WIKIPEDIA" or "PUBMED".
+        retry_policy (RetryPolicy, optional): The retry policy.
+        circuit_breakers (Dict[str, CircuitBreaker], optional): The breakers per source.
+    
+    Returns:
+        str: The retrieved content.
+    
+    Raises:
+        CircuitOpenError: If the breaker of the source is open.
+    """
+    attempt = request if retry_policy is None else (lambda source: retry_policy.call(request, source))
+    breaker = None if circuit_breakers is None else circuit_breakers.get(info_source)
+    if breaker is None:
+        return attempt(info_source)
+    return breaker.call(attempt, info_source)
+
+
+def _observe(source_order: Optional[AdaptiveSourceOrder], 
+             name: str, 
+             info_source: str, 
+             started: float, 
+             outcome: object) -> None:
+    """
+    Record the outcome of a source request with the adaptive source order, if any.
+    
+    Requests rejected by an open circuit breaker never reached the source and are
+    not recorded.
+    
+    Args:
+        source_order (AdaptiveSourceOrder, optional): The adaptive source order.
+        name (str): The compound name looked up.
+        info_source (str): The source, "WIKIPEDIA" or "PUBMED".
+        started (float): ``time.monotonic()`` when the request started.
+        outcome (object): The retrieved content, or the exception the request raised.
+    """
+    if source_order is None or isinstance(outcome, CircuitOpenError):
+        return
+    hit = isinstance(outcome, str) and outcome != MISS_NO_RESULTS
+    source_order.record(name, info_source, hit, time.monotonic() - started)
+
+
+async def _aguarded_call(request: Callable[[str], Awaitable[str]], 
+                         info_source: str, 
+                         retry_policy: Optional[RetryPolicy], 
+                         circuit_breakers: Optional[Dict[str, CircuitBreaker]]) -> str:
+    """
+    Asyncio counterpart of ``_guarded_call``.
+    """
+    async def attempt(source: str) -> str:
+        if retry_policy is None:
+            return await request(source)
+        return await retry_policy.acall(request, source)
+
+    breaker = None if circuit_breakers is None else circuit_breakers.get(info_source)
+    if breaker is None:
+        return await attempt(info_source)
+    return await breaker.acall(attempt, info_source)
+
+
+def _hedged_fetch(sources: List[str], fetch: Callable[[str], str], hedge_delay: float) -> Tuple[str, str]:
+    """
+    Fetch from the priority source and start the secondary source after a delay.
+    
+    The secondary source is started once the priority source has failed or has not
+    answered within ``hedge_delay`` seconds. The priority source's content is returned
+    whenever it succeeds; the secondary result is only used if the priority source fails.
+    
+    Args:
+        sources (List[str]): The priority and secondary sources.
+        fetch (Callable[[str], str]): Function retrieving the content of one source.
+        hedge_delay (float): Seconds to wait on the priority source before starting the
+                             secondary one. 0 starts both at the same time.
+    
+    Returns:
+        Tuple[str, str]: A tuple containing (source, content), or (None, None) if both
+                        sources failed.
+    """
+    executor = ThreadPoolExecutor(max_workers=2)
+    try:
+        primary = executor.submit(fetch, sources[0])
+        wait([primary], timeout=hedge_delay)
+        if primary.done() and primary.exception() is None:
+            return sources[0], primary.result()
+
+        secondary = executor.submit(fetch, sources[1])
+        try:
+            return sources[0], primary.result()
+        except Exception:
+            pass
+        try:
+            return sources[1], secondary.result()
+        except Exception:
+            return None, None
+    finally:
+        executor.shutdown(wait=False)
+    
+def pubmed_retrieve(drug: str, 
+                    ncbikey: Optional[str] = None, 
+                    transport: Optional[Transport] = None,
+                    query: Optional[PubMedQuery] = None) -> str:
     """
     Retrieve abstracts from PubMed for a given compound.
     
     This function searches PubMed for articles related to a chemical compound
-    and retrieves the abstracts of the most relevant articles.
+    and retrieves the abstracts of the most relevant articles. Every E-utilities
+    request waits on the process-wide NCBI rate limiter for the given key.
     
     Args:
         drug (str): The name of the compound to search for in PubMed.
         ncbikey (str, optional): API key for NCBI/PubMed access for higher rate limits.
+        transport (Transport, optional): Pooled HTTP transport used for the E-utilities requests.
+                                         If None, each request opens a new connection.
+        query (PubMedQuery, optional): The search to run. Defaults to DEFAULT_PUBMED_QUERY.
     
     Returns:
         str: Concatenated abstract texts from PubMed articles, or 'NO_RESULTS' if no articles found.
@@ -132,81 +740,1063 @@ def pubmed_retrieve(drug: str, ncbikey: Optional[str] = None) -> str:
         PubMedSearchXMLParseError: If the search XML response cannot be parsed.
         PubMedSearchResultsError: If search results cannot be retrieved.
         PubMedAbstractXMLParseError: If abstract XML cannot be parsed.
-        PubMedAbstractRetrievalError: If abstracts cannot be retrieved.
-        PubMedAbstractConcatenationError: If abstract texts cannot be concatenated.
         
     Example:
         >>> abstracts = pubmed_retrieve("aspirin", ncbikey="your_ncbi_key")
         >>> print(abstracts[:100])
     """
-    temp_search_params = SEARCH_PARAMS
-    temp_search_params['api_key'] = ncbikey
-
-    if (temp_search_params["api_key"] is None):
-        del temp_search_params["api_key"]
-    temp_search_params['term'] = drug + '[ti]'
+    get = r.get if transport is None else transport.get
+    limiter = get_ncbi_limiter(ncbikey)
 
     try:
-        xml_content = etree.fromstring(r.get("https://eutils.ncbi.nlm.nih.gov/entrez/eutils/esearch.fcgi?", 
-                                             params=temp_search_params).content)
-    except:
+        limiter.acquire()
+        search_content = _checked(get(PUBMED_SEARCH_URL, params=_pubmed_search_params(drug, ncbikey, query))).content
+    except Exception:
         raise PubMedSearchXMLParseError()
+    web_env = _pubmed_web_env(search_content)
+    if web_env is None:
+        return 'NO_RESULTS'
+
     try:
-        if (str(xml_content.find(".//Count").text) == "0"):
-            return 'NO_RESULTS'
-    except:
-        raise PubMedSearchResultsError()
-    else:
-        temp_retrieval_params = XML_RETRIEVAL_PARAMS
-        temp_retrieval_params['api_key'] = ncbikey
+        limiter.acquire()
+        response = get(PUBMED_FETCH_URL, params=_pubmed_fetch_params(web_env, ncbikey, query), stream=True)
+    except Exception:
+        raise PubMedAbstractXMLParseError()
+    return _join_abstracts(part for _, parts in _pubmed_articles(response) for part in parts)
 
-        if (temp_retrieval_params["api_key"] is None):
-            del temp_retrieval_params["api_key"]
-        temp_retrieval_params['WebEnv'] = xml_content.find(".//WebEnv").text
+
+def pubmed_retrieve_many(drugs: List[str], 
+                         ncbikey: Optional[str] = None, 
+                         transport: Optional[Transport] = None,
+                         batch_size: int = EFETCH_BATCH_SIZE,
+                         query: Optional[PubMedQuery] = None) -> Dict[str, str]:
+    """
+    Retrieve abstracts from PubMed for many compounds at once.
+    
+    This function runs one title search per compound to collect its most relevant
+    PubMed IDs, then fetches the abstracts of all collected IDs in a few large
+    efetch POST requests and splits them back per compound. Compared to calling
+    ``pubmed_retrieve`` for each compound, this replaces one efetch per compound
+    with one efetch per ``batch_size`` articles. Every E-utilities request waits
+    on the process-wide NCBI rate limiter for the given key.
+    
+    Args:
+        drugs (List[str]): The names of the compounds to search for in PubMed.
+        ncbikey (str, optional): API key for NCBI/PubMed access for higher rate limits.
+        transport (Transport, optional): Pooled HTTP transport used for the E-utilities requests.
+                                         If None, each request opens a new connection.
+        batch_size (int, optional): Maximum number of PubMed IDs fetched per efetch request.
+                                    Defaults to 200.
+        query (PubMedQuery, optional): The search to run for each compound. The History
+                                       server is never used since IDs are fetched directly.
+                                       Defaults to DEFAULT_PUBMED_QUERY.
+    
+    Returns:
+        Dict[str, str]: A dictionary mapping each compound name to its concatenated abstract
+                        texts in relevance order, or 'NO_RESULTS' if no articles were found.
+        
+    Raises:
+        PubMedSearchXMLParseError: If a search XML response cannot be parsed.
+        PubMedSearchResultsError: If search results cannot be retrieved.
+        PubMedAbstractXMLParseError: If abstract XML cannot be parsed.
+        
+    Example:
+        >>> abstracts = pubmed_retrieve_many(["aspirin", "caffeine"], ncbikey="your_ncbi_key")
+        >>> print(abstracts["caffeine"][:100])
+    """
+    if batch_size < 1:
+        raise ValueError("batch_size must be at least 1")
+
+    get = r.get if transport is None else transport.get
+    post = r.post if transport is None else transport.post
+    limiter = get_ncbi_limiter(ncbikey)
+
+    if query is None:
+        query = DEFAULT_PUBMED_QUERY
+
+    search_ids = {}
+    for drug in drugs:
+        if drug in search_ids:
+            continue
+        search_params = query.search_params(drug, ncbikey)
+        del search_params['usehistory']
         try:
-            retrieval_content = etree.fromstring(r.get(('https://eutils.ncbi.nlm.nih.gov/entrez/eutils/efetch.fcgi?'), 
-                                                       params=temp_retrieval_params
-                                                       ).content)
-        except:
-            raise PubMedAbstractXMLParseError()
+            limiter.acquire()
+            xml_content = etree.fromstring(_checked(get(PUBMED_SEARCH_URL, params=search_params)).content)
+        except Exception:
+            raise PubMedSearchXMLParseError()
         try:
-            abstracts = retrieval_content.findall(".//AbstractText")
-        except:
-            raise PubMedAbstractRetrievalError()
-        result = ''
+            count = int(xml_content.find(".//Count").text)
+            search_ids[drug] = [pmid.text for pmid in xml_content.findall(".//IdList/Id")] if count > 0 else []
+        except Exception:
+            raise PubMedSearchResultsError()
+
+    unique_ids = list(dict.fromkeys(pmid for ids in search_ids.values() for pmid in ids))
+    abstracts = {}
+    for start in range(0, len(unique_ids), batch_size):
+        fetch_params = {'db': 'pubmed',
+                        'id': ','.join(unique_ids[start:start + batch_size]),
+                        'rettype': 'abstract',
+                        'retmode': 'xml'
+                        }
+        if ncbikey is not None:
+            fetch_params['api_key'] = ncbikey
         try:
-            for abstract in abstracts:
-                result = result + ' ' + abstract.text
-        except:
-            raise PubMedAbstractConcatenationError()
-        return result
+            limiter.acquire()
+            response = post(PUBMED_FETCH_URL, data=fetch_params, stream=True)
+        except Exception:
+            raise PubMedAbstractXMLParseError()
+        abstracts.update(_pubmed_articles(response))
+
+    results = {}
+    for drug, ids in search_ids.items():
+        if len(ids) == 0:
+            results[drug] = 'NO_RESULTS'
+            continue
+        results[drug] = _join_abstracts(part for pmid in ids for part in abstracts.get(pmid, []))
+    return results
+
+
+def _pubmed_search_params(drug: str, ncbikey: Optional[str] = None, query: Optional[PubMedQuery] = None) -> dict:
+    """
+    Build the esearch parameters for a search, leaving SEARCH_PARAMS untouched.
+    
+    Args:
+        drug (str): The name of the compound to search for.
+        ncbikey (str, optional): API key for NCBI/PubMed access.
+        query (PubMedQuery, optional): The search to run. Defaults to DEFAULT_PUBMED_QUERY.
+    
+    Returns:
+        dict: The esearch query parameters.
+    """
+    return (DEFAULT_PUBMED_QUERY if query is None else query).search_params(drug, ncbikey)
+
+
+def _pubmed_fetch_params(web_env: str, ncbikey: Optional[str] = None, query: Optional[PubMedQuery] = None) -> dict:
+    """
+    Build the efetch parameters for a search history, leaving XML_RETRIEVAL_PARAMS untouched.
+    
+    Args:
+        web_env (str): The WebEnv returned by esearch.
+        ncbikey (str, optional): API key for NCBI/PubMed access.
+        query (PubMedQuery, optional): The search that was run. Defaults to DEFAULT_PUBMED_QUERY.
+    
+    Returns:
+        dict: The efetch query parameters.
+    """
+    return (DEFAULT_PUBMED_QUERY if query is None else query).fetch_params(web_env, ncbikey)
+
+
+def _pubmed_web_env(content: bytes) -> Optional[str]:
+    """
+    Parse an esearch response and return its WebEnv.
+    
+    Args:
+        content (bytes): The raw esearch XML response.
+    
+    Returns:
+        Optional[str]: The WebEnv of the search, or None if the search had no results.
+    
+    Raises:
+        PubMedSearchXMLParseError: If the XML cannot be parsed.
+        PubMedSearchResultsError: If the result count or WebEnv cannot be read.
+    """
+    try:
+        xml_content = etree.fromstring(content)
+    except Exception:
+        raise PubMedSearchXMLParseError()
+    try:
+        if (str(xml_content.find(".//Count").text) == "0"):
+            return None
+        return xml_content.find(".//WebEnv").text
+    except Exception:
+        raise PubMedSearchResultsError()
+
+
+class _PubMedArticleParser:
+    """
+    Incremental parser of efetch XML responses.
+    
+    Chunks of the response body are fed as they arrive. The abstract sections of each
+    PubmedArticle or PubmedBookArticle are collected when the article is complete, and
+    the article is then cleared from the tree, so memory use does not grow with the
+    number of articles in the response.
+    """
+    
+    def __init__(self) -> None:
+        self._parser = etree.XMLPullParser(events=("end",),
+                                           tag=("AbstractText", "PubmedArticle", "PubmedBookArticle"))
+        self._parts = []
+        self.articles = []
+    
+    def feed(self, chunk: bytes) -> None:
+        """
+        Parse the next chunk of the response body.
+        
+        Args:
+            chunk (bytes): The next bytes of the response body.
+        """
+        self._parser.feed(chunk)
+        self._read_events()
+    
+    def close(self) -> List[Tuple[Optional[str], List[str]]]:
+        """
+        Finish parsing and return the parsed articles.
+        
+        Returns:
+            List[Tuple[Optional[str], List[str]]]: The (PMID, abstract sections) of each
+                                                   article, in response order.
+        """
+        self._parser.close()
+        self._read_events()
+        if self._parts:
+            self.articles.append((None, self._parts))
+            self._parts = []
+        return self.articles
+    
+    def _read_events(self) -> None:
+        for _, element in self._parser.read_events():
+            if element.tag == "AbstractText":
+                text = _abstract_text(element)
+                if text is not None:
+                    self._parts.append(text)
+                continue
+            self.articles.append((element.findtext(".//PMID"), self._parts))
+            self._parts = []
+            element.clear()
+            while element.getprevious() is not None:
+                del element.getparent()[0]
 
 
-def wikipedia_retrieve(drug: str) -> str:
+def _abstract_text(element: etree._Element) -> Optional[str]:
+    """
+    Get the text of an AbstractText element, prefixed with its label if it has one.
+    
+    Structured abstracts split the abstract into several labelled AbstractText
+    elements (e.g. BACKGROUND, METHODS); the label is kept so that the sections
+    remain distinguishable once joined. Text inside inline markup is included.
+    
+    Args:
+        element (etree._Element): The AbstractText element.
+    
+    Returns:
+        Optional[str]: The section text, or None if the element has no text.
+    """
+    text = ''.join(element.itertext())
+    if not text.strip():
+        return None
+    label = element.get("Label")
+    return f"{label}: {text}" if label else text
+
+
+def _pubmed_articles(response: r.Response) -> List[Tuple[Optional[str], List[str]]]:
+    """
+    Parse a streamed efetch response as it is downloaded.
+    
+    Args:
+        response (requests.Response): The efetch response, requested with stream=True.
+    
+    Returns:
+        List[Tuple[Optional[str], List[str]]]: The (PMID, abstract sections) of each article.
+    
+    Raises:
+        PubMedAbstractXMLParseError: If the response cannot be read or parsed.
+    """
+    parser = _PubMedArticleParser()
+    try:
+        response.raise_for_status()
+        for chunk in response.iter_content(STREAM_CHUNK_SIZE):
+            parser.feed(chunk)
+        return parser.close()
+    except Exception:
+        raise PubMedAbstractXMLParseError()
+    finally:
+        response.close()
+
+
+def _join_abstracts(parts: Iterable[str]) -> str:
+    """
+    Concatenate abstract sections in linear time, each preceded by a space.
+    
+    Args:
+        parts (Iterable[str]): The abstract section texts.
+    
+    Returns:
+        str: The joined abstract texts.
+    """
+    return ''.join(' ' + part for part in parts)
+
+
+def wikipedia_retrieve(drug: str, 
+                       transport: Optional[Transport] = None,
+                       max_chars: Optional[int] = None,
+                       intro_only: bool = False) -> str:
     """
     Retrieve content from Wikipedia for a given compound.
     
     This function fetches the Wikipedia page content for a chemical compound
-    and processes it by removing newlines, tabs, and extra spaces.
+    and processes it by removing newlines, tabs, and extra spaces. When a transport
+    is provided, the plaintext extract is requested directly from the MediaWiki API
+    over the pooled connection instead of through the ``wikipedia`` package.
     
     Args:
         drug (str): The name of the compound to look up on Wikipedia.
+        transport (Transport, optional): Pooled HTTP transport used for the MediaWiki request.
+                                         If None, the ``wikipedia`` package is used.
+        max_chars (int, optional): Maximum length of the returned content. The raw text is cut
+                                   before cleaning, and budgets of at most 1200 characters are
+                                   passed to the API as ``exchars`` so that only that much is
+                                   transferred. Defaults to None (whole article).
+        intro_only (bool, optional): Whether to retrieve only the lead section (``exintro``).
+                                     Defaults to False.
     
     Returns:
         str: The processed Wikipedia content with cleaned formatting.
         
     Raises:
-        WikipediaRetrievalError: If Wikipedia content cannot be retrieved.
+        ValueError: If max_chars is less than 1.
+        WikipediaRetrievalError: If Wikipedia content cannot be retrieved. The subclasses
+                                 WikipediaPageNotFoundError and WikipediaDisambiguationError
+                                 are raised when the page is missing or ambiguous.
         
     Example:
         >>> content = wikipedia_retrieve("aspirin")
         >>> print(content[:100])
     """
+    if max_chars is not None and max_chars < 1:
+        raise ValueError("max_chars must be at least 1")
+
+    if transport is None:
+        try:
+            page = wikipedia.page(drug, auto_suggest=False)
+            return _clean_wikipedia_text(page.summary if intro_only else page.content, max_chars)
+        except Exception as e:
+            raise _wikipedia_error(e)(f"Failed to retrieve Wikipedia content for '{drug}': {str(e)}")
+    return _wikipedia_fetch(drug, transport, max_chars, intro_only)[0]
+
+
+def _wikipedia_fetch(drug: str, 
+                     transport: Transport, 
+                     max_chars: Optional[int] = None, 
+                     intro_only: bool = False) -> Tuple[str, Optional[str]]:
+    """
+    Retrieve the processed content of a page from the MediaWiki API with its revision id.
+    
+    Args:
+        drug (str): The name of the compound to look up on Wikipedia.
+        transport (Transport): Pooled HTTP transport used for the MediaWiki request.
+        max_chars (int, optional): Maximum length of the returned content.
+        intro_only (bool, optional): Whether to retrieve only the lead section.
+    
+    Returns:
+        Tuple[str, Optional[str]]: The processed content and the revision id of the page.
+    
+    Raises:
+        WikipediaRetrievalError: If Wikipedia content cannot be retrieved.
+    """
     try:
-        description = wikipedia.page(drug, auto_suggest=False).content
-        description = description.replace('\n', ' ')
-        description = description.replace('\t', ' ')
-        description = ' '.join(description.split())
-        return description
+        params = _wikipedia_params(drug, max_chars, intro_only)
+        page = _checked(transport.get(WIKIPEDIA_API_URL, params=params)).json()['query']['pages'][0]
+        return _clean_wikipedia_text(_wikipedia_page_content(page), max_chars), _wikipedia_revision(page)
+    except Exception as e:
+        raise _wikipedia_error(e)(f"Failed to retrieve Wikipedia content for '{drug}': {str(e)}")
+
+
+def _wikipedia_revalidate(cache: Cache, 
+                          name: str, 
+                          transport: Transport,
+                          max_chars: Optional[int] = None, 
+                          intro_only: bool = False) -> Tuple[str, Optional[str]]:
+    """
+    Retrieve a page, reusing an expired cache entry if the article has not changed since.
+    
+    An expired entry stored with a revision id is checked with a single revision lookup,
+    which is much smaller than the article itself; the article is only downloaded when
+    there is no such entry, its revision is outdated or the lookup fails.
+    
+    Args:
+        cache (Cache): The cache holding the possibly expired entry.
+        name (str): The compound name.
+        transport (Transport): Pooled HTTP transport used for the MediaWiki requests.
+        max_chars (int, optional): Maximum length of the returned content.
+        intro_only (bool, optional): Whether to retrieve only the lead section.
+    
+    Returns:
+        Tuple[str, Optional[str]]: The processed content and its revision id.
+    
+    Raises:
+        WikipediaRetrievalError: If Wikipedia content cannot be retrieved.
+    """
+    stale = cache.get_stale("WIKIPEDIA", name, _source_params("WIKIPEDIA", max_chars, intro_only))
+    if stale is not None and stale[1] is not None:
+        try:
+            if wikipedia_revisions([name], transport)[name] == stale[1]:
+                return stale
+        except WikipediaRetrievalError:
+            pass
+    return _wikipedia_fetch(name, transport, max_chars, intro_only)
+
+
+def wikipedia_retrieve_many(drugs: List[str], 
+                            transport: Optional[Transport] = None,
+                            batch_size: int = WIKIPEDIA_BATCH_SIZE) -> Dict[str, Optional[str]]:
+    """
+    Retrieve content from Wikipedia for many compounds at once.
+    
+    This function queries the MediaWiki Action API for up to ``batch_size`` titles per
+    request, maps title normalizations and redirects reported by the API back to the
+    input names, and cleans each extract the same way as ``wikipedia_retrieve``.
+    The TextExtracts API returns at most one full-article extract per response, so
+    the remaining extracts of a batch are collected by following the API continuation;
+    title resolution, page info and missing or disambiguation checks for the whole
+    batch are answered by the first request.
+    
+    Args:
+        drugs (List[str]): The names of the compounds to look up on Wikipedia.
+        transport (Transport, optional): Pooled HTTP transport used for the MediaWiki requests.
+                                         If None, each request opens a new connection.
+        batch_size (int, optional): Number of titles per query, at most 50. Defaults to 20.
+    
+    Returns:
+        Dict[str, Optional[str]]: A dictionary mapping each compound name to its processed
+                                  Wikipedia content, or None if there is no usable page
+                                  (missing, invalid or disambiguation).
+        
+    Raises:
+        ValueError: If batch_size is not between 1 and 50.
+        WikipediaRetrievalError: If a MediaWiki API request fails.
+        
+    Example:
+        >>> contents = wikipedia_retrieve_many(["aspirin", "caffeine"], transport=Transport())
+        >>> print(contents["caffeine"][:100])
+    """
+    if not 1 <= batch_size <= WIKIPEDIA_MAX_BATCH_SIZE:
+        raise ValueError(f"batch_size must be between 1 and {WIKIPEDIA_MAX_BATCH_SIZE}")
+
+    get = r.get if transport is None else transport.get
+    unique_drugs = list(dict.fromkeys(drugs))
+    results = {drug: None for drug in unique_drugs if not drug.strip() or '|' in drug}
+    queryable = [drug for drug in unique_drugs if drug not in results]
+
+    for start in range(0, len(queryable), batch_size):
+        batch = queryable[start:start + batch_size]
+        try:
+            pages, aliases = _wikipedia_batch_query(get, batch)
+        except Exception as e:
+            raise WikipediaRetrievalError(f"Failed to retrieve Wikipedia content for {batch}: {str(e)}")
+        for drug in batch:
+            try:
+                results[drug] = _clean_wikipedia_text(_wikipedia_page_content(pages[_resolve_title(drug, aliases)]))
+            except (KeyError, LookupError, WikipediaRetrievalError):
+                results[drug] = None
+    return results
+
+
+def wikipedia_revisions(drugs: List[str], 
+                        transport: Optional[Transport] = None,
+                        batch_size: int = WIKIPEDIA_MAX_BATCH_SIZE) -> Dict[str, Optional[str]]:
+    """
+    Look up the current revision id of the Wikipedia pages of many compounds.
+    
+    Only page info is requested, so a batch of up to 50 titles costs a single small
+    request. Comparing the result with the revision id stored next to cached content
+    tells whether the cached article is still current.
+    
+    Args:
+        drugs (List[str]): The names of the compounds to look up on Wikipedia.
+        transport (Transport, optional): Pooled HTTP transport used for the MediaWiki requests.
+                                         If None, each request opens a new connection.
+        batch_size (int, optional): Number of titles per query, at most 50. Defaults to 50.
+    
+    Returns:
+        Dict[str, Optional[str]]: A dictionary mapping each compound name to the revision id
+                                  of its page after redirects, or None if there is no page.
+        
+    Raises:
+        ValueError: If batch_size is not between 1 and 50.
+        WikipediaRetrievalError: If a MediaWiki API request fails.
+        
+    Example:
+        >>> revisions = wikipedia_revisions(["aspirin", "caffeine"], transport=Transport())
+    """
+    if not 1 <= batch_size <= WIKIPEDIA_MAX_BATCH_SIZE:
+        raise ValueError(f"batch_size must be between 1 and {WIKIPEDIA_MAX_BATCH_SIZE}")
+
+    get = r.get if transport is None else transport.get
+    unique_drugs = list(dict.fromkeys(drugs))
+    results = {drug: None for drug in unique_drugs if not drug.strip() or '|' in drug}
+    queryable = [drug for drug in unique_drugs if drug not in results]
+
+    for start in range(0, len(queryable), batch_size):
+        batch = queryable[start:start + batch_size]
+        try:
+            pages, aliases = _wikipedia_batch_query(get, batch, WIKIPEDIA_REVISION_PARAMS)
+        except Exception as e:
+            raise WikipediaRetrievalError(f"Failed to look up Wikipedia revisions for {batch}: {str(e)}")
+        for drug in batch:
+            results[drug] = _wikipedia_revision(pages.get(_resolve_title(drug, aliases), {}))
+    return results
+
+
+def refresh_wikipedia_cache(cache: RetrievalCache, 
+                            transport: Optional[Transport] = None,
+                            batch_size: int = WIKIPEDIA_MAX_BATCH_SIZE) -> Dict[str, int]:
+    """
+    Revalidate all expired Wikipedia entries of a cache in bulk.
+    
+    Revision ids of the expired entries are looked up ``batch_size`` titles at a time.
+    Entries whose article is unchanged are marked fresh without downloading anything,
+    changed articles are downloaded again with ``wikipedia_retrieve_many``, and entries
+    without a stored revision id or title, or whose page no longer exists, are left
+    untouched. Entries are keyed by canonical name, which need not be a Wikipedia
+    title, so each entry is looked up under the title stored with it. Only
+    whole-article entries are refreshed; entries retrieved with a content budget or
+    lead section only are left to expire.
+    
+    Args:
+        cache (RetrievalCache): The cache to refresh.
+        transport (Transport, optional): Pooled HTTP transport used for the MediaWiki requests.
+                                         If None, each request opens a new connection.
+        batch_size (int, optional): Number of titles per query, at most 50. Defaults to 50.
+    
+    Returns:
+        Dict[str, int]: The number of entries that were "unchanged", "changed" and "skipped".
+    
+    Raises:
+        ValueError: If batch_size is not between 1 and 50.
+        WikipediaRetrievalError: If a MediaWiki API request fails.
+    """
+    params = _source_params("WIKIPEDIA")
+    entries = [(validator, title) for name, entry_params, validator, title in cache.expired_entries("WIKIPEDIA")
+               if entry_params == params]
+    counts = {"unchanged": 0, "changed": 0, "skipped": 0}
+    validators = {title: validator for validator, title in entries if validator is not None and title is not None}
+    revisions = wikipedia_revisions(list(validators), transport, batch_size)
+    counts["skipped"] = len(entries) - len(revisions)
+
+    changed = []
+    for title, revision in revisions.items():
+        if revision is None:
+            counts["skipped"] += 1
+        elif revision == validators[title]:
+            cache.touch("WIKIPEDIA", title, params)
+            counts["unchanged"] += 1
+        else:
+            changed.append(title)
+
+    contents = wikipedia_retrieve_many(changed, transport, min(batch_size, WIKIPEDIA_BATCH_SIZE))
+    for title in changed:
+        if contents[title] is None:
+            counts["skipped"] += 1
+        else:
+            cache.set("WIKIPEDIA", title, contents[title], params, validator=revisions[title], title=title)
+            counts["changed"] += 1
+    return counts
+
+
+def _resolve_title(title: str, aliases: Dict[str, str]) -> str:
+    """
+    Follow the normalizations and redirects reported by the MediaWiki API for a title.
+    
+    Args:
+        title (str): The requested title.
+        aliases (Dict[str, str]): Mapping from requested to resolved title.
+    
+    Returns:
+        str: The final title of the page.
+    """
+    for _ in range(len(aliases) + 1):
+        if title not in aliases:
+            break
+        title = aliases[title]
+    return title
+
+
+def _wikipedia_revision(page: dict) -> Optional[str]:
+    """
+    Get the revision id of a page from a MediaWiki API query response.
+    
+    Args:
+        page (dict): A single entry of ``query.pages`` (formatversion 2) with page info.
+    
+    Returns:
+        Optional[str]: The latest revision id of the page, or None if the page does not exist.
+    """
+    if page.get('missing') or page.get('invalid') or 'lastrevid' not in page:
+        return None
+    return str(page['lastrevid'])
+
+
+def _wikipedia_batch_query(get: Callable, 
+                           titles: List[str], 
+                           base_params: dict = WIKIPEDIA_PARAMS) -> Tuple[Dict[str, dict], Dict[str, str]]:
+    """
+    Run one MediaWiki API query for several titles, following continuations.
+    
+    Args:
+        get (Callable): The function used to send GET requests.
+        titles (List[str]): The titles to query.
+        base_params (dict, optional): The query parameters without titles. Defaults to
+                                      WIKIPEDIA_PARAMS.
+    
+    Returns:
+        Tuple[Dict[str, dict], Dict[str, str]]: The pages keyed by their final title, and
+                                                the normalizations and redirects as a
+                                                mapping from requested to resolved title.
+    """
+    params = dict(base_params, titles='|'.join(titles))
+    pages = {}
+    aliases = {}
+    while True:
+        response = _checked(get(WIKIPEDIA_API_URL, params=params)).json()
+        query = response.get('query', {})
+        for alias in query.get('normalized', []) + query.get('redirects', []):
+            aliases[alias['from']] = alias['to']
+        for page in query.get('pages', []):
+            pages.setdefault(page['title'], {}).update(page)
+        if 'continue' not in response:
+            return pages, aliases
+        params = dict(params, **response['continue'])
+
+
+def _wikipedia_error(error: Exception) -> type:
+    """
+    Get the WikipediaRetrievalError subclass matching the cause of a failed lookup.
+    
+    Args:
+        error (Exception): The error raised while looking up the page.
+    
+    Returns:
+        type: WikipediaPageNotFoundError, WikipediaDisambiguationError or WikipediaRetrievalError.
+    """
+    if isinstance(error, (WikipediaPageNotFoundError, wikipedia.exceptions.PageError)):
+        return WikipediaPageNotFoundError
+    if isinstance(error, (WikipediaDisambiguationError, wikipedia.exceptions.DisambiguationError)):
+        return WikipediaDisambiguationError
+    return WikipediaRetrievalError
+
+
+def _wikipedia_params(drug: str, max_chars: Optional[int] = None, intro_only: bool = False) -> dict:
+    """
+    Build the MediaWiki API parameters for a page, leaving WIKIPEDIA_PARAMS untouched.
+    
+    Args:
+        drug (str): The title of the page to look up.
+        max_chars (int, optional): Content budget; passed as ``exchars`` if the API accepts it.
+        intro_only (bool, optional): Whether to request only the lead section.
+    
+    Returns:
+        dict: The MediaWiki API query parameters.
+    """
+    params = dict(WIKIPEDIA_PARAMS)
+    params['titles'] = drug
+    if intro_only:
+        params['exintro'] = '1'
+    if max_chars is not None and max_chars <= WIKIPEDIA_MAX_EXCHARS:
+        params['exchars'] = str(max_chars)
+    return params
+
+
+def _wikipedia_page_content(page: dict) -> str:
+    """
+    Extract the plaintext content of a page from a MediaWiki API query response.
+    
+    Mirrors the checks of ``wikipedia.page``: missing pages and disambiguation
+    pages are rejected rather than returned.
+    
+    Args:
+        page (dict): A single entry of ``query.pages`` (formatversion 2).
+    
+    Returns:
+        str: The raw plaintext extract of the page.
+    
+    Raises:
+        WikipediaPageNotFoundError: If the page does not exist.
+        WikipediaDisambiguationError: If the page is a disambiguation page.
+        LookupError: If the page has no extract.
+    """
+    if page.get('missing') or page.get('invalid'):
+        raise WikipediaPageNotFoundError(f"Page id \"{page.get('title')}\" does not match any pages.")
+    if 'disambiguation' in page.get('pageprops', {}):
+        raise WikipediaDisambiguationError(f"\"{page.get('title')}\" may refer to multiple pages.")
+    if page.get('extract') is None:
+        raise LookupError(f"No extract available for \"{page.get('title')}\".")
+    return page['extract']
+
+
+def _clean_wikipedia_text(description: str, max_chars: Optional[int] = None) -> str:
+    """
+    Remove newlines, tabs and repeated whitespace from Wikipedia content.
+    
+    With a budget, only as much of the raw text as needed to fill it is cleaned:
+    cleaning never lengthens text, so a prefix of the raw text is cleaned and
+    doubled until it yields ``max_chars`` characters or the text runs out.
+    
+    Args:
+        description (str): The raw Wikipedia content.
+        max_chars (int, optional): Maximum length of the cleaned content.
+    
+    Returns:
+        str: The cleaned content.
+    """
+    if max_chars is not None:
+        limit = max_chars
+        while True:
+            cleaned = ' '.join(description[:limit].split())
+            if len(cleaned) >= max_chars or limit >= len(description):
+                return cleaned[:max_chars]
+            limit *= 2
+    description = description.replace('\n', ' ')
+    description = description.replace('\t', ' ')
+    description = ' '.join(description.split())
+    return description
+
+
+async def aretrieve(name: str, 
+                    priority: str = "WIKIPEDIA", 
+                    single_source: bool = False, 
+                    ncbikey: Optional[str] = None,
+                    transport: Optional[AsyncTransport] = None,
+                    semaphore: Optional[asyncio.Semaphore] = None,
+                    hedge_delay: Optional[float] = None,
+                    cache: Optional[Cache] = None,
+                    negative_cache: Optional[Cache] = None,
+                    wikipedia_backend: Optional["WikipediaDump"] = None,
+                    pubmed_backend: Optional["PubMedIndex"] = None,
+                    retry_policy: Optional[RetryPolicy] = None,
+                    circuit_breakers: Optional[Dict[str, CircuitBreaker]] = None,
+                    single_flight: Optional[AsyncSingleFlight] = None,
+                    max_chars: Optional[int] = None,
+                    wikipedia_intro: bool = False,
+                    pubmed_query: Optional[PubMedQuery] = None,
+                    source_order: Optional[AdaptiveSourceOrder] = None) -> Tuple[str, str]:
+    """
+    Retrieve information about a chemical compound from various sources without blocking.
+    
+    This coroutine is the asyncio counterpart of ``retrieve`` with the same priority
+    and single_source semantics and the same (source, content) return value, so a
+    single event loop can keep many lookups in flight at once.
+    
+    Args:
+        name (str): The name of the chemical compound to look up.
+        priority (str, optional): Priority source for information retrieval. 
+                                Options: "WIKIPEDIA", "PUBMED". Defaults to "WIKIPEDIA".
+        single_source (bool, optional): Whether to use only the priority source. Defaults to False.
+        ncbikey (str, optional): API key for NCBI/PubMed access.
+        transport (AsyncTransport, optional): Pooled asyncio HTTP transport reused for every request.
+                                              If None, a temporary transport is used for this call.
+        semaphore (asyncio.Semaphore, optional): Semaphore held for the whole lookup, bounding
+                                                 how many lookups run concurrently.
+        hedge_delay (float, optional): If set and single_source is False, start the secondary
+                                       source after this many seconds instead of waiting for
+                                       the priority source to fail. Defaults to None.
+        cache (Cache, optional): RetrievalCache or MemoryCache consulted before, and filled
+                                 after, every source request. Expired Wikipedia entries are
+                                 revalidated by revision id. Defaults to None.
+        negative_cache (Cache, optional): Cache of known misses consulted before every source
+                                          request. Defaults to None.
+        wikipedia_backend (WikipediaDump, optional): Offline backend answering Wikipedia
+                                                     lookups from a local dump; called in the
+                                                     default executor. Defaults to None.
+        pubmed_backend (PubMedIndex, optional): Offline backend answering PubMed title searches
+                                                from a local full-text index; called in the
+                                                default executor. Defaults to None.
+        retry_policy (RetryPolicy, optional): Policy retrying retryable failures of a source with
+                                              jittered exponential backoff. Defaults to None.
+        circuit_breakers (Dict[str, CircuitBreaker], optional): Circuit breaker per source name.
+                                                                Defaults to None.
+        single_flight (AsyncSingleFlight, optional): Group shared by concurrent lookups; a
+                                                     source fetch for a normalized name
+                                                     already in flight is awaited instead of
+                                                     repeated. Defaults to None.
+        max_chars (int, optional): Content budget in characters for Wikipedia content.
+                                   Defaults to None (whole article).
+        wikipedia_intro (bool, optional): Whether to retrieve only the lead section of Wikipedia
+                                          articles. Defaults to False.
+        pubmed_query (PubMedQuery, optional): The PubMed search to run. Defaults to
+                                              DEFAULT_PUBMED_QUERY.
+        source_order (AdaptiveSourceOrder, optional): Observations of source hit rates and
+                                                      latencies used to order the sources.
+                                                      Defaults to None.
+    
+    Returns:
+        Tuple[str, str]: A tuple containing (source, content), or (None, None) if no
+                        source returned content.
+    
+    Raises:
+        ValueError: If priority is not "WIKIPEDIA" or "PUBMED", or if PubMed is a source
+                    and pubmed_backend cannot answer pubmed_query.
+        
+    Example:
+        >>> async with AsyncTransport() as transport:
+        ...     results = await asyncio.gather(*(aretrieve(name, transport=transport)
+        ...                                      for name in ["aspirin", "caffeine"]))
+    """
+    sources = _source_order(priority, single_source)
+    if source_order is not None:
+        sources = source_order.order(name, sources)
+    if pubmed_backend is not None and "PUBMED" in sources:
+        pubmed_backend.check_query(DEFAULT_PUBMED_QUERY if pubmed_query is None else pubmed_query)
+
+    params = {info_source: _source_params(info_source, max_chars, wikipedia_intro, pubmed_query)
+              for info_source in sources}
+    miss_params = {info_source: _source_params(info_source, pubmed_query=pubmed_query) for info_source in sources}
+    cached = _cache_get(cache, sources[0], name, params[sources[0]])
+    if cached is not None:
+        return sources[0], cached
+
+    async with AsyncExitStack() as stack:
+        if semaphore is not None:
+            await stack.enter_async_context(semaphore)
+        if transport is None:
+            transport = await stack.enter_async_context(AsyncTransport())
+        validators = {}
+
+        async def request(info_source: str) -> str:
+            loop = asyncio.get_running_loop()
+            if info_source == "WIKIPEDIA" and wikipedia_backend is not None:
+                return await loop.run_in_executor(None, wikipedia_backend.retrieve, name, max_chars, wikipedia_intro)
+            elif info_source == "WIKIPEDIA" and cache is not None:
+                description, validators[info_source] = await _awikipedia_revalidate(cache, name, transport,
+                                                                                    max_chars, wikipedia_intro)
+                return description
+            elif info_source == "WIKIPEDIA":
+                return await awikipedia_retrieve(name, transport, max_chars, wikipedia_intro)
+            elif pubmed_backend is not None:
+                return await loop.run_in_executor(None, pubmed_backend.retrieve, name,
+                                                  DEFAULT_PUBMED_QUERY if pubmed_query is None else pubmed_query)
+            return await apubmed_retrieve(name, ncbikey, transport, pubmed_query)
+
+        async def fetch(info_source: str) -> str:
+            if single_flight is None:
+                return await fetch_source(info_source)
+            key = (info_source, normalize_name(name), tuple(sorted(params[info_source].items())))
+            return await single_flight.do(key, fetch_source, info_source)
+
+        async def fetch_source(info_source: str) -> str:
+            if info_source != sources[0]:
+                cached = _cache_get(cache, info_source, name, params[info_source])
+                if cached is not None:
+                    return cached
+            known_miss = _negative_get(negative_cache, info_source, name, miss_params[info_source])
+            if known_miss is not None:
+                return known_miss
+            started = time.monotonic()
+            try:
+                description = await _aguarded_call(request, info_source, retry_policy, circuit_breakers)
+            except Exception as e:
+                _observe(source_order, name, info_source, started, e)
+                if isinstance(e, WikipediaRetrievalError):
+                    _negative_set(negative_cache, info_source, name, e, miss_params[info_source])
+                raise
+            _observe(source_order, name, info_source, started, description)
+            _result_set(cache, negative_cache, info_source, name, description, 
+                        validators.get(info_source), params[info_source], miss_params[info_source])
+            return description
+
+        if hedge_delay is not None and len(sources) == 2:
+            return await _ahedged_fetch(sources, fetch, hedge_delay)
+
+        for info_source in sources:
+            try:
+                return info_source, await fetch(info_source)
+            except Exception:
+                continue
+        return None, None
+
+
+async def _ahedged_fetch(sources: List[str], 
+                         fetch: Callable[[str], Awaitable[str]], 
+                         hedge_delay: float) -> Tuple[str, str]:
+    """
+    Asyncio counterpart of ``_hedged_fetch``.
+    
+    The secondary source is started once the priority source has failed or has not
+    answered within ``hedge_delay`` seconds, and is cancelled if the priority source
+    succeeds first.
+    
+    Args:
+        sources (List[str]): The priority and secondary sources.
+        fetch (Callable[[str], Awaitable[str]]): Coroutine function retrieving one source.
+        hedge_delay (float): Seconds to wait on the priority source before starting the
+                             secondary one. 0 starts both at the same time.
+    
+    Returns:
+        Tuple[str, str]: A tuple containing (source, content), or (None, None) if both
+                        sources failed.
+    """
+    primary = asyncio.ensure_future(fetch(sources[0]))
+    secondary = None
+    try:
+        await asyncio.wait([primary], timeout=hedge_delay)
+        if not primary.done() or primary.exception() is not None:
+            secondary = asyncio.ensure_future(fetch(sources[1]))
+        try:
+            return sources[0], await primary
+        except Exception:
+            pass
+        try:
+            return sources[1], await secondary
+        except Exception:
+            return None, None
+    finally:
+        for task in (primary, secondary):
+            if task is not None and not task.done():
+                task.cancel()
+
+
+async def apubmed_retrieve(drug: str, 
+                           ncbikey: Optional[str] = None, 
+                           transport: Optional[AsyncTransport] = None,
+                           query: Optional[PubMedQuery] = None) -> str:
+    """
+    Retrieve abstracts from PubMed for a given compound without blocking.
+    
+    This coroutine is the asyncio counterpart of ``pubmed_retrieve``. Every E-utilities
+    request waits on the process-wide NCBI rate limiter for the given key.
+    
+    Args:
+        drug (str): The name of the compound to search for in PubMed.
+        ncbikey (str, optional): API key for NCBI/PubMed access for higher rate limits.
+        transport (AsyncTransport, optional): Pooled asyncio HTTP transport used for the
+                                              E-utilities requests. If None, a temporary
+                                              transport is used for this call.
+        query (PubMedQuery, optional): The search to run. Defaults to DEFAULT_PUBMED_QUERY.
+    
+    Returns:
+        str: Concatenated abstract texts from PubMed articles, or 'NO_RESULTS' if no articles found.
+        
+    Raises:
+        PubMedSearchXMLParseError: If the search XML response cannot be parsed.
+        PubMedSearchResultsError: If search results cannot be retrieved.
+        PubMedAbstractXMLParseError: If abstract XML cannot be parsed.
+        
+    Example:
+        >>> abstracts = await apubmed_retrieve("aspirin", ncbikey="your_ncbi_key")
+    """
+    if transport is None:
+        async with AsyncTransport() as temporary_transport:
+            return await apubmed_retrieve(drug, ncbikey, temporary_transport, query)
+
+    limiter = get_ncbi_limiter(ncbikey)
+
+    try:
+        await limiter.aacquire()
+        search_content = _checked(await transport.get(PUBMED_SEARCH_URL, 
+                                                      params=_pubmed_search_params(drug, ncbikey, query))).content
+    except Exception:
+        raise PubMedSearchXMLParseError()
+    web_env = _pubmed_web_env(search_content)
+    if web_env is None:
+        return 'NO_RESULTS'
+
+    parser = _PubMedArticleParser()
+    try:
+        await limiter.aacquire()
+        async with transport.stream("GET", PUBMED_FETCH_URL, 
+                                    params=_pubmed_fetch_params(web_env, ncbikey, query)) as response:
+            response.raise_for_status()
+            async for chunk in response.aiter_bytes(STREAM_CHUNK_SIZE):
+                parser.feed(chunk)
+        articles = parser.close()
+    except Exception:
+        raise PubMedAbstractXMLParseError()
+    return _join_abstracts(part for _, parts in articles for part in parts)
+
+
+async def awikipedia_retrieve(drug: str, 
+                              transport: Optional[AsyncTransport] = None,
+                              max_chars: Optional[int] = None,
+                              intro_only: bool = False) -> str:
+    """
+    Retrieve content from Wikipedia for a given compound without blocking.
+    
+    This coroutine is the asyncio counterpart of ``wikipedia_retrieve``. The plaintext
+    extract is requested directly from the MediaWiki API and cleaned the same way.
+    
+    Args:
+        drug (str): The name of the compound to look up on Wikipedia.
+        transport (AsyncTransport, optional): Pooled asyncio HTTP transport used for the
+                                              MediaWiki request. If None, a temporary
+                                              transport is used for this call.
+        max_chars (int, optional): Maximum length of the returned content. Defaults to None.
+        intro_only (bool, optional): Whether to retrieve only the lead section. Defaults to False.
+    
+    Returns:
+        str: The processed Wikipedia content with cleaned formatting.
+        
+    Raises:
+        ValueError: If max_chars is less than 1.
+        WikipediaRetrievalError: If Wikipedia content cannot be retrieved.
+        
+    Example:
+        >>> content = await awikipedia_retrieve("aspirin")
+    """
+    if max_chars is not None and max_chars < 1:
+        raise ValueError("max_chars must be at least 1")
+
+    if transport is None:
+        async with AsyncTransport() as temporary_transport:
+            return await awikipedia_retrieve(drug, temporary_transport, max_chars, intro_only)
+
+    return (await _awikipedia_fetch(drug, transport, max_chars, intro_only))[0]
+
+
+async def _awikipedia_fetch(drug: str, 
+                            transport: AsyncTransport,
+                            max_chars: Optional[int] = None, 
+                            intro_only: bool = False) -> Tuple[str, Optional[str]]:
+    """
+    Asyncio counterpart of ``_wikipedia_fetch``.
+    
+    Args:
+        drug (str): The name of the compound to look up on Wikipedia.
+        transport (AsyncTransport): Pooled asyncio HTTP transport used for the MediaWiki request.
+        max_chars (int, optional): Maximum length of the returned content.
+        intro_only (bool, optional): Whether to retrieve only the lead section.
+    
+    Returns:
+        Tuple[str, Optional[str]]: The processed content and the revision id of the page.
+    
+    Raises:
+        WikipediaRetrievalError: If Wikipedia content cannot be retrieved.
+    """
+    try:
+        response = await transport.get(WIKIPEDIA_API_URL, params=_wikipedia_params(drug, max_chars, intro_only))
+        page = _checked(response).json()['query']['pages'][0]
+        return _clean_wikipedia_text(_wikipedia_page_content(page), max_chars), _wikipedia_revision(page)
     except Exception as e:
-        raise WikipediaRetrievalError(f"Failed to retrieve Wikipedia content for '{drug}': {str(e)}")
\ No newline at end of file
+        raise _wikipedia_error(e)(f"Failed to retrieve Wikipedia content for '{drug}': {str(e)}")
+
+
+async def _awikipedia_revalidate(cache: Cache, 
+                                 name: str, 
+                                 transport: AsyncTransport,
+                                 max_chars: Optional[int] = None, 
+                                 intro_only: bool = False) -> Tuple[str, Optional[str]]:
+    """
+    Asyncio counterpart of ``_wikipedia_revalidate``.
+    
+    Args:
+        cache (Cache): The cache holding the possibly expired entry.
+        name (str): The compound name.
+        transport (AsyncTransport): Pooled asyncio HTTP transport used for the MediaWiki requests.
+        max_chars (int, optional): Maximum length of the returned content.
+        intro_only (bool, optional): Whether to retrieve only the lead section.
+    
+    Returns:
+        Tuple[str, Optional[str]]: The processed content and its revision id.
+    
+    Raises:
+        WikipediaRetrievalError: If Wikipedia content cannot be retrieved.
+    """
+    stale = cache.get_stale("WIKIPEDIA", name, _source_params("WIKIPEDIA", max_chars, intro_only))
+    if stale is not None and stale[1] is not None:
+        try:
+            params = dict(WIKIPEDIA_REVISION_PARAMS, titles=name)
+            page = _checked(await transport.get(WIKIPEDIA_API_URL, params=params)).json()['query']['pages'][0]
+            if _wikipedia_revision(page) == stale[1]:
+                return stale
+        except Exception:
+            pass
+    return await _awikipedia_fetch(name, transport, max_chars, intro_only)
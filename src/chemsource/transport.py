@@ -0,0 +1,333 @@
+"""
+HTTP transport module for chemsource.
+
+This module provides pooled, keep-alive HTTP transports that can be shared by the
+retrieval functions, so that repeated requests to PubMed and Wikipedia reuse open
+connections instead of paying a fresh TCP and TLS handshake on every call. Transport
+serves the blocking functions and AsyncTransport serves their asyncio counterparts.
+"""
+
+from typing import Optional, Dict, Any, AsyncContextManager
+import asyncio
+import threading
+import weakref
+
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+
+from . import __version__
+
+#: Default number of connections kept open per host
+DEFAULT_POOL_SIZE = 10
+
+#: Default connect timeout in seconds
+DEFAULT_CONNECT_TIMEOUT = 5.0
+
+#: Default read timeout in seconds
+DEFAULT_READ_TIMEOUT = 30.0
+
+#: User agent sent with every request, as requested by the Wikipedia and NCBI API policies
+USER_AGENT = f"chemsource/{__version__} (https://github.com/prajitrr/chemsource)"
+
+
+class Transport:
+    """
+    Pooled, keep-alive HTTP transport for retrieval requests.
+
+    A Transport wraps a single ``requests.Session`` whose connection pools are kept
+    alive between calls. Passing the same instance to ``retrieve``, ``pubmed_retrieve``,
+    ``wikipedia_retrieve`` or ``ChemSource`` lets every request to the same host reuse
+    an already established connection. The underlying session is thread-safe for
+    concurrent requests, so one Transport can be shared across worker threads.
+
+    Args:
+        pool_size (int, optional): Maximum number of connections kept open per host.
+                                   Defaults to 10.
+        connect_timeout (float, optional): Seconds to wait for a connection to be established.
+                                           Defaults to 5.0.
+        read_timeout (float, optional): Seconds to wait for the server to send data.
+                                        Defaults to 30.0.
+        gzip (bool, optional): Whether to request gzip-compressed responses. Defaults to True.
+        headers (Dict[str, str], optional): Additional headers sent with every request.
+
+    Attributes:
+        session (requests.Session): The pooled session used for all requests.
+        timeout (Tuple[float, float]): The (connect, read) timeout pair.
+
+    Example:
+        >>> transport = Transport(pool_size=20, read_timeout=10)
+        >>> source, content = retrieve("aspirin", transport=transport)
+    """
+
+    def __init__(self,
+                 pool_size: int = DEFAULT_POOL_SIZE,
+                 connect_timeout: float = DEFAULT_CONNECT_TIMEOUT,
+                 read_timeout: float = DEFAULT_READ_TIMEOUT,
+                 gzip: bool = True,
+                 headers: Optional[Dict[str, str]] = None) -> None:
+        if pool_size < 1:
+            raise ValueError("pool_size must be at least 1")
+
+        self.pool_size = pool_size
+        self.timeout = (connect_timeout, read_timeout)
+        self.gzip = gzip
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+        self.session.headers["User-Agent"] = USER_AGENT
+        self.session.headers["Accept-Encoding"] = "gzip, deflate" if gzip else "identity"
+        if headers is not None:
+            self.session.headers.update(headers)
+
+    def request(self,
+                method: str,
+                url: str,
+                params: Optional[Dict[str, Any]] = None,
+                data: Optional[Dict[str, Any]] = None,
+                stream: bool = False) -> requests.Response:
+        """
+        Send an HTTP request over the pooled session.
+
+        Args:
+            method (str): The HTTP method, e.g. "GET" or "POST".
+            url (str): The URL to request.
+            params (Dict[str, Any], optional): Query string parameters.
+            data (Dict[str, Any], optional): Form-encoded request body.
+            stream (bool, optional): Whether to defer downloading the body until it is
+                                     iterated. Defaults to False.
+
+        Returns:
+            requests.Response: The response of the server.
+        """
+        return self.session.request(method, url, params=params, data=data, timeout=self.timeout, stream=stream)
+
+    def get(self, url: str, params: Optional[Dict[str, Any]] = None, stream: bool = False) -> requests.Response:
+        """
+        Send a GET request over the pooled session.
+
+        Args:
+            url (str): The URL to request.
+            params (Dict[str, Any], optional): Query string parameters.
+            stream (bool, optional): Whether to defer downloading the body until it is
+                                     iterated. Defaults to False.
+
+        Returns:
+            requests.Response: The response of the server.
+        """
+        return self.request("GET", url, params=params, stream=stream)
+
+    def post(self, url: str, data: Optional[Dict[str, Any]] = None, stream: bool = False) -> requests.Response:
+        """
+        Send a form-encoded POST request over the pooled session.
+
+        Args:
+            url (str): The URL to request.
+            data (Dict[str, Any], optional): Form-encoded request body.
+            stream (bool, optional): Whether to defer downloading the body until it is
+                                     iterated. Defaults to False.
+
+        Returns:
+            requests.Response: The response of the server.
+        """
+        return self.request("POST", url, data=data, stream=stream)
+
+    def close(self) -> None:
+        """
+        Close all pooled connections.
+        """
+        self.session.close()
+
+    def __enter__(self) -> "Transport":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+
+class AsyncTransport:
+    """
+    Pooled, keep-alive HTTP transport for asyncio retrieval requests.
+
+    An AsyncTransport wraps a single ``httpx.AsyncClient`` and is the non-blocking
+    counterpart of Transport, used by ``aretrieve``, ``apubmed_retrieve`` and
+    ``awikipedia_retrieve``. At most ``pool_size`` requests are in flight per host;
+    further requests wait for a free connection, which bounds concurrency at the
+    HTTP level no matter how many coroutines share the transport. Since connections
+    belong to the event loop they were opened in, one client is created per event
+    loop on first use there, so the transport can be reused across ``asyncio.run``
+    calls.
+
+    Args:
+        pool_size (int, optional): Maximum number of concurrent connections per host.
+                                   Defaults to 10.
+        connect_timeout (float, optional): Seconds to wait for a connection to be established.
+                                           Defaults to 5.0.
+        read_timeout (float, optional): Seconds to wait for the server to send data.
+                                        Defaults to 30.0.
+        gzip (bool, optional): Whether to request gzip-compressed responses. Defaults to True.
+        headers (Dict[str, str], optional): Additional headers sent with every request.
+
+    Example:
+        >>> async with AsyncTransport(pool_size=50) as transport:
+        ...     source, content = await aretrieve("aspirin", transport=transport)
+    """
+
+    def __init__(self,
+                 pool_size: int = DEFAULT_POOL_SIZE,
+                 connect_timeout: float = DEFAULT_CONNECT_TIMEOUT,
+                 read_timeout: float = DEFAULT_READ_TIMEOUT,
+                 gzip: bool = True,
+                 headers: Optional[Dict[str, str]] = None) -> None:
+        if pool_size < 1:
+            raise ValueError("pool_size must be at least 1")
+
+        self.pool_size = pool_size
+        self.timeout = (connect_timeout, read_timeout)
+        self.gzip = gzip
+        self.headers = {"User-Agent": USER_AGENT,
+                        "Accept-Encoding": "gzip, deflate" if gzip else "identity"}
+        if headers is not None:
+            self.headers.update(headers)
+        self._lock = threading.Lock()
+        self._clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = \
+            weakref.WeakKeyDictionary()
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """
+        The pooled ``httpx.AsyncClient`` of the running event loop, created on first access.
+
+        Raises:
+            RuntimeError: If no event loop is running.
+        """
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            client = self._clients.get(loop)
+            if client is None or client.is_closed:
+                client = self._clients[loop] = httpx.AsyncClient(
+                    headers=self.headers,
+                    timeout=httpx.Timeout(self.timeout[1], connect=self.timeout[0], pool=None),
+                    limits=httpx.Limits(max_connections=self.pool_size,
+                                        max_keepalive_connections=self.pool_size)
+                    )
+            return client
+
+    async def request(self,
+                      method: str,
+                      url: str,
+                      params: Optional[Dict[str, Any]] = None,
+                      data: Optional[Dict[str, Any]] = None) -> httpx.Response:
+        """
+        Send an HTTP request over the pooled client.
+
+        Args:
+            method (str): The HTTP method, e.g. "GET" or "POST".
+            url (str): The URL to request.
+            params (Dict[str, Any], optional): Query string parameters.
+            data (Dict[str, Any], optional): Form-encoded request body.
+
+        Returns:
+            httpx.Response: The response of the server.
+        """
+        return await self.client.request(method, url, params=params, data=data)
+
+    async def get(self, url: str, params: Optional[Dict[str, Any]] = None) -> httpx.Response:
+        """
+        Send a GET request over the pooled client.
+
+        Args:
+            url (str): The URL to request.
+            params (Dict[str, Any], optional): Query string parameters.
+
+        Returns:
+            httpx.Response: The response of the server.
+        """
+        return await self.request("GET", url, params=params)
+
+    async def post(self, url: str, data: Optional[Dict[str, Any]] = None) -> httpx.Response:
+        """
+        Send a form-encoded POST request over the pooled client.
+
+        Args:
+            url (str): The URL to request.
+            data (Dict[str, Any], optional): Form-encoded request body.
+
+        Returns:
+            httpx.Response: The response of the server.
+        """
+        return await self.request("POST", url, data=data)
+
+    def stream(self,
+               method: str,
+               url: str,
+               params: Optional[Dict[str, Any]] = None,
+               data: Optional[Dict[str, Any]] = None) -> AsyncContextManager[httpx.Response]:
+        """
+        Send an HTTP request whose body is read incrementally.
+
+        Args:
+            method (str): The HTTP method, e.g. "GET" or "POST".
+            url (str): The URL to request.
+            params (Dict[str, Any], optional): Query string parameters.
+            data (Dict[str, Any], optional): Form-encoded request body.
+
+        Returns:
+            AsyncContextManager[httpx.Response]: A context manager yielding the response,
+                                                 whose body can be consumed with
+                                                 ``aiter_bytes`` and is released on exit.
+
+        Example:
+            >>> async with transport.stream("GET", url) as response:
+            ...     async for chunk in response.aiter_bytes():
+            ...         parser.feed(chunk)
+        """
+        return self.client.stream(method, url, params=params, data=data)
+
+    def close(self) -> None:
+        """
+        Close all pooled connections.
+
+        Each client is closed in its own event loop. Clients of an event loop that has
+        already closed can no longer be closed and are dropped, so close the transport
+        with ``aclose`` before ending a loop that used it.
+
+        Raises:
+            RuntimeError: If called from an event loop that has a pooled client; use
+                          ``aclose`` there instead.
+        """
+        with self._lock:
+            try:
+                running_loop = asyncio.get_running_loop()
+            except RuntimeError:
+                running_loop = None
+            if running_loop is not None and running_loop in self._clients:
+                raise RuntimeError("The running event loop has a pooled client; use aclose() instead")
+            clients = list(self._clients.items())
+            self._clients.clear()
+        for loop, client in clients:
+            if loop.is_closed():
+                continue
+            if loop.is_running():
+                asyncio.run_coroutine_threadsafe(client.aclose(), loop).result()
+            else:
+                loop.run_until_complete(client.aclose())
+
+    async def aclose(self) -> None:
+        """
+        Close all pooled connections, closing those of the running event loop here.
+        """
+        with self._lock:
+            client = self._clients.pop(asyncio.get_running_loop(), None)
+        if client is not None:
+            await client.aclose()
+        self.close()
+
+    async def __aenter__(self) -> "AsyncTransport":
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self.aclose()
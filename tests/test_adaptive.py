@@ -0,0 +1,111 @@
+"""
+Tests for the adaptive module.
+"""
+import unittest
+from unittest.mock import patch
+from chemsource.adaptive import (
+    AdaptiveSourceOrder,
+    name_pattern,
+    PATTERN_CODE,
+    PATTERN_SYSTEMATIC,
+    PATTERN_COMMON
+)
+from chemsource.retriever import retrieve, MISS_NO_RESULTS
+from chemsource.exceptions import WikipediaPageNotFoundError
+
+
+class TestNamePattern(unittest.TestCase):
+    """Test cases for name_pattern."""
+
+    def test_patterns(self):
+        """Test that codes, systematic names and common names are told apart."""
+        self.assertEqual(name_pattern("GSK-1234"), PATTERN_CODE)
+        self.assertEqual(name_pattern("BMS986165"), PATTERN_CODE)
+        self.assertEqual(name_pattern("2-(acetyloxy)benzoic acid"), PATTERN_SYSTEMATIC)
+        self.assertEqual(name_pattern("(S)-ibuprofen"), PATTERN_SYSTEMATIC)
+        self.assertEqual(name_pattern("aspirin"), PATTERN_COMMON)
+        self.assertEqual(name_pattern("Caffeine"), PATTERN_COMMON)
+
+
+class TestAdaptiveSourceOrder(unittest.TestCase):
+    """Test cases for the AdaptiveSourceOrder class."""
+
+    def test_keeps_priority_until_enough_samples(self):
+        """Test that the priority order is kept until every source has min_samples observations."""
+        order = AdaptiveSourceOrder(min_samples=3)
+        for _ in range(3):
+            order.record("GSK-1234", "WIKIPEDIA", False, 0.5)
+        self.assertEqual(order.order("GSK-1234", ["WIKIPEDIA", "PUBMED"]), ["WIKIPEDIA", "PUBMED"])
+
+        for _ in range(3):
+            order.record("GSK-1234", "PUBMED", True, 0.5)
+        self.assertEqual(order.order("GSK-1234", ["WIKIPEDIA", "PUBMED"]), ["PUBMED", "WIKIPEDIA"])
+        self.assertEqual(order.order("aspirin", ["WIKIPEDIA", "PUBMED"]), ["WIKIPEDIA", "PUBMED"])
+
+    def test_prefers_faster_source_at_equal_hit_rate(self):
+        """Test that latency decides between sources that hit equally often."""
+        order = AdaptiveSourceOrder(min_samples=1, pattern=lambda name: "ALL")
+        order.record("aspirin", "WIKIPEDIA", True, 2.0)
+        order.record("aspirin", "PUBMED", True, 0.5)
+        self.assertEqual(order.order("caffeine", ["WIKIPEDIA", "PUBMED"]), ["PUBMED", "WIKIPEDIA"])
+
+    def test_explain_and_stats(self):
+        """Test that the decision and the observations behind it are exposed."""
+        order = AdaptiveSourceOrder(min_samples=2, smoothing=0.5)
+        order.record("aspirin", "WIKIPEDIA", True, 1.0)
+        order.record("aspirin", "WIKIPEDIA", False, 3.0)
+        order.record("aspirin", "PUBMED", True, 1.0)
+
+        explanation = order.explain("aspirin")
+        self.assertEqual(explanation["pattern"], PATTERN_COMMON)
+        self.assertEqual(explanation["order"], ["WIKIPEDIA", "PUBMED"])
+        self.assertFalse(explanation["adapted"])
+        self.assertAlmostEqual(explanation["expected_time"]["WIKIPEDIA > PUBMED"], 2.5)
+        self.assertAlmostEqual(explanation["expected_time"]["PUBMED > WIKIPEDIA"], 1 + 1 / 3 * 2.0)
+
+        stats = order.stats()[PATTERN_COMMON]["WIKIPEDIA"]
+        self.assertEqual(stats, {"attempts": 2, "hits": 1, "hit_rate": 0.5, "latency": 2.0})
+
+        order.reset()
+        self.assertEqual(order.stats(), {})
+
+    def test_invalid_arguments(self):
+        """Test that invalid settings are rejected."""
+        with self.assertRaises(ValueError):
+            AdaptiveSourceOrder(min_samples=0)
+        with self.assertRaises(ValueError):
+            AdaptiveSourceOrder(smoothing=0)
+
+
+class TestRetrieveAdaptive(unittest.TestCase):
+    """Test cases for adaptive source ordering in retrieve."""
+
+    @patch('chemsource.retriever.pubmed_retrieve')
+    @patch('chemsource.retriever.wikipedia_retrieve')
+    def test_learns_to_skip_missing_source(self, mock_wiki, mock_pubmed):
+        """Test that retrieve records outcomes and starts with PubMed once Wikipedia keeps missing."""
+        mock_wiki.side_effect = WikipediaPageNotFoundError()
+        mock_pubmed.return_value = "abstract"
+        order = AdaptiveSourceOrder(min_samples=2)
+
+        for name in ["GSK-1234", "GSK-5678"]:
+            self.assertEqual(retrieve(name, source_order=order), ("PUBMED", "abstract"))
+        self.assertEqual(mock_wiki.call_count, 2)
+
+        self.assertEqual(retrieve("GSK-9012", source_order=order), ("PUBMED", "abstract"))
+        self.assertEqual(mock_wiki.call_count, 2)
+        stats = order.stats()[PATTERN_CODE]
+        self.assertEqual((stats["WIKIPEDIA"]["hits"], stats["PUBMED"]["hits"]), (0, 3))
+
+    @patch('chemsource.retriever.pubmed_retrieve')
+    def test_no_results_is_a_miss(self, mock_pubmed):
+        """Test that a PubMed search without hits is recorded as a miss."""
+        mock_pubmed.return_value = MISS_NO_RESULTS
+        order = AdaptiveSourceOrder()
+
+        retrieve("aspirin", priority="PUBMED", single_source=True, source_order=order)
+        self.assertEqual(order.stats()[PATTERN_COMMON]["PUBMED"]["hits"], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,145 @@
+"""
+Tests for the batch module.
+"""
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+from chemsource.batch import BatchSubmitter, OpenAIBatchSubmitter, write_batch, read_batch
+from chemsource.chemsource import ChemSource
+from chemsource.classifier import classify
+from chemsource.exceptions import BatchIncompleteError
+
+
+class LocalSubmitter(BatchSubmitter):
+    """Stand-in batch service answering every request with a fixed completion."""
+
+    def __init__(self, answers):
+        self.answers = answers
+        self.batches = {}
+
+    def submit(self, path):
+        with open(path) as batch_file:
+            self.batches[str(len(self.batches))] = [json.loads(line) for line in batch_file]
+        return str(len(self.batches) - 1)
+
+    def status(self, batch_id):
+        return "completed"
+
+    def download(self, batch_id, path):
+        with open(path, "w") as output_file:
+            for request in self.batches[batch_id]:
+                answer = self.answers.get(request["custom_id"])
+                if answer is None:
+                    record = {"custom_id": request["custom_id"], "response": None,
+                              "error": {"code": "server_error", "message": "failed"}}
+                else:
+                    record = {"custom_id": request["custom_id"], "error": None,
+                              "response": {"status_code": 200,
+                                           "body": {"choices": [{"message": {"content": answer}}]}}}
+                output_file.write(json.dumps(record) + "\n")
+
+
+class TestBatch(unittest.TestCase):
+    """Test cases for exporting and ingesting Batch API jobs."""
+
+    def setUp(self):
+        """Create a directory for batch files."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.input_path = os.path.join(self.temp_dir, "job.jsonl")
+        self.output_path = os.path.join(self.temp_dir, "job_output.jsonl")
+
+    def tearDown(self):
+        """Remove the batch files."""
+        shutil.rmtree(self.temp_dir)
+
+    def test_requests_match_classify(self):
+        """Test that exported requests are the requests classify sends."""
+        client = MagicMock()
+        client.chat.completions.create.return_value.choices[0].message.content = "MEDICAL"
+        with patch('chemsource.classifier.OpenAI', return_value=client):
+            classify("aspirin", "pain relief", api_key="key", baseprompt="Classify COMPOUND_NAME: ", top_p=0.5)
+
+        self.assertEqual(write_batch(self.input_path, [("aspirin", "pain relief")], "Classify COMPOUND_NAME: ",
+                                     top_p=0.5), 1)
+        with open(self.input_path) as batch_file:
+            request = json.loads(batch_file.readline())
+        self.assertEqual(request["custom_id"], "aspirin")
+        self.assertEqual(request["url"], "/v1/chat/completions")
+        self.assertEqual(request["body"], client.chat.completions.create.call_args.kwargs)
+
+        with self.assertRaises(ValueError):
+            write_batch(self.input_path, [("aspirin", "a"), ("aspirin", "b")], "COMPOUND_NAME")
+
+    def test_round_trip_through_submitter(self):
+        """Test that a ChemSource job is exported, run and ingested with its post-processing."""
+        chem = ChemSource(model_api_key="key", clean_output=True, allowed_categories=["MEDICAL", "FOOD"])
+        submitter = LocalSubmitter({"aspirin": "MEDICAL, TOXIN", "caffeine": "FOOD, MEDICAL"})
+        information = {"aspirin": ("WIKIPEDIA", "pain relief"), "caffeine": ("WIKIPEDIA", "coffee"),
+                       "benzene": ("WIKIPEDIA", "solvent"), "xyz": ""}
+
+        self.assertEqual(len(chem.export_batch(information, self.input_path)), 3)
+        batch_id = chem.submit_batch(self.input_path, submitter)
+        self.assertTrue(chem.download_batch(batch_id, self.output_path, submitter))
+        self.assertEqual(chem.ingest_batch(self.output_path),
+                         {"aspirin": ["MEDICAL"], "caffeine": ["FOOD", "MEDICAL"], "benzene": None})
+
+        chem.allowed_categories = ["FOOD"]
+        self.assertEqual(chem.ingest_batch(self.output_path)["caffeine"], ["FOOD"])
+        with self.assertRaises(ValueError):
+            ChemSource(custom_client=MagicMock()).submit_batch(self.input_path)
+
+        class StatusOnlySubmitter(BatchSubmitter):
+            def status(self, batch_id):
+                return "completed"
+
+        with self.assertRaises(TypeError):
+            StatusOnlySubmitter()
+
+    def test_export_shares_requests_across_spellings(self):
+        """Test that names with one canonical key share a request and all receive its result."""
+        chem = ChemSource(model_api_key="key", synonyms={"acetylsalicylic acid": "aspirin"})
+        information = {"aspirin ": "pain relief", "Aspirin": "pain relief", "acetylsalicylic acid": "pain relief",
+                       "caffeine": "coffee"}
+
+        names = chem.export_batch(information, self.input_path)
+        self.assertEqual(names, {"aspirin": ["aspirin ", "Aspirin", "acetylsalicylic acid"], "caffeine": ["caffeine"]})
+        submitter = LocalSubmitter({"aspirin": "MEDICAL", "caffeine": "FOOD"})
+        chem.download_batch(chem.submit_batch(self.input_path, submitter), self.output_path, submitter)
+
+        expected = {"aspirin ": "MEDICAL", "Aspirin": "MEDICAL", "acetylsalicylic acid": "MEDICAL", "caffeine": "FOOD"}
+        self.assertEqual(chem.ingest_batch(self.output_path), expected)
+        self.assertEqual(ChemSource(model_api_key="key").ingest_batch(self.output_path, names), expected)
+
+    def test_openai_submitter(self):
+        """Test that the OpenAI submitter uploads, creates and downloads batches."""
+        client = MagicMock()
+        client.files.create.return_value.id = "file-in"
+        client.batches.create.return_value.id = "batch-1"
+        client.batches.retrieve.return_value = SimpleNamespace(status="in_progress")
+        write_batch(self.input_path, [("aspirin", "pain relief")], "COMPOUND_NAME")
+        submitter = OpenAIBatchSubmitter(client)
+
+        self.assertEqual(submitter.submit(self.input_path), "batch-1")
+        client.batches.create.assert_called_once_with(input_file_id="file-in", endpoint="/v1/chat/completions",
+                                                      completion_window="24h")
+        self.assertFalse(ChemSource(model_api_key="key").download_batch("batch-1", self.output_path, submitter))
+        with self.assertRaises(BatchIncompleteError):
+            submitter.download("batch-1", self.output_path)
+
+        client.batches.retrieve.return_value = SimpleNamespace(status="completed", output_file_id="file-out",
+                                                               error_file_id="file-err")
+        client.files.content.side_effect = lambda file_id: SimpleNamespace(content={
+            "file-out": b'{"custom_id": "aspirin", "response": {"status_code": 200, "body": '
+                        b'{"choices": [{"message": {"content": "MEDICAL"}}]}}, "error": null}',
+            "file-err": b'{"custom_id": "caffeine", "response": {"status_code": 500, "body": {}}, "error": null}\n'
+        }[file_id])
+        submitter.download("batch-1", self.output_path)
+        self.assertEqual(read_batch(self.output_path), {"aspirin": "MEDICAL", "caffeine": None})
+
+
+if __name__ == '__main__':
+    unittest.main()
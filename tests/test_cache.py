@@ -0,0 +1,291 @@
+"""
+Tests for the cache module.
+"""
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+import threading
+import unittest
+from unittest.mock import patch, MagicMock
+from chemsource.cache import (RetrievalCache, MemoryCache, ResponseCache, normalize_name, request_key,
+                              RETRIEVAL_CACHE_VERSION)
+from chemsource.classifier import classify
+
+
+class TestRetrievalCache(unittest.TestCase):
+    """Test cases for the SQLite-backed RetrievalCache."""
+    
+    def setUp(self):
+        """Create a temporary cache database."""
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, "cache.sqlite")
+        self.cache = RetrievalCache(self.path)
+    
+    def tearDown(self):
+        """Remove the temporary cache database."""
+        self.cache.close()
+        shutil.rmtree(self.directory)
+    
+    def test_normalize_name(self):
+        """Test that names are case and whitespace folded."""
+        self.assertEqual(normalize_name("  Acetylsalicylic   ACID "), "acetylsalicylic acid")
+    
+    def test_set_and_get(self):
+        """Test that stored content is returned for the normalized name and same params."""
+        self.cache.set("PUBMED", "Aspirin", " abstract", {"retmax": "3", "sort": "relevance"})
+        
+        self.assertEqual(self.cache.get("PUBMED", " aspirin", {"sort": "relevance", "retmax": "3"}), " abstract")
+        self.assertIsNone(self.cache.get("PUBMED", "aspirin", {"retmax": "5", "sort": "relevance"}))
+        self.assertIsNone(self.cache.get("WIKIPEDIA", "aspirin"))
+        
+        stats = self.cache.stats()
+        self.assertEqual(stats["entries"], 1)
+        self.assertEqual(stats["hits"], 1)
+        self.assertEqual(stats["misses"], 2)
+        self.assertEqual(stats["writes"], 1)
+    
+    def test_per_source_ttl(self):
+        """Test that entries expire after the time-to-live of their source."""
+        cache = RetrievalCache(self.path, ttl={"WIKIPEDIA": 10, "PUBMED": None})
+        with patch('chemsource.cache.time.time', return_value=1000.0):
+            cache.set("WIKIPEDIA", "aspirin", "article")
+            cache.set("PUBMED", "aspirin", "abstract")
+        
+        with patch('chemsource.cache.time.time', return_value=1011.0):
+            self.assertIsNone(cache.get("WIKIPEDIA", "aspirin"))
+            self.assertEqual(cache.get("PUBMED", "aspirin"), "abstract")
+            self.assertEqual(cache.purge_expired(), 1)
+        
+        self.assertEqual(cache.stats()["expired"], 1)
+        cache.close()
+    
+    def test_validators_and_revalidation(self):
+        """Test that expired entries keep their validator and can be made fresh again."""
+        cache = RetrievalCache(self.path, ttl={"WIKIPEDIA": 10})
+        with patch('chemsource.cache.time.time', return_value=1000.0):
+            cache.set("WIKIPEDIA", "aspirin", "article", validator="123", title="Aspirin")
+            cache.set("WIKIPEDIA", "caffeine", "other")
+        
+        with patch('chemsource.cache.time.time', return_value=1011.0):
+            self.assertIsNone(cache.get("WIKIPEDIA", "aspirin"))
+            self.assertEqual(cache.get_stale("WIKIPEDIA", "Aspirin"), ("article", "123"))
+            self.assertEqual(sorted(cache.expired_entries("WIKIPEDIA")),
+                             [("aspirin", {}, "123", "Aspirin"), ("caffeine", {}, None, None)])
+            cache.touch("WIKIPEDIA", "aspirin")
+            self.assertEqual(cache.get("WIKIPEDIA", "aspirin"), "article")
+        
+        self.assertIsNone(cache.get_stale("WIKIPEDIA", "ethanol"))
+        self.assertEqual(cache.stats()["revalidated"], 1)
+        cache.close()
+    
+    def test_adds_validator_column_to_existing_database(self):
+        """Test that a cache file written before validators were stored is upgraded in place."""
+        self.cache.close()
+        os.remove(self.path)
+        connection = sqlite3.connect(self.path)
+        connection.execute("CREATE TABLE retrievals (source TEXT NOT NULL, name TEXT NOT NULL, "
+                           "params TEXT NOT NULL, content TEXT NOT NULL, created REAL NOT NULL, "
+                           "PRIMARY KEY (source, name, params))")
+        connection.execute("INSERT INTO retrievals VALUES ('WIKIPEDIA', 'aspirin', '{}', 'article', 0)")
+        connection.commit()
+        connection.close()
+        
+        self.cache = RetrievalCache(self.path, ttl={"WIKIPEDIA": None})
+        self.assertEqual(self.cache.get_stale("WIKIPEDIA", "aspirin"), ("article", None))
+        self.cache.set("WIKIPEDIA", "caffeine", "other", validator="7")
+        self.assertEqual(self.cache.get_stale("WIKIPEDIA", "caffeine"), ("other", "7"))
+    
+    def test_rekeys_entries_of_existing_database(self):
+        """Test that entries stored under the old name normalization stay reachable."""
+        self.cache.close()
+        os.remove(self.path)
+        connection = sqlite3.connect(self.path)
+        connection.execute("CREATE TABLE retrievals (source TEXT NOT NULL, name TEXT NOT NULL, "
+                           "params TEXT NOT NULL, content TEXT NOT NULL, created REAL NOT NULL, "
+                           "PRIMARY KEY (source, name, params))")
+        connection.executemany("INSERT INTO retrievals VALUES (?, ?, '{}', ?, ?)",
+                               [("WIKIPEDIA", "alpha-tocopherol", "older", 1),
+                                ("WIKIPEDIA", "α-tocopherol", "newer", 2),
+                                ("PUBMED", "(+/-)-ibuprofen", " abstract", 1)])
+        connection.commit()
+        connection.close()
+        
+        self.cache = RetrievalCache(self.path, ttl={})
+        self.assertEqual(self.cache.get("WIKIPEDIA", "Alpha-Tocopherol"), "newer")
+        self.assertEqual(self.cache.get("PUBMED", "(RS)-Ibuprofen"), " abstract")
+        self.assertEqual(self.cache.stats()["entries"], 2)
+        self.cache.close()
+        connection = sqlite3.connect(self.path)
+        self.assertEqual(connection.execute("PRAGMA user_version").fetchone()[0], RETRIEVAL_CACHE_VERSION)
+        connection.close()
+    
+    def test_persistence_and_wal_mode(self):
+        """Test that entries survive reopening and the database uses WAL mode."""
+        self.cache.set("WIKIPEDIA", "aspirin", "article")
+        reopened = RetrievalCache(self.path)
+        
+        self.assertEqual(reopened.get("WIKIPEDIA", "aspirin"), "article")
+        mode = reopened._connection().execute("PRAGMA journal_mode").fetchone()[0]
+        self.assertEqual(mode, "wal")
+        reopened.close()
+    
+    def test_concurrent_threads(self):
+        """Test that threads can write to and read from the same cache."""
+        def work(index):
+            self.cache.set("WIKIPEDIA", "compound %d" % index, "content %d" % index)
+            self.assertEqual(self.cache.get("WIKIPEDIA", "compound %d" % index), "content %d" % index)
+        
+        threads = [threading.Thread(target=work, args=(i,)) for i in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        self.assertEqual(self.cache.stats()["entries"], 8)
+        self.assertEqual(self.cache.stats()["hits"], 8)
+
+
+
+class TestMemoryCache(unittest.TestCase):
+    """Test cases for the byte-bounded in-memory MemoryCache."""
+    
+    def test_set_and_get(self):
+        """Test that stored content is returned and tracked in the statistics."""
+        cache = MemoryCache(max_bytes=10000)
+        cache.set("WIKIPEDIA", "Aspirin", "article")
+        
+        self.assertEqual(cache.get("WIKIPEDIA", "aspirin"), "article")
+        self.assertIsNone(cache.get("PUBMED", "aspirin"))
+        stats = cache.stats()
+        self.assertEqual((stats["entries"], stats["hits"], stats["misses"]), (1, 1, 1))
+        self.assertEqual(stats["size"], sys.getsizeof("article"))
+    
+    def test_lru_eviction_by_bytes(self):
+        """Test that the least recently used entries are evicted once the byte capacity is exceeded."""
+        entry_size = sys.getsizeof("x" * 1000)
+        cache = MemoryCache(max_bytes=entry_size * 2)
+        cache.set("WIKIPEDIA", "a", "x" * 1000)
+        cache.set("WIKIPEDIA", "b", "y" * 1000)
+        cache.get("WIKIPEDIA", "a")
+        cache.set("WIKIPEDIA", "c", "z" * 1000)
+        
+        self.assertIsNotNone(cache.get("WIKIPEDIA", "a"))
+        self.assertIsNone(cache.get("WIKIPEDIA", "b"))
+        self.assertIsNotNone(cache.get("WIKIPEDIA", "c"))
+        self.assertEqual(cache.evictions, 1)
+        self.assertLessEqual(cache.size, cache.max_bytes)
+    
+    def test_oversized_entry_not_stored(self):
+        """Test that an entry larger than the capacity is not stored."""
+        cache = MemoryCache(max_bytes=100)
+        cache.set("WIKIPEDIA", "a", "x" * 1000)
+        
+        self.assertEqual(len(cache), 0)
+        self.assertEqual(cache.size, 0)
+    
+    def test_backing_cache(self):
+        """Test that misses fall through to the backing cache and stores are written through."""
+        backing = MagicMock()
+        backing.get.return_value = "from disk"
+        cache = MemoryCache(backing=backing)
+        
+        self.assertEqual(cache.get("PUBMED", "aspirin"), "from disk")
+        self.assertEqual(cache.get("PUBMED", "aspirin"), "from disk")
+        backing.get.assert_called_once()
+        
+        cache.set("WIKIPEDIA", "aspirin", "article")
+        backing.set.assert_called_once_with("WIKIPEDIA", "aspirin", "article", None)
+    
+    def test_concurrent_threads(self):
+        """Test that concurrent stores keep the size accounting consistent."""
+        cache = MemoryCache(max_bytes=sys.getsizeof("x" * 100) * 10)
+        
+        def work(index):
+            for i in range(50):
+                cache.set("PUBMED", "%d-%d" % (index, i), "x" * 100)
+        
+        threads = [threading.Thread(target=work, args=(i,)) for i in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        self.assertEqual(len(cache), 10)
+        self.assertEqual(cache.size, sys.getsizeof("x" * 100) * 10)
+        self.assertEqual(cache.evictions, 390)
+
+
+class TestResponseCache(unittest.TestCase):
+    """Test cases for the SQLite-backed ResponseCache of model completions."""
+    
+    def setUp(self):
+        """Create a temporary cache database."""
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, "responses.sqlite")
+    
+    def tearDown(self):
+        """Remove the temporary cache database."""
+        shutil.rmtree(self.directory)
+    
+    def request(self, content, temperature=0):
+        """Build a chat completion request."""
+        return {"model": "gpt-4o", "messages": [{"role": "system", "content": content}],
+                "temperature": temperature, "top_p": 0, "stream": False}
+    
+    def test_keyed_by_full_request(self):
+        """Test that entries persist and any change to the request misses."""
+        cache = ResponseCache(self.path)
+        cache.set(self.request("aspirin"), "MEDICAL")
+        cache.close()
+        
+        cache = ResponseCache(self.path)
+        self.assertEqual(cache.get(dict(reversed(list(self.request("aspirin").items())))), "MEDICAL")
+        self.assertIsNone(cache.get(self.request("aspirin", temperature=0.5)))
+        self.assertIsNone(cache.get(self.request("caffeine")))
+        self.assertEqual(request_key(self.request("aspirin")), request_key(self.request("aspirin")))
+        self.assertEqual(cache.stats()["hits"], 1)
+        cache.close()
+    
+    def test_eviction(self):
+        """Test that least recently used entries are evicted beyond the size limits."""
+        cache = ResponseCache(self.path, max_entries=2)
+        cache.set(self.request("a"), "A")
+        cache.set(self.request("b"), "B")
+        cache.get(self.request("a"))
+        cache.set(self.request("c"), "C")
+        
+        self.assertEqual(cache.get(self.request("a")), "A")
+        self.assertIsNone(cache.get(self.request("b")))
+        self.assertEqual(cache.stats()["evictions"], 1)
+        
+        cache = ResponseCache(os.path.join(self.directory, "small.sqlite"), max_bytes=3)
+        cache.set(self.request("d"), "DD")
+        self.assertEqual(cache.stats()["entries"], 1)
+        cache.set(self.request("e"), "EEEE")
+        self.assertIsNone(cache.get(self.request("e")))
+        with self.assertRaises(ValueError):
+            ResponseCache(self.path, max_entries=0)
+    
+    def test_classify_post_processes_cached_completions(self):
+        """Test that classify answers from the cache and post-processes cached completions."""
+        cache = ResponseCache(self.path)
+        client = MagicMock()
+        client.chat.completions.create.return_value.choices[0].message.content = "MEDICAL, FOOD"
+        kwargs = {"api_key": "key", "baseprompt": "Classify COMPOUND_NAME: ", "response_cache": cache}
+        
+        with patch('chemsource.classifier.OpenAI', return_value=client) as mock_openai:
+            self.assertEqual(classify("aspirin", "pain relief", **kwargs), "MEDICAL, FOOD")
+            self.assertEqual(classify("aspirin", "pain relief", clean_output=True,
+                                      allowed_categories=["MEDICAL"], **kwargs), ["MEDICAL"])
+            self.assertEqual(classify("aspirin", "pain relief", temperature=0.5, **kwargs), "MEDICAL, FOOD")
+        
+        self.assertEqual(mock_openai.call_count, 2)
+        self.assertEqual(client.chat.completions.create.call_count, 2)
+        self.assertEqual(cache.stats()["entries"], 2)
+        cache.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,6 +1,7 @@
 """
 Tests for the main ChemSource class.
 """
+import asyncio
 import unittest
 from unittest.mock import patch, MagicMock
 from chemsource.chemsource import ChemSource
@@ -37,6 +38,164 @@ class TestChemSource(unittest.TestCase):
         self.assertTrue(chem.clean_output)
         self.assertEqual(chem.allowed_categories, ["MEDICAL", "CHEMICAL"])
 
+    
+    def test_chemsource_owns_transports(self):
+        """Test that ChemSource only uses a pooled Transport when one is provided."""
+        from chemsource.transport import Transport, AsyncTransport
+        
+        chem = ChemSource()
+        self.assertIsNone(chem.transport)
+        self.assertIsInstance(chem.async_transport, AsyncTransport)
+        
+        transport = Transport()
+        self.assertIs(ChemSource(transport=transport).transport, transport)
+    
+    def test_close_releases_owned_transports(self):
+        """Test that close and aclose release the transport ChemSource created, and only that."""
+        from chemsource.transport import AsyncTransport
+        
+        async_transport = AsyncTransport()
+        with ChemSource(async_transport=async_transport) as chem:
+            pass
+        with patch.object(async_transport, 'close') as mock_provided_close:
+            chem.close()
+        mock_provided_close.assert_not_called()
+        
+        async def run():
+            async with ChemSource() as chem:
+                client = chem.async_transport.client
+            return client
+        
+        self.assertTrue(asyncio.run(run()).is_closed)
+    
+    def test_classify_coalesces_concurrent_duplicates(self):
+        """Test that concurrent identical classifications share one model call."""
+        import threading
+        
+        chem = ChemSource(model_api_key="key")
+        release = threading.Event()
+        
+        def slow_classify(*args):
+            release.wait()
+            return "MEDICAL"
+        
+        results = []
+        with patch('chemsource.chemsource.cls', side_effect=slow_classify) as mock_classify:
+            threads = [threading.Thread(target=lambda: results.append(chem.classify("aspirin", "pain relief")))
+                       for _ in range(3)]
+            for thread in threads:
+                thread.start()
+            while chem.single_flight.calls + chem.single_flight.shared < 3:
+                threading.Event().wait(0.001)
+            release.set()
+            for thread in threads:
+                thread.join()
+        
+        self.assertEqual(results, ["MEDICAL"] * 3)
+        self.assertEqual(mock_classify.call_count, 1)
+        self.assertIsNone(ChemSource(coalesce=False).single_flight)
+    
+    def test_batch_shares_work_across_spellings(self):
+        """Test that batch lookups run once per canonical name and report every input name."""
+        chem = ChemSource(model_api_key="key", synonyms={"acetylsalicylic acid": "aspirin"})
+        names = ["Aspirin", "aspirin ", "Acetylsalicylic Acid", "caffeine"]
+        
+        with patch('chemsource.chemsource.ret', side_effect=lambda name, *args, **kwargs: ("WIKIPEDIA", name)) as mock_retrieve:
+            results = chem.retrieve_many(names, max_workers=2)
+        
+        self.assertEqual(mock_retrieve.call_count, 2)
+        self.assertEqual(list(results), names)
+        self.assertEqual(results["Acetylsalicylic Acid"], ("WIKIPEDIA", "Aspirin"))
+        self.assertEqual(results["caffeine"], ("WIKIPEDIA", "caffeine"))
+        
+        with patch('chemsource.chemsource.ret', return_value=("WIKIPEDIA", "pain relief")), \
+             patch('chemsource.chemsource.cls', return_value="MEDICAL") as mock_classify:
+            results = chem.chemsource_many(names)
+        
+        self.assertEqual(mock_classify.call_count, 2)
+        self.assertEqual(results["Acetylsalicylic Acid"], (("WIKIPEDIA", "pain relief"), "MEDICAL"))
+    
+    def test_batch_classify(self):
+        """Test that batch classification sends compounds together and keeps chemsource's results."""
+        response = MagicMock()
+        response.choices[0].message.content = '{"1": "MEDICAL", "2": "FOOD"}'
+        client = MagicMock()
+        client.chat.completions.create.return_value = response
+        chem = ChemSource(custom_client=client)
+        information = {"aspirin": ("WIKIPEDIA", "pain relief"), "caffeine": ("WIKIPEDIA", "coffee"), "xyz": ("", "")}
+        
+        with patch('chemsource.chemsource.ret', side_effect=lambda name, *args, **kwargs: information[name]):
+            results = chem.chemsource_many(["aspirin", "Aspirin", "caffeine", "xyz"], batch_classify=True)
+        
+        self.assertEqual(client.chat.completions.create.call_count, 1)
+        self.assertEqual(results, {"aspirin": (("WIKIPEDIA", "pain relief"), "MEDICAL"),
+                                   "Aspirin": (("WIKIPEDIA", "pain relief"), "MEDICAL"),
+                                   "caffeine": (("WIKIPEDIA", "coffee"), "FOOD"),
+                                   "xyz": ((None, None), None)})
+        self.assertEqual(chem.classify_many({"benzene": ""}), {"benzene": None})
+    
+    def test_achemsource_matches_chemsource(self):
+        """Test that the asyncio pipeline retrieves, classifies and coalesces like the blocking one."""
+        from unittest.mock import AsyncMock
+        
+        response = MagicMock()
+        response.choices[0].message.content = "MEDICAL, FOOD"
+        client = MagicMock()
+        client.chat.completions.create.return_value = response
+        chem = ChemSource(custom_client=client, clean_output=True, allowed_categories=["MEDICAL", "FOOD"],
+                          max_concurrency=4)
+        
+        with patch('chemsource.chemsource.ret', return_value=("WIKIPEDIA", "pain relief")):
+            expected = chem.chemsource("aspirin")
+        
+        async_client = MagicMock()
+        async_client.chat.completions.create = AsyncMock(return_value=response)
+        chem.custom_client = async_client
+        
+        async def run():
+            return await asyncio.gather(chem.achemsource("aspirin"), chem.achemsource("Aspirin"),
+                                        chem.aclassify("aspirin", ""))
+        
+        with patch('chemsource.chemsource.aret', AsyncMock(return_value=("WIKIPEDIA", "pain relief"))):
+            results = asyncio.run(run())
+        
+        self.assertEqual(results, [expected, expected, None])
+        self.assertEqual(async_client.chat.completions.create.await_count, 1)
+        with self.assertRaises(ValueError):
+            asyncio.run(ChemSource().achemsource("aspirin"))
+    
+    def test_content_budget(self):
+        """Test that the retrieval budget follows max_tokens and the prompt length."""
+        chem = ChemSource(max_tokens=1000, prompt="Classify COMPOUND_NAME: ", budget_retrieval=True)
+        self.assertEqual(chem.content_budget(), 1000 - len("Classify : "))
+        
+        chem.set_token_limit(5)
+        self.assertEqual(chem.content_budget(), 1)
+        self.assertIsNone(ChemSource().content_budget())
+    
+    def test_aretrieve_bounded_concurrency(self):
+        """Test that aretrieve runs at most max_concurrency lookups at once."""
+        chem = ChemSource(max_concurrency=2)
+        running = []
+        peak = []
+        
+        async def fake_aretrieve(name, *args, semaphore=None, **kwargs):
+            async with semaphore:
+                running.append(name)
+                peak.append(len(running))
+                await asyncio.sleep(0.01)
+                running.remove(name)
+            return "WIKIPEDIA", name
+        
+        async def run():
+            return await asyncio.gather(*(chem.aretrieve(str(i)) for i in range(6)))
+        
+        with patch('chemsource.chemsource.aret', side_effect=fake_aretrieve):
+            results = asyncio.run(run())
+        
+        self.assertEqual(results, [("WIKIPEDIA", str(i)) for i in range(6)])
+        self.assertEqual(max(peak), 2)
+
 
 if __name__ == '__main__':
     unittest.main()
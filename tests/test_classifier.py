@@ -6,16 +6,22 @@ This module tests the AI classification functionality of the chemsource package
 with various configurations and edge cases.
 """
 
+import asyncio
 import unittest
 import sys
 import os
-from unittest.mock import Mock, patch, MagicMock
+from unittest.mock import Mock, patch, MagicMock, AsyncMock
+import httpx
+from openai import AsyncOpenAI
 from spellchecker import SpellChecker
 
 # Add the src directory to the path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
 
-from chemsource.classifier import classify
+from chemsource.classifier import classify, aclassify, classify_many
+from chemsource.config import BATCH_COMPOUND_NAME, BATCH_INSTRUCTIONS
+
+BATCH_PROMPT_OVERHEAD = BATCH_COMPOUND_NAME + ": " + BATCH_INSTRUCTIONS
 
 
 class TestClassifier(unittest.TestCase):
@@ -243,5 +249,179 @@ class TestClassifier(unittest.TestCase):
         self.assertEqual(call_args[1]['stream'], False)
 
 
+class TestClassifyMany(unittest.TestCase):
+    """Test cases for classifying several compounds per request."""
+
+    def client(self, *contents):
+        """Build a custom client answering successive requests with the given contents."""
+        responses = []
+        for content in contents:
+            response = Mock()
+            response.choices = [Mock()]
+            response.choices[0].message.content = content
+            responses.append(response)
+        client = Mock()
+        client.chat.completions.create.side_effect = responses
+        return client
+
+    def test_one_request_for_all_compounds(self):
+        """Test that answers in one JSON response become the per-compound results of classify."""
+        client = self.client('```json\n{"1": "MEDICAL, FOOD", "2": ["INFO"], "3": "TOXIN"}\n```')
+        compounds = [("aspirin", "pain relief"), ("caffeine", "coffee"), ("benzene", "solvent")]
+
+        results = classify_many(compounds, baseprompt="Classify COMPOUND_NAME: ", custom_client=client,
+                                clean_output=True, allowed_categories=["MEDICAL", "FOOD", "INFO"])
+
+        self.assertEqual(results, [["MEDICAL", "FOOD"], ["INFO"], []])
+        self.assertEqual(client.chat.completions.create.call_count, 1)
+        prompt = client.chat.completions.create.call_args[1]['messages'][0]['content']
+        self.assertIn("### COMPOUND 2: caffeine\ncoffee\n", prompt)
+        self.assertNotIn("COMPOUND_NAME", prompt)
+
+    def test_unparsed_answers_fall_back_to_single_calls(self):
+        """Test that missing answers and unparseable responses are classified one at a time."""
+        client = self.client('{"1": "MEDICAL"}', "CHEMICAL", "not json", "FOOD", "INFO")
+        compounds = [("aspirin", "pain relief"), ("benzene", "solvent")]
+
+        self.assertEqual(classify_many(compounds, baseprompt="COMPOUND_NAME: ", custom_client=client),
+                         ["MEDICAL", "CHEMICAL"])
+        self.assertEqual(classify_many(compounds, baseprompt="COMPOUND_NAME: ", custom_client=client),
+                         ["FOOD", "INFO"])
+        last_prompt = client.chat.completions.create.call_args[1]['messages'][0]['content']
+        self.assertEqual(last_prompt, "benzene: solvent")
+
+    def test_batches_follow_length_budget(self):
+        """Test that requests hold as many compounds as max_length and max_batch_size allow."""
+        client = self.client('{"1": "A", "2": "B"}', '{"1": "A", "2": "B"}', "A")
+        compounds = [(f"c{i}", "x" * 20) for i in range(5)]
+        entry_length = len("\n### COMPOUND 1: c0\n" + "x" * 20 + "\n")
+
+        with patch('chemsource.classifier.OpenAI', return_value=client):
+            results = classify_many(compounds, api_key="key", baseprompt="COMPOUND_NAME: ",
+                                    max_length=len(BATCH_PROMPT_OVERHEAD) + 2 * entry_length + 10,
+                                    max_batch_size=3)
+
+        self.assertEqual(results, ["A", "B", "A", "B", "A"])
+        self.assertEqual(client.chat.completions.create.call_count, 3)
+        with self.assertRaises(ValueError):
+            classify_many(compounds, custom_client=client, baseprompt="COMPOUND_NAME", max_batch_size=0)
+
+
+class TestAClassify(unittest.IsolatedAsyncioTestCase):
+    """Test cases for the asyncio aclassify function."""
+
+    def response(self, content):
+        """Build a chat completion response with the given content."""
+        response = Mock()
+        response.choices = [Mock()]
+        response.choices[0].message.content = content
+        return response
+
+    async def test_output_matches_classify(self):
+        """Test that aclassify returns exactly what classify returns for every output mode."""
+        content = "Aspirin relieves pain. EXPLANATION_COMPLETE MEDICAL, FOOD,  TOXIN"
+        options = [{},
+                   {"clean_output": True, "allowed_categories": ["MEDICAL", "FOOD"]},
+                   {"clean_output": True, "allowed_categories": ["MEDICAL", "FOOD"],
+                    "explanation": True, "output_explanation": True}]
+        sync_client = Mock()
+        sync_client.chat.completions.create.return_value = self.response(content)
+        async_client = Mock()
+        async_client.chat.completions.create = AsyncMock(return_value=self.response(content))
+
+        for kwargs in options:
+            with self.subTest(**{key: str(value) for key, value in kwargs.items()}):
+                expected = classify("aspirin", "pain relief", baseprompt="Classify COMPOUND_NAME: ",
+                                    custom_client=sync_client, **kwargs)
+                for client in (sync_client, async_client):
+                    result = await aclassify("aspirin", "pain relief", baseprompt="Classify COMPOUND_NAME: ",
+                                             custom_client=client, **kwargs)
+                    self.assertEqual(result, expected)
+
+        self.assertEqual(async_client.chat.completions.create.await_args.kwargs,
+                         sync_client.chat.completions.create.call_args.kwargs)
+        with self.assertRaises(ValueError):
+            await aclassify("aspirin", "pain relief", baseprompt="COMPOUND_NAME", clean_output=True)
+
+    async def test_default_and_pooled_clients(self):
+        """Test that AsyncOpenAI clients are created per call or taken from the pool."""
+        client = MagicMock()
+        client.chat.completions.create = AsyncMock(return_value=self.response("CHEMICAL"))
+        client.__aenter__.return_value = client
+
+        with patch('chemsource.classifier.AsyncOpenAI', return_value=client) as mock_openai:
+            result = await aclassify("benzene", "solvent", api_key="key", baseprompt="COMPOUND_NAME: ",
+                                     model="deepseek-chat")
+        self.assertEqual(result, "CHEMICAL")
+        mock_openai.assert_called_once_with(api_key="key", base_url="https://api.deepseek.com")
+        self.assertEqual(client.chat.completions.create.await_args.kwargs["messages"][0]["role"], "system")
+
+        pool = Mock()
+        pool.get_async.return_value = client
+        self.assertEqual(await aclassify("benzene", "solvent", api_key="key", baseprompt="COMPOUND_NAME: ",
+                                         client_pool=pool), "CHEMICAL")
+        pool.get_async.assert_called_once_with("key", None)
+
+    async def test_bounded_concurrency_and_cancellation(self):
+        """Test that the semaphore bounds concurrent calls and cancellation reaches the request."""
+        running = []
+        peak = []
+        cancelled = []
+
+        async def create(**kwargs):
+            running.append(1)
+            peak.append(len(running))
+            try:
+                await asyncio.sleep(0.01 if len(peak) < 7 else 10)
+            except asyncio.CancelledError:
+                cancelled.append(1)
+                raise
+            finally:
+                running.pop()
+            return self.response("MEDICAL")
+
+        client = Mock()
+        client.chat.completions.create = create
+        semaphore = asyncio.Semaphore(2)
+        results = await asyncio.gather(*(aclassify(str(i), "text", baseprompt="COMPOUND_NAME",
+                                                   custom_client=client, semaphore=semaphore)
+                                         for i in range(6)))
+        self.assertEqual(results, ["MEDICAL"] * 6)
+        self.assertEqual(max(peak), 2)
+
+        task = asyncio.ensure_future(aclassify("slow", "text", baseprompt="COMPOUND_NAME",
+                                               custom_client=client, semaphore=semaphore))
+        await asyncio.sleep(0.01)
+        task.cancel()
+        with self.assertRaises(asyncio.CancelledError):
+            await task
+        self.assertEqual(cancelled, [1])
+        self.assertFalse(semaphore.locked())
+
+    async def test_async_openai_client_awaited_directly(self):
+        """Test that an AsyncOpenAI custom client is awaited in the event loop, not in the executor."""
+        requests = []
+
+        def handler(request):
+            requests.append(request)
+            return httpx.Response(200, json={"id": "1", "object": "chat.completion", "created": 0,
+                                             "model": "gpt-4o",
+                                             "choices": [{"index": 0, "finish_reason": "stop",
+                                                          "message": {"role": "assistant", "content": "MEDICAL"}}]})
+
+        async with AsyncOpenAI(api_key="key", base_url="https://api.example.org/v1",
+                               http_client=httpx.AsyncClient(transport=httpx.MockTransport(handler))) as client:
+            loop = asyncio.get_running_loop()
+            with patch.object(loop, 'run_in_executor', wraps=loop.run_in_executor) as mock_executor:
+                result = await aclassify("aspirin", "pain relief", baseprompt="Classify COMPOUND_NAME: ",
+                                         custom_client=client)
+            create = client.chat.completions.create
+
+        self.assertEqual(result, "MEDICAL")
+        self.assertEqual(len(requests), 1)
+        for call in mock_executor.call_args_list:
+            self.assertNotEqual(getattr(call.args[1], "func", None), create)
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,89 @@
+"""
+Tests for the clients module.
+"""
+import asyncio
+import threading
+import unittest
+from unittest.mock import MagicMock
+from chemsource.clients import ClientPool, get_client_pool, model_base_url, DEEPSEEK_BASE_URL
+from chemsource.classifier import classify
+
+
+class TestClientPool(unittest.TestCase):
+    """Test cases for the ClientPool class."""
+
+    def test_clients_reused_per_key(self):
+        """Test that one client is created per API key, base URL and timeouts."""
+        with ClientPool(max_connections=5, max_keepalive_connections=2) as pool:
+            client = pool.get("key")
+            self.assertIs(pool.get("key"), client)
+            self.assertIsNot(pool.get("other"), client)
+            self.assertIsNot(pool.get("key", DEEPSEEK_BASE_URL), client)
+            self.assertIsNot(pool.get("key", read_timeout=10.0), client)
+            self.assertEqual(pool.stats(), {"clients": 4, "created": 4, "reused": 1})
+        self.assertEqual(pool.stats()["clients"], 0)
+
+    def test_concurrent_callers_share_client(self):
+        """Test that threads asking for the same key get the same client."""
+        pool = ClientPool()
+        clients = []
+        threads = [threading.Thread(target=lambda: clients.append(pool.get("key"))) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len({id(client) for client in clients}), 1)
+        self.assertEqual(pool.stats()["created"], 1)
+        pool.close()
+
+    def test_close_closes_async_clients(self):
+        """Test that close closes the asynchronous clients of other event loops."""
+        pool = ClientPool()
+        loop = asyncio.new_event_loop()
+        try:
+            async def get_client():
+                return pool.get_async("key")
+
+            client = loop.run_until_complete(get_client())
+            pool.close()
+            self.assertTrue(client.is_closed())
+            self.assertEqual(pool.stats()["clients"], 0)
+        finally:
+            loop.close()
+
+    def test_close_in_loop_requires_aclose(self):
+        """Test that close refuses to drop the running loop's clients and aclose closes them."""
+        pool = ClientPool()
+
+        async def close_pool():
+            client = pool.get_async("key")
+            with self.assertRaises(RuntimeError):
+                pool.close()
+            await pool.aclose()
+            return client
+
+        self.assertTrue(asyncio.run(close_pool()).is_closed())
+
+    def test_defaults(self):
+        """Test the model base URLs, argument validation and the process-wide pool."""
+        self.assertEqual(model_base_url("deepseek-chat"), DEEPSEEK_BASE_URL)
+        self.assertIsNone(model_base_url("gpt-4o"))
+        self.assertIs(get_client_pool(), get_client_pool())
+        with self.assertRaises(ValueError):
+            ClientPool(max_connections=0)
+
+    def test_classify_uses_pool(self):
+        """Test that classify asks the pool for the client of the model's base URL."""
+        pool = MagicMock()
+        pool.get.return_value.chat.completions.create.return_value.choices[0].message.content = "CHEMICAL"
+
+        result = classify("benzene", "organic compound", api_key="key", baseprompt="Classify COMPOUND_NAME: ",
+                          model="deepseek-chat", client_pool=pool)
+
+        self.assertEqual(result, "CHEMICAL")
+        pool.get.assert_called_once_with("key", DEEPSEEK_BASE_URL)
+
+
+if __name__ == '__main__':
+    unittest.main()
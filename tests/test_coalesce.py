@@ -0,0 +1,163 @@
+"""
+Tests for the coalesce module.
+"""
+import asyncio
+import threading
+import unittest
+from unittest.mock import patch
+from chemsource.coalesce import SingleFlight, AsyncSingleFlight
+from chemsource.retriever import retrieve
+
+
+class TestSingleFlight(unittest.TestCase):
+    """Test cases for the thread-safe SingleFlight group."""
+
+    def run_concurrently(self, flight, func, count=5):
+        """Call func through the group from several threads while the first call is blocked."""
+        results = []
+        errors = []
+
+        def work():
+            try:
+                results.append(flight.do("aspirin", func))
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=work) for _ in range(count)]
+        for thread in threads:
+            thread.start()
+        while flight.calls + flight.shared < count:
+            threading.Event().wait(0.001)
+        return threads, results, errors
+
+    def test_concurrent_calls_share_result(self):
+        """Test that concurrent callers with the same key run the function once."""
+        flight = SingleFlight()
+        release = threading.Event()
+        calls = []
+
+        def slow():
+            calls.append(1)
+            release.wait()
+            return "article"
+
+        threads, results, errors = self.run_concurrently(flight, slow)
+        release.set()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(results, ["article"] * 5)
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(flight.stats(), {"calls": 1, "shared": 4, "in_flight": 0})
+
+        self.assertEqual(flight.do("aspirin", lambda: "again"), "again")
+
+    def test_errors_are_shared(self):
+        """Test that waiting callers receive the exception of the shared call."""
+        flight = SingleFlight()
+        release = threading.Event()
+
+        def failing():
+            release.wait()
+            raise ValueError("down")
+
+        threads, results, errors = self.run_concurrently(flight, failing, count=3)
+        release.set()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(results, [])
+        self.assertEqual(len(errors), 3)
+        self.assertTrue(all(isinstance(error, ValueError) for error in errors))
+
+
+class TestAsyncSingleFlight(unittest.IsolatedAsyncioTestCase):
+    """Test cases for the asyncio AsyncSingleFlight group."""
+
+    async def test_concurrent_calls_share_result(self):
+        """Test that concurrent tasks with the same key await a single coroutine."""
+        flight = AsyncSingleFlight()
+        calls = []
+
+        async def slow(name):
+            calls.append(name)
+            await asyncio.sleep(0.01)
+            return name.upper()
+
+        results = await asyncio.gather(flight.do("a", slow, "a"), flight.do("a", slow, "a"), flight.do("b", slow, "b"))
+
+        self.assertEqual(results, ["A", "A", "B"])
+        self.assertEqual(calls, ["a", "b"])
+        self.assertEqual(flight.stats(), {"calls": 2, "shared": 1, "in_flight": 0})
+
+    async def test_cancelled_caller_does_not_cancel_others(self):
+        """Test that cancelling one waiting caller leaves the shared operation running."""
+        flight = AsyncSingleFlight()
+
+        async def slow():
+            await asyncio.sleep(0.01)
+            return "article"
+
+        first = asyncio.ensure_future(flight.do("aspirin", slow))
+        second = asyncio.ensure_future(flight.do("aspirin", slow))
+        await asyncio.sleep(0)
+        first.cancel()
+
+        self.assertEqual(await second, "article")
+
+    async def test_cancelling_only_caller_cancels_operation(self):
+        """Test that cancelling the last waiting caller cancels the shared operation."""
+        flight = AsyncSingleFlight()
+        cancelled = []
+
+        async def slow():
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.append(True)
+                raise
+            return "article"
+
+        caller = asyncio.ensure_future(flight.do("aspirin", slow))
+        await asyncio.sleep(0)
+        caller.cancel()
+        with self.assertRaises(asyncio.CancelledError):
+            await caller
+        await asyncio.sleep(0)
+
+        self.assertEqual(cancelled, [True])
+        self.assertEqual(flight.stats()["in_flight"], 0)
+
+
+class TestRetrieveCoalescing(unittest.TestCase):
+    """Test cases for coalesced lookups in retrieve."""
+
+    @patch('chemsource.retriever.wikipedia_retrieve')
+    def test_duplicate_names_fetched_once(self, mock_wiki):
+        """Test that threads looking up the same normalized name share one request."""
+        release = threading.Event()
+
+        def slow(name, *args):
+            release.wait()
+            return "article"
+
+        mock_wiki.side_effect = slow
+        flight = SingleFlight()
+        results = []
+        threads = [threading.Thread(target=lambda name=name: results.append(
+                       retrieve(name, single_source=True, single_flight=flight)))
+                   for name in ["Aspirin", "aspirin ", "ASPIRIN"]]
+        for thread in threads:
+            thread.start()
+        while flight.calls + flight.shared < 3:
+            threading.Event().wait(0.001)
+        release.set()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(results, [("WIKIPEDIA", "article")] * 3)
+        self.assertEqual(mock_wiki.call_count, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
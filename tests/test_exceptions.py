@@ -8,7 +8,9 @@ from chemsource.exceptions import (
     PubMedSearchResultsError,
     PubMedAbstractRetrievalError,
     PubMedAbstractConcatenationError,
-    WikipediaRetrievalError
+    WikipediaRetrievalError,
+    WikipediaPageNotFoundError,
+    WikipediaDisambiguationError
 )
 
 
@@ -23,7 +25,9 @@ class TestExceptions(unittest.TestCase):
             PubMedSearchResultsError,
             PubMedAbstractRetrievalError,
             PubMedAbstractConcatenationError,
-            WikipediaRetrievalError
+            WikipediaRetrievalError,
+            WikipediaPageNotFoundError,
+            WikipediaDisambiguationError
         ]
         
         for exc_class in exceptions:
@@ -39,7 +43,9 @@ class TestExceptions(unittest.TestCase):
             PubMedSearchResultsError(test_message),
             PubMedAbstractRetrievalError(test_message),
             PubMedAbstractConcatenationError(test_message),
-            WikipediaRetrievalError(test_message)
+            WikipediaRetrievalError(test_message),
+            WikipediaPageNotFoundError(test_message),
+            WikipediaDisambiguationError(test_message)
         ]
         
         for exc in exceptions:
@@ -56,6 +62,11 @@ class TestExceptions(unittest.TestCase):
         with self.assertRaises(WikipediaRetrievalError) as context:
             raise WikipediaRetrievalError(test_message)
         self.assertEqual(str(context.exception), test_message)
+        
+        with self.assertRaises(WikipediaRetrievalError):
+            raise WikipediaPageNotFoundError()
+        with self.assertRaises(WikipediaRetrievalError):
+            raise WikipediaDisambiguationError()
 
 
 if __name__ == '__main__':
@@ -0,0 +1,47 @@
+"""
+Tests for the names module.
+"""
+import unittest
+from chemsource.names import canonical_name, NameCanonicalizer
+
+
+class TestCanonicalName(unittest.TestCase):
+    """Test cases for canonical_name."""
+
+    def test_case_whitespace_and_unicode(self):
+        """Test that case, whitespace, width and dash variants are folded."""
+        for name in ["Aspirin", "aspirin ", "ASPIRIN", "ＡＳＰＩＲＩＮ"]:
+            self.assertEqual(canonical_name(name), "aspirin")
+        self.assertEqual(canonical_name("Acetylsalicylic \t ACID"), "acetylsalicylic acid")
+        self.assertEqual(canonical_name("β‐Carotene"), "beta-carotene")
+
+    def test_greek_letters(self):
+        """Test that Greek letters are spelled out, including the micro sign."""
+        self.assertEqual(canonical_name("α-Tocopherol"), canonical_name("alpha-tocopherol"))
+        self.assertEqual(canonical_name("µ-conotoxin"), "mu-conotoxin")
+
+    def test_stereo_prefixes(self):
+        """Test that stereo descriptors are written in one form without merging stereoisomers."""
+        self.assertEqual(canonical_name("( S ) Ibuprofen"), "(s)-ibuprofen")
+        for name in ["(+/-)-ibuprofen", "(RS)-ibuprofen", "(R,S)-ibuprofen", "rac-ibuprofen", "(±)-Ibuprofen"]:
+            self.assertEqual(canonical_name(name), "(±)-ibuprofen")
+        self.assertEqual(canonical_name("DL-Alanine"), "(±)-alanine")
+        self.assertNotEqual(canonical_name("(R)-ibuprofen"), canonical_name("(S)-ibuprofen"))
+        self.assertEqual(canonical_name("(2-Hydroxyethyl)trimethylammonium"), "(2-hydroxyethyl)trimethylammonium")
+
+
+class TestNameCanonicalizer(unittest.TestCase):
+    """Test cases for the NameCanonicalizer class."""
+
+    def test_synonyms(self):
+        """Test that synonyms resolve to the preferred name whatever their spelling."""
+        names = NameCanonicalizer({"Acetylsalicylic acid": "Aspirin"})
+
+        self.assertEqual(names.query("ACETYLSALICYLIC  ACID "), "Aspirin")
+        self.assertEqual(names.query(" caffeine "), "caffeine")
+        self.assertEqual(names.key("acetylsalicylic acid"), names.key("aspirin"))
+        self.assertNotEqual(names.key("caffeine"), names.key("aspirin"))
+
+
+if __name__ == '__main__':
+    unittest.main()
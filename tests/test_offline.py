@@ -0,0 +1,224 @@
+"""
+Tests for the offline module.
+"""
+import bz2
+import gzip
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+from chemsource.offline import WikipediaDump, PubMedIndex, wikitext_to_text, normalize_title
+from chemsource.retriever import retrieve, PubMedQuery
+from chemsource.exceptions import WikipediaRetrievalError
+
+
+def _article(pmid, title, *abstracts):
+    """Build the XML of a single PubmedArticle."""
+    abstract = "".join(f"<AbstractText>{text}</AbstractText>" for text in abstracts)
+    return (f"<PubmedArticle><MedlineCitation><PMID>{pmid}</PMID><Article>"
+            f"<ArticleTitle>{title}</ArticleTitle><Abstract>{abstract}</Abstract>"
+            f"</Article></MedlineCitation></PubmedArticle>")
+
+
+def _page(page_id, title, text=None, redirect=None):
+    """Build the XML of a single dump page."""
+    if redirect is not None:
+        return (f'<page><title>{title}</title><id>{page_id}</id><redirect title="{redirect}" />'
+                f'<revision><text>#REDIRECT [[{redirect}]]</text></revision></page>')
+    return f'<page><title>{title}</title><id>{page_id}</id><revision><text>{text}</text></revision></page>'
+
+
+def write_multistream_dump(directory, streams):
+    """Write a multistream dump and its companion index from a list of page lists."""
+    dump_path = os.path.join(directory, "testwiki-pages-articles-multistream.xml.bz2")
+    index_lines = []
+    with open(dump_path, "wb") as dump_file:
+        dump_file.write(bz2.compress(b"<mediawiki><siteinfo></siteinfo>"))
+        for pages in streams:
+            offset = dump_file.tell()
+            dump_file.write(bz2.compress("".join(_page(*page) for page in pages).encode("utf-8")))
+            index_lines.extend(f"{offset}:{page[0]}:{page[1]}" for page in pages)
+        dump_file.write(bz2.compress(b"</mediawiki>"))
+    with bz2.open(os.path.join(directory, "testwiki-pages-articles-multistream-index.txt.bz2"), "wt") as index_file:
+        index_file.write("\n".join(index_lines) + "\n")
+    return dump_path
+
+
+class TestWikipediaDump(unittest.TestCase):
+    """Test cases for the multistream dump backend."""
+
+    def setUp(self):
+        """Write a small two-stream dump."""
+        self.directory = tempfile.mkdtemp()
+        self.dump_path = write_multistream_dump(self.directory, [
+            [(1, "Aspirin", "'''Aspirin''' is a [[Nonsteroidal anti-inflammatory drug|NSAID]]."
+                            "{{Infobox drug | name = Aspirin {{nested}} }}&lt;ref&gt;cite&lt;/ref&gt;\n"
+                            "== Uses ==\nPain   relief."),
+             (2, "Acetylsalicylic acid", None, "Aspirin")],
+            [(3, "Mercury", "'''Mercury''' may refer to:\n{{disambiguation}}"),
+             (4, "Caffeine", "'''Caffeine''' is a [[stimulant]].[[Category:Alkaloids]]")],
+            ])
+        self.dump = WikipediaDump(self.dump_path)
+
+    def tearDown(self):
+        """Remove the temporary dump."""
+        self.dump.close()
+        shutil.rmtree(self.directory)
+
+    def test_index_built_once(self):
+        """Test that the title index is written next to the dump and reused."""
+        self.assertTrue(os.path.exists(self.dump_path + ".index.sqlite"))
+        with patch.object(WikipediaDump, 'build_index') as mock_build:
+            WikipediaDump(self.dump_path).close()
+        mock_build.assert_not_called()
+
+    def test_retrieve(self):
+        """Test that markup is removed and whitespace is cleaned."""
+        self.assertEqual(self.dump.retrieve("aspirin"),
+                         "Aspirin is a NSAID. Uses Pain relief.")
+        self.assertEqual(self.dump.retrieve("Caffeine"), "Caffeine is a stimulant.")
+
+    def test_intro_and_budget(self):
+        """Test that the lead section and content budget apply to dump content as to the live site."""
+        self.assertEqual(self.dump.retrieve("aspirin", intro_only=True), "Aspirin is a NSAID.")
+        self.assertEqual(self.dump.retrieve("aspirin", max_chars=10), "Aspirin is")
+        self.assertEqual(retrieve("aspirin", single_source=True, wikipedia_backend=self.dump,
+                                  max_chars=12, wikipedia_intro=True), ("WIKIPEDIA", "Aspirin is a"))
+
+    def test_redirect(self):
+        """Test that redirects are followed."""
+        self.assertEqual(self.dump.retrieve("acetylsalicylic_acid"), self.dump.retrieve("Aspirin"))
+
+    def test_decompresses_only_needed_stream(self):
+        """Test that a lookup decompresses a single stream and reuses it."""
+        with patch('chemsource.offline.bz2.BZ2Decompressor', wraps=bz2.BZ2Decompressor) as mock_decompressor:
+            self.dump.retrieve("Caffeine")
+            self.dump.retrieve("Caffeine")
+        self.assertEqual(mock_decompressor.call_count, 1)
+
+    def test_missing_and_disambiguation(self):
+        """Test that missing and disambiguation pages raise WikipediaRetrievalError."""
+        with self.assertRaises(WikipediaRetrievalError):
+            self.dump.retrieve("Unobtainium")
+        with self.assertRaises(WikipediaRetrievalError):
+            self.dump.retrieve("Mercury")
+
+    def test_retrieve_backend(self):
+        """Test that retrieve answers Wikipedia lookups from the dump without the network."""
+        with patch('chemsource.retriever.wikipedia_retrieve') as mock_wikipedia:
+            result = retrieve("caffeine", single_source=True, wikipedia_backend=self.dump)
+
+        mock_wikipedia.assert_not_called()
+        self.assertEqual(result, ("WIKIPEDIA", "Caffeine is a stimulant."))
+
+
+class TestPubMedIndex(unittest.TestCase):
+    """Test cases for the local PubMed full-text index."""
+
+    def setUp(self):
+        """Write a baseline and an update file and ingest them."""
+        self.directory = tempfile.mkdtemp()
+        baseline = os.path.join(self.directory, "pubmed25n0001.xml.gz")
+        with gzip.open(baseline, "wt") as baseline_file:
+            baseline_file.write("<PubmedArticleSet>"
+                                + _article(1, "Aspirin and aspirin resistance", "Aspirin one.")
+                                + _article(2, "Aspirin in stroke", "Background.", "Methods <i>in vivo</i>.")
+                                + _article(3, "Caffeine and sleep", "Caffeine one.")
+                                + _article(4, "Aspirin dosing", "Old dosing.")
+                                + "</PubmedArticleSet>")
+        update = os.path.join(self.directory, "pubmed25n0002.xml")
+        with open(update, "w") as update_file:
+            update_file.write("<PubmedArticleSet>"
+                              + _article(4, "Aspirin dosing revised", "New dosing.")
+                              + "<DeleteCitation><PMID>3</PMID></DeleteCitation>"
+                              + "</PubmedArticleSet>")
+        self.index = PubMedIndex(os.path.join(self.directory, "pubmed.sqlite"))
+        self.ingested = self.index.ingest([baseline, update])
+
+    def tearDown(self):
+        """Remove the temporary index."""
+        self.index.close()
+        shutil.rmtree(self.directory)
+
+    def test_ingest(self):
+        """Test that updates replace and delete baseline articles."""
+        self.assertEqual(self.ingested, 5)
+        self.assertEqual(len(self.index), 3)
+        self.assertEqual(self.index.retrieve("caffeine"), 'NO_RESULTS')
+
+    def test_delete_after_revision_in_same_file(self):
+        """Test that an article revised and then deleted in one update file stays deleted."""
+        update = os.path.join(self.directory, "pubmed25n0003.xml")
+        with open(update, "w") as update_file:
+            update_file.write("<PubmedArticleSet>"
+                              + _article(1, "Aspirin and aspirin resistance revised", "Aspirin two.")
+                              + "<DeleteCitation><PMID>1</PMID></DeleteCitation>"
+                              + "</PubmedArticleSet>")
+        self.index.ingest(update)
+        self.assertEqual(len(self.index), 2)
+        self.assertEqual(self.index.retrieve("resistance"), 'NO_RESULTS')
+
+    def test_relevance_and_retmax(self):
+        """Test that title matches are ordered by relevance and limited by retmax."""
+        rows = self.index.search("aspirin", retmax=2)
+        self.assertEqual(len(rows), 2)
+        self.assertEqual(rows[0][0], 1)
+        self.assertEqual(len(self.index.search("aspirin")), 3)
+
+    def test_query(self):
+        """Test that the retmax, retstart and field of a query are honored and other options rejected."""
+        self.assertEqual(self.index.retrieve("aspirin", PubMedQuery(retmax=1)), " Aspirin one.")
+        self.assertEqual(self.index.retrieve("aspirin", PubMedQuery(retmax=1, retstart=2)),
+                         " " + self.index.search("aspirin")[2][2].strip())
+        self.assertEqual(self.index.retrieve("aspirin", PubMedQuery(retmax=2)),
+                         "".join(" " + row[2].strip() for row in self.index.search("aspirin", retmax=2)))
+        self.assertEqual(self.index.retrieve("vivo"), 'NO_RESULTS')
+        self.assertEqual(self.index.retrieve("vivo", PubMedQuery(field="tiab")), " Background. Methods in vivo.")
+        self.assertEqual(retrieve("aspirin", priority="PUBMED", single_source=True, pubmed_backend=self.index,
+                                  pubmed_query=PubMedQuery(retmax=1)), ("PUBMED", " Aspirin one."))
+        for query in [PubMedQuery(sort="pub_date"), PubMedQuery(mindate="2020", maxdate="2025"),
+                      PubMedQuery(field="au")]:
+            with self.assertRaises(ValueError):
+                self.index.retrieve("aspirin", query)
+
+    def test_retrieve_rejects_unsupported_query(self):
+        """Test that retrieve raises for a query the index cannot answer instead of falling back."""
+        with patch('chemsource.retriever.wikipedia_retrieve') as mock_wikipedia:
+            with self.assertRaises(ValueError):
+                retrieve("aspirin", priority="PUBMED", pubmed_backend=self.index,
+                         pubmed_query=PubMedQuery(sort="pub_date"))
+
+        mock_wikipedia.assert_not_called()
+
+    def test_retrieve_format(self):
+        """Test that abstract sections are concatenated like pubmed_retrieve output."""
+        self.assertEqual(self.index.retrieve("aspirin stroke"), 'NO_RESULTS')
+        self.assertEqual(self.index.retrieve("aspirin in stroke"), " Background. Methods in vivo.")
+
+    def test_retrieve_backend(self):
+        """Test that retrieve answers PubMed lookups from the index without the network."""
+        with patch('chemsource.retriever.pubmed_retrieve') as mock_pubmed:
+            result = retrieve("dosing", priority="PUBMED", single_source=True, pubmed_backend=self.index)
+
+        mock_pubmed.assert_not_called()
+        self.assertEqual(result, ("PUBMED", " New dosing."))
+
+
+class TestWikitext(unittest.TestCase):
+    """Test cases for the wikitext helpers."""
+
+    def test_wikitext_to_text(self):
+        """Test conversion of common markup."""
+        wikitext = ("<!-- note -->''Ethanol''<ref name=\"a\" /> is an [[alcohol]] "
+                    "[https://example.org source].\n{| class=\"wikitable\"\n| cell\n|}\n"
+                    "[[File:Ethanol.svg|thumb|[[Skeletal formula]]]]&amp; more")
+        self.assertEqual(' '.join(wikitext_to_text(wikitext).split()), "Ethanol is an alcohol source. & more")
+
+    def test_normalize_title(self):
+        """Test MediaWiki-style title normalization."""
+        self.assertEqual(normalize_title("  acetylsalicylic_acid "), "Acetylsalicylic acid")
+
+
+if __name__ == '__main__':
+    unittest.main()
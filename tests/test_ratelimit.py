@@ -0,0 +1,85 @@
+"""
+Tests for the ratelimit module.
+"""
+import asyncio
+import threading
+import time
+import unittest
+from unittest.mock import patch
+from chemsource.ratelimit import (
+    RateLimiter,
+    get_ncbi_limiter,
+    NCBI_RATE_WITHOUT_KEY,
+    NCBI_RATE_WITH_KEY
+)
+
+
+class TestRateLimiter(unittest.TestCase):
+    """Test cases for the RateLimiter class."""
+    
+    def test_invalid_parameters(self):
+        """Test that non-positive rates and bursts raise ValueError."""
+        with self.assertRaises(ValueError):
+            RateLimiter(0)
+        with self.assertRaises(ValueError):
+            RateLimiter(1, burst=0)
+    
+    def test_acquire_spaces_calls(self):
+        """Test that consecutive calls are spaced by the rate interval."""
+        limiter = RateLimiter(rate=20)
+        
+        start = time.monotonic()
+        waits = [limiter.acquire() for _ in range(4)]
+        elapsed = time.monotonic() - start
+        
+        self.assertEqual(waits[0], 0.0)
+        self.assertGreaterEqual(elapsed, 0.14)
+        self.assertEqual(limiter.stats()["calls"], 4)
+        self.assertAlmostEqual(limiter.stats()["total_wait"], sum(waits))
+    
+    def test_burst_allows_back_to_back_calls(self):
+        """Test that a burst larger than one lets calls through without waiting."""
+        limiter = RateLimiter(rate=1, burst=3)
+        
+        with patch('chemsource.ratelimit.time.sleep') as mock_sleep:
+            waits = [limiter.acquire() for _ in range(4)]
+        
+        self.assertEqual(waits[:3], [0.0, 0.0, 0.0])
+        self.assertGreater(waits[3], 0.9)
+        mock_sleep.assert_called_once()
+    
+    def test_acquire_is_thread_safe(self):
+        """Test that concurrent threads each receive a distinct slot."""
+        limiter = RateLimiter(rate=10)
+        threads = [threading.Thread(target=limiter.acquire) for _ in range(10)]
+        with patch('chemsource.ratelimit.time.sleep'):
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        
+        self.assertEqual(limiter.calls, 10)
+        self.assertGreaterEqual(limiter.max_wait, 0.8)
+    
+    def test_aacquire_spaces_coroutines(self):
+        """Test that coroutines sharing a limiter are spaced by the rate interval."""
+        limiter = RateLimiter(rate=20)
+        
+        async def run():
+            return await asyncio.gather(*(limiter.aacquire() for _ in range(3)))
+        
+        waits = sorted(asyncio.run(run()))
+        
+        self.assertEqual(waits[0], 0.0)
+        self.assertAlmostEqual(waits[2], 0.1, delta=0.02)
+    
+    def test_ncbi_limiter_rates(self):
+        """Test that NCBI limiters use 3 req/s without a key and 10 req/s with one."""
+        self.assertEqual(get_ncbi_limiter(None).rate, NCBI_RATE_WITHOUT_KEY)
+        self.assertEqual(get_ncbi_limiter("ratelimit_test_key").rate, NCBI_RATE_WITH_KEY)
+        self.assertIs(get_ncbi_limiter("ratelimit_test_key"), get_ncbi_limiter("ratelimit_test_key"))
+        self.assertIsNot(get_ncbi_limiter(None), get_ncbi_limiter("ratelimit_test_key"))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,137 @@
+"""
+Tests for the replay module.
+"""
+import asyncio
+import json
+import os
+import shutil
+import tempfile
+import time
+import unittest
+from types import SimpleNamespace
+from unittest.mock import patch
+import requests
+from chemsource.replay import (
+    Cassette,
+    CassetteTransport,
+    AsyncCassetteTransport,
+    CassetteClient,
+    MODE_RECORD
+)
+from chemsource.retriever import retrieve, aretrieve, PUBMED_SEARCH_URL, PUBMED_FETCH_URL, WIKIPEDIA_API_URL
+from chemsource.chemsource import ChemSource
+from chemsource.exceptions import CassetteMissError
+
+BODIES = {PUBMED_SEARCH_URL: b"<eSearchResult><Count>1</Count><WebEnv>env</WebEnv></eSearchResult>",
+          PUBMED_FETCH_URL: (b"<PubmedArticleSet><PubmedArticle><Abstract><AbstractText>Aspirin inhibits "
+                             b"cyclooxygenase.</AbstractText></Abstract></PubmedArticle></PubmedArticleSet>"),
+          WIKIPEDIA_API_URL: json.dumps({"query": {"pages": [{"title": "Aspirin",
+                                                              "extract": "Aspirin is an analgesic."}]}}).encode()
+          }
+
+
+def live_response(method, url, params=None, data=None, timeout=None, stream=False):
+    """Answer a session request like the live services would."""
+    response = requests.Response()
+    response.status_code = 200
+    response.url = url
+    response.headers["Content-Encoding"] = "gzip"
+    response._content = BODIES[url]
+    return response
+
+
+class TestCassetteTransport(unittest.TestCase):
+    """Test cases for recording and replaying HTTP interactions."""
+
+    def setUp(self):
+        """Record a PubMed and a Wikipedia lookup to a cassette file."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.temp_dir, "cassette.json")
+        with Cassette(self.path) as cassette:
+            recorder = CassetteTransport(cassette, mode=MODE_RECORD)
+            with patch.object(recorder.session, "request", side_effect=live_response):
+                self.pubmed = retrieve("aspirin", priority="PUBMED", ncbikey="secret", transport=recorder)
+                self.wikipedia = retrieve("aspirin", transport=recorder)
+
+    def tearDown(self):
+        """Remove the cassette file."""
+        shutil.rmtree(self.temp_dir)
+
+    def replay(self, **kwargs):
+        """Build a replaying transport whose session fails on any live request."""
+        transport = CassetteTransport(Cassette(self.path), **kwargs)
+        transport.session.request = None
+        return transport
+
+    def test_replay_matches_recording(self):
+        """Test that replayed lookups return the recorded content without the API key on disk."""
+        with open(self.path) as cassette_file:
+            content = cassette_file.read()
+        self.assertNotIn("secret", content)
+        self.assertNotIn("Content-Encoding", content)
+        self.assertEqual(len(Cassette(self.path)), 3)
+
+        transport = self.replay()
+        self.assertEqual(self.pubmed, ("PUBMED", " Aspirin inhibits cyclooxygenase."))
+        self.assertEqual(retrieve("aspirin", priority="PUBMED", ncbikey="other", transport=transport), self.pubmed)
+        self.assertEqual(retrieve("aspirin", transport=transport), self.wikipedia)
+        self.assertEqual(retrieve("caffeine", single_source=True, transport=transport), (None, None))
+
+    def test_latency(self):
+        """Test that replayed requests are delayed by the simulated latency."""
+        transport = self.replay(latency=0.05)
+        started = time.monotonic()
+        retrieve("aspirin", priority="PUBMED", transport=transport)
+        self.assertGreaterEqual(time.monotonic() - started, 0.1)
+
+    def test_error_injection(self):
+        """Test that injected timeouts and error statuses make sources fail."""
+        transport = self.replay(error_rate=1.0)
+        self.assertEqual(retrieve("aspirin", priority="PUBMED", single_source=True, transport=transport),
+                         (None, None))
+        self.assertEqual(transport.player.injected, 1)
+
+        transport = self.replay(error_rate=1.0, error_status=503)
+        with self.assertRaises(requests.HTTPError) as context:
+            transport.get(PUBMED_SEARCH_URL).raise_for_status()
+        self.assertEqual(context.exception.response.status_code, 503)
+
+        with self.assertRaises(ValueError):
+            self.replay(error_rate=2)
+
+    def test_async_replay(self):
+        """Test that the asyncio transport replays the same cassette."""
+        async def run():
+            transport = AsyncCassetteTransport(Cassette(self.path))
+            return await asyncio.gather(aretrieve("aspirin", priority="PUBMED", transport=transport),
+                                        aretrieve("aspirin", transport=transport))
+
+        self.assertEqual(asyncio.run(run()), [self.pubmed, self.wikipedia])
+
+
+class TestCassetteClient(unittest.TestCase):
+    """Test cases for recording and replaying model calls."""
+
+    def test_record_and_replay_classification(self):
+        """Test that a ChemSource run can be replayed end to end."""
+        cassette = Cassette()
+        completion = SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content="MEDICAL"))])
+        live_client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=lambda **kwargs: completion)))
+        recorder = CassetteTransport(cassette, mode=MODE_RECORD)
+
+        with patch.object(recorder.session, "request", side_effect=live_response):
+            chem = ChemSource(custom_client=CassetteClient(cassette, live_client, mode=MODE_RECORD), transport=recorder)
+            recorded = chem.chemsource("aspirin")
+
+        chem = ChemSource(custom_client=CassetteClient(cassette), transport=CassetteTransport(cassette))
+        self.assertEqual(chem.chemsource("aspirin"), recorded)
+        self.assertEqual(recorded, (("WIKIPEDIA", "Aspirin is an analgesic."), "MEDICAL"))
+
+        with self.assertRaises(CassetteMissError):
+            CassetteClient(cassette).chat.completions.create(model="gpt-4o", messages=[])
+        with self.assertRaises(ValueError):
+            CassetteClient(cassette, mode=MODE_RECORD)
+
+
+if __name__ == '__main__':
+    unittest.main()
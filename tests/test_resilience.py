@@ -0,0 +1,191 @@
+"""
+Tests for the resilience module.
+"""
+import unittest
+from unittest.mock import patch, MagicMock, AsyncMock
+import requests
+from chemsource.resilience import RetryPolicy, CircuitBreaker, is_retryable
+from chemsource.retriever import retrieve
+from chemsource.chemsource import ChemSource
+from chemsource.exceptions import (
+    PubMedSearchXMLParseError,
+    WikipediaRetrievalError,
+    WikipediaPageNotFoundError,
+    RetryableError,
+    CircuitOpenError
+)
+
+
+def http_error(status, headers=None):
+    """Build a requests.HTTPError for a status code."""
+    response = MagicMock()
+    response.status_code = status
+    response.headers = headers or {}
+    return requests.HTTPError(response=response)
+
+
+def wrapped(cause):
+    """Raise a chemsource exception from cause and return it."""
+    try:
+        try:
+            raise cause
+        except Exception:
+            raise PubMedSearchXMLParseError()
+    except PubMedSearchXMLParseError as e:
+        return e
+
+
+class TestIsRetryable(unittest.TestCase):
+    """Test cases for error classification."""
+
+    def test_classification(self):
+        """Test that transient causes are retryable and definite answers are not."""
+        self.assertTrue(is_retryable(requests.Timeout()))
+        self.assertTrue(is_retryable(RetryableError()))
+        self.assertTrue(is_retryable(wrapped(requests.ConnectionError())))
+        self.assertTrue(is_retryable(wrapped(http_error(503))))
+        self.assertTrue(is_retryable(wrapped(http_error(429))))
+        self.assertFalse(is_retryable(wrapped(http_error(404))))
+        self.assertFalse(is_retryable(wrapped(ValueError("Invalid XML"))))
+        self.assertFalse(is_retryable(WikipediaPageNotFoundError()))
+        self.assertFalse(is_retryable(CircuitOpenError()))
+
+
+class TestRetryPolicy(unittest.TestCase):
+    """Test cases for the RetryPolicy class."""
+
+    @patch('chemsource.resilience.time.sleep')
+    def test_retries_retryable_errors(self, mock_sleep):
+        """Test that retryable failures are retried with backoff until success."""
+        policy = RetryPolicy(max_attempts=3, base_delay=1.0, jitter=False)
+        func = MagicMock(side_effect=[requests.Timeout(), wrapped(http_error(502)), "content"])
+
+        self.assertEqual(policy.call(func, "aspirin"), "content")
+        self.assertEqual(func.call_count, 3)
+        self.assertEqual([c[0][0] for c in mock_sleep.call_args_list], [1.0, 2.0])
+        self.assertEqual(policy.retries, 2)
+
+    @patch('chemsource.resilience.time.sleep')
+    def test_gives_up(self, mock_sleep):
+        """Test that non-retryable errors are raised at once and retryable ones after max_attempts."""
+        policy = RetryPolicy(max_attempts=2)
+        func = MagicMock(side_effect=WikipediaPageNotFoundError())
+        with self.assertRaises(WikipediaPageNotFoundError):
+            policy.call(func)
+        self.assertEqual(func.call_count, 1)
+
+        func = MagicMock(side_effect=requests.Timeout())
+        with self.assertRaises(requests.Timeout):
+            policy.call(func)
+        self.assertEqual(func.call_count, 2)
+
+    def test_delay(self):
+        """Test full jitter bounds, the max_delay cap and Retry-After."""
+        policy = RetryPolicy(base_delay=1.0, max_delay=4.0)
+        for attempt in range(1, 6):
+            self.assertLessEqual(policy.delay(attempt), min(4.0, 2 ** (attempt - 1)))
+        self.assertEqual(policy.delay(1, wrapped(http_error(429, {"Retry-After": "3"}))), 3.0)
+        self.assertEqual(policy.delay(1, wrapped(http_error(429, {"Retry-After": "60"}))), 4.0)
+
+
+class TestAsyncRetryPolicy(unittest.IsolatedAsyncioTestCase):
+    """Test cases for the asyncio side of RetryPolicy and CircuitBreaker."""
+
+    @patch('chemsource.resilience.asyncio.sleep', new_callable=AsyncMock)
+    async def test_acall(self, mock_sleep):
+        """Test that coroutines are retried and breakers count the exhausted sequence once."""
+        policy = RetryPolicy(max_attempts=3, jitter=False)
+        breaker = CircuitBreaker(failure_threshold=2)
+        func = AsyncMock(side_effect=requests.Timeout())
+
+        with self.assertRaises(requests.Timeout):
+            await breaker.acall(policy.acall, func)
+
+        self.assertEqual(func.await_count, 3)
+        self.assertEqual(mock_sleep.await_count, 2)
+        self.assertEqual(breaker.failures, 1)
+        self.assertEqual(breaker.state, "CLOSED")
+
+
+class TestCircuitBreaker(unittest.TestCase):
+    """Test cases for the CircuitBreaker class."""
+
+    def test_opens_and_recovers(self):
+        """Test that the breaker opens at the threshold, rejects calls and closes after a good trial."""
+        breaker = CircuitBreaker("PUBMED", failure_threshold=2, cooldown=10)
+        failing = MagicMock(side_effect=requests.Timeout())
+
+        with patch('chemsource.resilience.time.monotonic', return_value=100.0):
+            for _ in range(2):
+                with self.assertRaises(requests.Timeout):
+                    breaker.call(failing)
+            self.assertEqual(breaker.state, "OPEN")
+            with self.assertRaises(CircuitOpenError):
+                breaker.call(failing)
+            self.assertEqual(failing.call_count, 2)
+            self.assertEqual(breaker.stats()["retry_in"], 10)
+
+        with patch('chemsource.resilience.time.monotonic', return_value=111.0):
+            self.assertEqual(breaker.state, "HALF_OPEN")
+            with self.assertRaises(requests.Timeout):
+                breaker.call(failing)
+            self.assertEqual(breaker.state, "OPEN")
+
+        with patch('chemsource.resilience.time.monotonic', return_value=122.0):
+            self.assertEqual(breaker.call(lambda: "content"), "content")
+            self.assertEqual(breaker.state, "CLOSED")
+
+        stats = breaker.stats()
+        self.assertEqual(stats["total_failures"], 3)
+        self.assertEqual(stats["rejected"], 1)
+
+    def test_non_retryable_errors_do_not_open(self):
+        """Test that answers such as a missing page count as the source being healthy."""
+        breaker = CircuitBreaker(failure_threshold=1)
+        with self.assertRaises(WikipediaPageNotFoundError):
+            breaker.call(MagicMock(side_effect=WikipediaPageNotFoundError()))
+        self.assertEqual(breaker.state, "CLOSED")
+
+
+class TestRetrieveResilience(unittest.TestCase):
+    """Test cases for retries and circuit breakers in retrieve."""
+
+    @patch('chemsource.resilience.time.sleep')
+    @patch('chemsource.retriever.pubmed_retrieve')
+    @patch('chemsource.retriever.wikipedia_retrieve')
+    def test_retrieve_retries_then_skips_open_source(self, mock_wiki, mock_pubmed, mock_sleep):
+        """Test that transient failures are retried and an open source is skipped without requests."""
+        mock_wiki.side_effect = WikipediaRetrievalError("timeout")
+        mock_wiki.side_effect.__context__ = requests.Timeout()
+        mock_pubmed.return_value = "abstract"
+        breakers = {"WIKIPEDIA": CircuitBreaker("WIKIPEDIA", failure_threshold=1, cooldown=60)}
+
+        self.assertEqual(retrieve("aspirin", retry_policy=RetryPolicy(max_attempts=2), circuit_breakers=breakers),
+                         ("PUBMED", "abstract"))
+        self.assertEqual(mock_wiki.call_count, 2)
+        self.assertEqual(breakers["WIKIPEDIA"].state, "OPEN")
+
+        mock_wiki.reset_mock()
+        self.assertEqual(retrieve("caffeine", circuit_breakers=breakers), ("PUBMED", "abstract"))
+        mock_wiki.assert_not_called()
+
+
+    @patch('chemsource.resilience.time.sleep')
+    @patch('chemsource.retriever.pubmed_retrieve')
+    @patch('chemsource.retriever.wikipedia_retrieve')
+    def test_chemsource_defaults_do_not_retry_or_skip(self, mock_wiki, mock_pubmed, mock_sleep):
+        """Test that ChemSource tries each source once and never skips one unless configured to."""
+        mock_wiki.side_effect = WikipediaRetrievalError("timeout")
+        mock_wiki.side_effect.__context__ = requests.Timeout()
+        mock_pubmed.return_value = "abstract"
+        chem = ChemSource()
+
+        for name in ["aspirin", "caffeine", "benzene", "ethanol", "glucose", "urea"]:
+            self.assertEqual(chem.retrieve(name), ("PUBMED", "abstract"))
+        self.assertEqual(mock_wiki.call_count, 6)
+        mock_sleep.assert_not_called()
+        self.assertIsNone(chem.retry_policy)
+        self.assertEqual(chem.breaker_stats(), {})
+
+if __name__ == '__main__':
+    unittest.main()
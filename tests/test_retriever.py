@@ -1,13 +1,43 @@
 """
 Tests for the retriever module.
 """
+import asyncio
+import dataclasses
+import time
 import unittest
-from unittest.mock import patch, MagicMock
-from chemsource.retriever import pubmed_retrieve, wikipedia_retrieve
+from unittest.mock import patch, MagicMock, AsyncMock
+from chemsource.retriever import (
+    pubmed_retrieve,
+    pubmed_retrieve_many,
+    wikipedia_retrieve_many,
+    wikipedia_revisions,
+    PubMedQuery,
+    SEARCH_PARAMS,
+    XML_RETRIEVAL_PARAMS,
+    refresh_wikipedia_cache,
+    wikipedia_retrieve,
+    retrieve,
+    aretrieve,
+    apubmed_retrieve,
+    awikipedia_retrieve
+)
 from chemsource.exceptions import (
     PubMedSearchXMLParseError,
-    WikipediaRetrievalError
+    WikipediaRetrievalError,
+    WikipediaPageNotFoundError,
+    WikipediaDisambiguationError
 )
+from chemsource.cache import MemoryCache, RetrievalCache
+import os
+import shutil
+import tempfile
+import wikipedia
+
+
+async def _achunks(*chunks):
+    """Yield chunks like httpx.Response.aiter_bytes."""
+    for chunk in chunks:
+        yield chunk
 
 
 class TestRetriever(unittest.TestCase):
@@ -32,7 +62,7 @@ class TestRetriever(unittest.TestCase):
         
         # Mock abstract response
         abstract_response = MagicMock()
-        abstract_response.content = b'''
+        abstract_response.iter_content.return_value = [b'''
         <PubmedArticleSet>
             <PubmedArticle>
                 <MedlineCitation>
@@ -44,7 +74,7 @@ class TestRetriever(unittest.TestCase):
                 </MedlineCitation>
             </PubmedArticle>
         </PubmedArticleSet>
-        '''
+        ''']
         
         mock_get.side_effect = [search_response, abstract_response]
         
@@ -93,7 +123,15 @@ class TestRetriever(unittest.TestCase):
         
         with self.assertRaises(PubMedSearchXMLParseError):
             pubmed_retrieve("aspirin", ncbikey="test_key")
-    
+
+    @patch('chemsource.retriever.r.get')
+    def test_get_pubmed_info_keyboard_interrupt(self, mock_get):
+        """Test that PubMed retrieval does not wrap KeyboardInterrupt."""
+        mock_get.side_effect = KeyboardInterrupt
+
+        with self.assertRaises(KeyboardInterrupt):
+            pubmed_retrieve("aspirin", ncbikey="test_key")
+
     @patch('chemsource.retriever.wikipedia.page')
     def test_get_wikipedia_info_success(self, mock_page):
         """Test successful Wikipedia information retrieval."""
@@ -135,6 +173,549 @@ class TestRetriever(unittest.TestCase):
         with self.assertRaises(WikipediaRetrievalError):
             wikipedia_retrieve("aspirin")
 
+    
+    def test_get_pubmed_info_with_transport(self):
+        """Test that PubMed retrieval uses the provided transport."""
+        search_response = MagicMock()
+        search_response.content = b'''
+        <eSearchResult>
+            <Count>1</Count>
+            <QueryKey>1</QueryKey>
+            <WebEnv>test_web_env</WebEnv>
+        </eSearchResult>
+        '''
+        abstract_response = MagicMock()
+        abstract_response.iter_content.return_value = [b'''
+        <PubmedArticleSet>
+            <PubmedArticle><AbstractText>Transport abstract.</AbstractText></PubmedArticle>
+        </PubmedArticleSet>
+        ''']
+        transport = MagicMock()
+        transport.get.side_effect = [search_response, abstract_response]
+        
+        with patch('chemsource.retriever.r.get') as mock_get:
+            result = pubmed_retrieve("aspirin", transport=transport)
+        
+        self.assertIn("Transport abstract.", result)
+        self.assertEqual(transport.get.call_count, 2)
+        mock_get.assert_not_called()
+    
+    def test_get_pubmed_info_structured_abstract(self):
+        """Test that labelled sections are kept, empty sections skipped and chunks parsed incrementally."""
+        search_response = MagicMock()
+        search_response.content = b"<eSearchResult><Count>2</Count><WebEnv>env</WebEnv></eSearchResult>"
+        body = (b"<PubmedArticleSet><PubmedArticle><MedlineCitation><PMID>1</PMID><Article><Abstract>"
+                b"<AbstractText Label=\"BACKGROUND\">Pain is <i>common</i>.</AbstractText>"
+                b"<AbstractText Label=\"METHODS\"/>"
+                b"<AbstractText Label=\"RESULTS\">Aspirin helped.</AbstractText>"
+                b"</Abstract></Article></MedlineCitation></PubmedArticle>"
+                b"<PubmedArticle><MedlineCitation><PMID>2</PMID><Article><Abstract><AbstractText></AbstractText>"
+                b"</Abstract></Article></MedlineCitation></PubmedArticle></PubmedArticleSet>")
+        abstract_response = MagicMock()
+        abstract_response.iter_content.return_value = [body[i:i + 7] for i in range(0, len(body), 7)]
+        transport = MagicMock()
+        transport.get.side_effect = [search_response, abstract_response]
+        
+        result = pubmed_retrieve("aspirin", transport=transport)
+        
+        self.assertEqual(result, " BACKGROUND: Pain is common. RESULTS: Aspirin helped.")
+        self.assertTrue(transport.get.call_args[1]['stream'])
+        abstract_response.close.assert_called_once()
+    
+    def test_get_wikipedia_info_with_transport(self):
+        """Test Wikipedia retrieval through the MediaWiki API with a transport."""
+        response = MagicMock()
+        response.json.return_value = {"query": {"pages": [
+            {"title": "Aspirin", "extract": "Aspirin is a\n\tmedication.   Used for pain."}
+        ]}}
+        transport = MagicMock()
+        transport.get.return_value = response
+        
+        with patch('chemsource.retriever.wikipedia.page') as mock_page:
+            result = wikipedia_retrieve("aspirin", transport=transport)
+        
+        self.assertEqual(result, "Aspirin is a medication. Used for pain.")
+        self.assertEqual(transport.get.call_args[1]['params']['titles'], "aspirin")
+        mock_page.assert_not_called()
+    
+    def test_get_wikipedia_info_with_transport_missing_page(self):
+        """Test that missing and disambiguation pages raise WikipediaRetrievalError."""
+        for page in ({"title": "Nonexistent", "missing": True},
+                     {"title": "Ambiguous", "pageprops": {"disambiguation": ""}, "extract": "x"}):
+            response = MagicMock()
+            response.json.return_value = {"query": {"pages": [page]}}
+            transport = MagicMock()
+            transport.get.return_value = response
+            
+            with self.assertRaises(WikipediaRetrievalError):
+                wikipedia_retrieve(page["title"], transport=transport)
+    
+    @patch('chemsource.retriever.pubmed_retrieve')
+    @patch('chemsource.retriever.wikipedia_retrieve')
+    def test_retrieve_passes_transport(self, mock_wiki, mock_pubmed):
+        """Test that retrieve forwards the transport to both sources."""
+        mock_wiki.side_effect = WikipediaRetrievalError("missing")
+        mock_pubmed.return_value = "abstract"
+        transport = MagicMock()
+        
+        result = retrieve("aspirin", ncbikey="key", transport=transport)
+        
+        self.assertEqual(result, ("PUBMED", "abstract"))
+        mock_wiki.assert_called_once_with("aspirin", transport, None, False)
+        mock_pubmed.assert_called_once_with("aspirin", "key", transport, None)
+
+    
+    def test_pubmed_retrieve_many_batches_efetch(self):
+        """Test that abstracts for many compounds are fetched in shared efetch requests."""
+        def search(ids):
+            response = MagicMock()
+            response.content = ("<eSearchResult><Count>%d</Count><IdList>%s</IdList></eSearchResult>"
+                                % (len(ids), "".join("<Id>%s</Id>" % i for i in ids))).encode()
+            return response
+        
+        def article(pmid, text):
+            return ("<PubmedArticle><MedlineCitation><PMID>%s</PMID><Article><Abstract>"
+                    "<AbstractText>%s</AbstractText></Abstract></Article></MedlineCitation>"
+                    "</PubmedArticle>" % (pmid, text))
+        
+        fetch_one = MagicMock()
+        fetch_one.iter_content.return_value = [("<PubmedArticleSet>%s%s</PubmedArticleSet>"
+                                                % (article("2", "Second."), article("1", "First."))).encode()]
+        fetch_two = MagicMock()
+        fetch_two.iter_content.return_value = [("<PubmedArticleSet>%s</PubmedArticleSet>"
+                                                % article("3", "Third.")).encode()]
+        
+        transport = MagicMock()
+        transport.get.side_effect = [search(["1", "2"]), search([]), search(["2", "3"])]
+        transport.post.side_effect = [fetch_one, fetch_two]
+        
+        result = pubmed_retrieve_many(["aspirin", "novelcompound", "caffeine", "aspirin"],
+                                      ncbikey="test_key", transport=transport, batch_size=2)
+        
+        self.assertEqual(result, {"aspirin": " First. Second.",
+                                  "novelcompound": "NO_RESULTS",
+                                  "caffeine": " Second. Third."})
+        self.assertEqual(transport.get.call_count, 3)
+        self.assertEqual(transport.post.call_count, 2)
+        self.assertEqual(transport.post.call_args_list[0][1]['data']['id'], "1,2")
+        self.assertEqual(transport.post.call_args_list[1][1]['data']['id'], "3")
+    
+    def test_wikipedia_retrieve_many_batches_titles(self):
+        """Test that titles are batched and normalizations and redirects map back to input names."""
+        first = MagicMock()
+        first.json.return_value = {
+            "continue": {"excontinue": 1, "continue": "||info|pageprops"},
+            "query": {"normalized": [{"from": "aspirin", "to": "Aspirin"}],
+                      "redirects": [{"from": "Aspirin", "to": "Acetylsalicylic acid"}],
+                      "pages": [{"title": "Acetylsalicylic acid", "extract": "Aspirin is\na drug."},
+                                {"title": "Mercury", "pageprops": {"disambiguation": ""}},
+                                {"title": "Caffeine"}]}}
+        second = MagicMock()
+        second.json.return_value = {"query": {"pages": [{"title": "Caffeine", "extract": "Caffeine   is a stimulant."},
+                                                        {"title": "Acetylsalicylic acid"}]}}
+        third = MagicMock()
+        third.json.return_value = {"query": {"pages": [{"title": "Unobtainium", "missing": True}]}}
+        transport = MagicMock()
+        transport.get.side_effect = [first, second, third]
+        
+        result = wikipedia_retrieve_many(["aspirin", "Mercury", "Caffeine", "aspirin", "Unobtainium", "a|b"],
+                                         transport=transport, batch_size=3)
+        
+        self.assertEqual(result, {"aspirin": "Aspirin is a drug.",
+                                  "Mercury": None,
+                                  "Caffeine": "Caffeine is a stimulant.",
+                                  "Unobtainium": None,
+                                  "a|b": None})
+        self.assertEqual(transport.get.call_count, 3)
+        self.assertEqual(transport.get.call_args_list[0][1]['params']['titles'], "aspirin|Mercury|Caffeine")
+        self.assertEqual(transport.get.call_args_list[1][1]['params']['excontinue'], 1)
+        self.assertEqual(transport.get.call_args_list[2][1]['params']['titles'], "Unobtainium")
+        
+        with self.assertRaises(ValueError):
+            wikipedia_retrieve_many(["aspirin"], transport=transport, batch_size=51)
+    
+    def test_pubmed_query_defaults_match_module_params(self):
+        """Test that the default query sends the same parameters as SEARCH_PARAMS and XML_RETRIEVAL_PARAMS."""
+        query = PubMedQuery()
+        expected_search = dict(SEARCH_PARAMS, term="aspirin[ti]")
+        del expected_search['api_key']
+        expected_fetch = dict(XML_RETRIEVAL_PARAMS, WebEnv="env")
+        del expected_fetch['api_key']
+        
+        self.assertEqual(query.search_params("aspirin"), expected_search)
+        self.assertEqual(query.fetch_params("env"), expected_fetch)
+        self.assertEqual(query.cache_params(), {'retmax': '3', 'sort': 'relevance'})
+        with self.assertRaises(dataclasses.FrozenInstanceError):
+            query.retmax = 10
+        with self.assertRaises(ValueError):
+            PubMedQuery(mindate="2020")
+        with self.assertRaises(ValueError):
+            PubMedQuery(retmax=0)
+    
+    def test_pubmed_retrieve_with_query(self):
+        """Test that a per-call query controls paging, field, dates and history without touching module params."""
+        search_response = MagicMock()
+        search_response.content = b"<eSearchResult><Count>40</Count><WebEnv>env</WebEnv></eSearchResult>"
+        fetch_response = MagicMock()
+        fetch_response.iter_content.return_value = [
+            b"<PubmedArticleSet><PubmedArticle><Abstract><AbstractText>Text.</AbstractText>"
+            b"</Abstract></PubmedArticle></PubmedArticleSet>"]
+        transport = MagicMock()
+        transport.get.side_effect = [search_response, fetch_response]
+        search_params = dict(SEARCH_PARAMS)
+        query = PubMedQuery(retmax=20, retstart=20, sort="pub_date", field="tiab",
+                            mindate="2020", maxdate="2024/06", usehistory=True)
+        
+        self.assertEqual(pubmed_retrieve("aspirin", transport=transport, query=query), " Text.")
+        
+        sent_search = transport.get.call_args_list[0][1]['params']
+        self.assertEqual(sent_search['term'], "aspirin[tiab]")
+        self.assertEqual((sent_search['retmax'], sent_search['retstart']), ("20", "20"))
+        self.assertEqual((sent_search['mindate'], sent_search['maxdate'], sent_search['datetype']),
+                         ("2020", "2024/06", "pdat"))
+        self.assertEqual(sent_search['usehistory'], "y")
+        sent_fetch = transport.get.call_args_list[1][1]['params']
+        self.assertEqual((sent_fetch['retmax'], sent_fetch['retstart']), ("20", "20"))
+        self.assertEqual(SEARCH_PARAMS, search_params)
+        self.assertEqual(query.cache_params(), {'retmax': '20', 'sort': 'pub_date', 'retstart': '20', 'field': 'tiab',
+                                                'mindate': '2020', 'maxdate': '2024/06', 'datetype': 'pdat'})
+    
+    def test_wikipedia_retrieve_content_budget(self):
+        """Test that small budgets use exchars, large ones cut before cleaning, and intro uses exintro."""
+        response = MagicMock()
+        response.json.return_value = {"query": {"pages": [{"title": "Aspirin",
+                                                           "extract": "Aspirin   is\na drug.\n\n== Uses ==\nPain."}]}}
+        transport = MagicMock()
+        transport.get.return_value = response
+        
+        self.assertEqual(wikipedia_retrieve("aspirin", transport, max_chars=16), "Aspirin is a dru")
+        params = transport.get.call_args[1]['params']
+        self.assertEqual(params['exchars'], "16")
+        self.assertNotIn('exintro', params)
+        
+        self.assertEqual(wikipedia_retrieve("aspirin", transport, max_chars=5000, intro_only=True),
+                         "Aspirin is a drug. == Uses == Pain.")
+        params = transport.get.call_args[1]['params']
+        self.assertNotIn('exchars', params)
+        self.assertEqual(params['exintro'], "1")
+        
+        with self.assertRaises(ValueError):
+            wikipedia_retrieve("aspirin", transport, max_chars=0)
+    
+    @patch('chemsource.retriever.wikipedia_retrieve')
+    def test_retrieve_content_budget_in_cache_key(self, mock_wiki):
+        """Test that budgeted content is cached separately from whole articles."""
+        cache = MemoryCache()
+        mock_wiki.return_value = "Aspirin is"
+        
+        self.assertEqual(retrieve("aspirin", single_source=True, cache=cache, max_chars=10, wikipedia_intro=True),
+                         ("WIKIPEDIA", "Aspirin is"))
+        mock_wiki.assert_called_once_with("aspirin", None, 10, True)
+        self.assertEqual(cache.get("WIKIPEDIA", "aspirin", {"exintro": "1", "max_chars": "10"}), "Aspirin is")
+        self.assertIsNone(cache.get("WIKIPEDIA", "aspirin"))
+    
+    def test_wikipedia_revisions(self):
+        """Test that revision ids are looked up with page info only and follow redirects."""
+        response = MagicMock()
+        response.json.return_value = {
+            "query": {"redirects": [{"from": "Acetylsalicylic acid", "to": "Aspirin"}],
+                      "pages": [{"title": "Aspirin", "lastrevid": 123},
+                                {"title": "Unobtainium", "missing": True}]}}
+        transport = MagicMock()
+        transport.get.return_value = response
+        
+        self.assertEqual(wikipedia_revisions(["Acetylsalicylic acid", "Unobtainium"], transport=transport),
+                         {"Acetylsalicylic acid": "123", "Unobtainium": None})
+        params = transport.get.call_args[1]['params']
+        self.assertEqual(params['prop'], "info")
+        self.assertNotIn('explaintext', params)
+    
+    def test_retrieve_revalidates_expired_wikipedia_entry(self):
+        """Test that an expired entry is reused if unchanged and downloaded again if changed."""
+        directory = tempfile.mkdtemp()
+        cache = RetrievalCache(os.path.join(directory, "cache.sqlite"), ttl={"WIKIPEDIA": 10})
+        article = MagicMock()
+        article.json.return_value = {"query": {"pages": [{"title": "Aspirin", "lastrevid": 1, "extract": "Old."}]}}
+        info = MagicMock()
+        info.json.return_value = {"query": {"pages": [{"title": "Aspirin", "lastrevid": 1}],
+                                            "normalized": [{"from": "aspirin", "to": "Aspirin"}]}}
+        changed = MagicMock()
+        changed.json.return_value = {"query": {"pages": [{"title": "Aspirin", "lastrevid": 2}],
+                                            "normalized": [{"from": "aspirin", "to": "Aspirin"}]}}
+        new_article = MagicMock()
+        new_article.json.return_value = {"query": {"pages": [{"title": "Aspirin", "lastrevid": 2, "extract": "New."}]}}
+        transport = MagicMock()
+        transport.get.side_effect = [article, info, changed, new_article]
+        
+        try:
+            with patch('chemsource.cache.time.time', return_value=1000.0):
+                self.assertEqual(retrieve("aspirin", single_source=True, transport=transport, cache=cache),
+                                 ("WIKIPEDIA", "Old."))
+            with patch('chemsource.cache.time.time', return_value=1011.0):
+                self.assertEqual(retrieve("aspirin", single_source=True, transport=transport, cache=cache),
+                                 ("WIKIPEDIA", "Old."))
+                self.assertEqual(retrieve("aspirin", single_source=True, transport=transport, cache=cache),
+                                 ("WIKIPEDIA", "Old."))
+            with patch('chemsource.cache.time.time', return_value=1022.0):
+                self.assertEqual(retrieve("aspirin", single_source=True, transport=transport, cache=cache),
+                                 ("WIKIPEDIA", "New."))
+            
+            self.assertEqual(transport.get.call_count, 4)
+            self.assertEqual(transport.get.call_args_list[1][1]['params']['prop'], "info")
+            self.assertEqual(cache.get_stale("WIKIPEDIA", "aspirin"), ("New.", "2"))
+            with patch('chemsource.cache.time.time', return_value=2000.0):
+                self.assertEqual(cache.expired_entries("WIKIPEDIA")[0][3], "aspirin")
+        finally:
+            cache.close()
+            shutil.rmtree(directory)
+    
+    def test_refresh_wikipedia_cache(self):
+        """Test that expired entries are revalidated in one batch and only changed articles downloaded."""
+        directory = tempfile.mkdtemp()
+        cache = RetrievalCache(os.path.join(directory, "cache.sqlite"), ttl={"WIKIPEDIA": 10})
+        with patch('chemsource.cache.time.time', return_value=1000.0):
+            cache.set("WIKIPEDIA", "aspirin", "Old aspirin.", validator="1", title="aspirin")
+            cache.set("WIKIPEDIA", "Caffeine", "Old caffeine.", validator="5", title="Caffeine")
+            cache.set("WIKIPEDIA", "(S)-Ibuprofen", "Old ibuprofen.", validator="3", title="(S)-Ibuprofen")
+            cache.set("WIKIPEDIA", "ethanol", "Ethanol.")
+            cache.set("WIKIPEDIA", "glucose", "Glucose.", validator="9")
+        info = MagicMock()
+        info.json.return_value = {"query": {"pages": [{"title": "Aspirin", "lastrevid": 1},
+                                                      {"title": "Caffeine", "lastrevid": 6},
+                                                      {"title": "(S)-Ibuprofen", "lastrevid": 3}],
+                                            "normalized": [{"from": "aspirin", "to": "Aspirin"}]}}
+        article = MagicMock()
+        article.json.return_value = {"query": {"pages": [{"title": "Caffeine", "extract": "New caffeine."}]}}
+        transport = MagicMock()
+        transport.get.side_effect = [info, article]
+        
+        try:
+            with patch('chemsource.cache.time.time', return_value=1011.0):
+                counts = refresh_wikipedia_cache(cache, transport=transport)
+                self.assertEqual(cache.get("WIKIPEDIA", "aspirin"), "Old aspirin.")
+                self.assertEqual(cache.get("WIKIPEDIA", "caffeine"), "New caffeine.")
+                self.assertEqual(cache.get("WIKIPEDIA", "(s)-ibuprofen"), "Old ibuprofen.")
+                self.assertIsNone(cache.get("WIKIPEDIA", "ethanol"))
+                self.assertIsNone(cache.get("WIKIPEDIA", "glucose"))
+            
+            self.assertEqual(counts, {"unchanged": 2, "changed": 1, "skipped": 2})
+            self.assertEqual(transport.get.call_count, 2)
+            titles = transport.get.call_args_list[0][1]['params']['titles'].split("|")
+            self.assertEqual(sorted(titles), ["(S)-Ibuprofen", "Caffeine", "aspirin"])
+            self.assertEqual(cache.get_stale("WIKIPEDIA", "caffeine"), ("New caffeine.", "6"))
+        finally:
+            cache.close()
+            shutil.rmtree(directory)
+    
+    def test_pubmed_retrieve_many_search_parse_error(self):
+        """Test that an unparsable search response raises PubMedSearchXMLParseError."""
+        response = MagicMock()
+        response.content = b"Invalid XML"
+        transport = MagicMock()
+        transport.get.return_value = response
+        
+        with self.assertRaises(PubMedSearchXMLParseError):
+            pubmed_retrieve_many(["aspirin"], transport=transport)
+
+    
+    @patch('chemsource.retriever.pubmed_retrieve')
+    @patch('chemsource.retriever.wikipedia_retrieve')
+    def test_retrieve_hedged_starts_secondary_early(self, mock_wiki, mock_pubmed):
+        """Test that a hedged retrieve overlaps a slow failing priority source with the secondary."""
+        def slow_miss(*args):
+            time.sleep(0.2)
+            raise WikipediaRetrievalError("missing")
+        
+        def slow_hit(*args):
+            time.sleep(0.2)
+            return "abstract"
+        
+        mock_wiki.side_effect = slow_miss
+        mock_pubmed.side_effect = slow_hit
+        
+        start = time.monotonic()
+        result = retrieve("novelcompound", hedge_delay=0.05)
+        elapsed = time.monotonic() - start
+        
+        self.assertEqual(result, ("PUBMED", "abstract"))
+        self.assertLess(elapsed, 0.35)
+    
+    @patch('chemsource.retriever.pubmed_retrieve')
+    @patch('chemsource.retriever.wikipedia_retrieve')
+    def test_retrieve_hedged_prefers_priority_source(self, mock_wiki, mock_pubmed):
+        """Test that the priority source wins whenever it succeeds, even if slower."""
+        def slow_hit(*args):
+            time.sleep(0.1)
+            return "article"
+        
+        mock_wiki.side_effect = slow_hit
+        mock_pubmed.return_value = "abstract"
+        
+        self.assertEqual(retrieve("aspirin", hedge_delay=0), ("WIKIPEDIA", "article"))
+        mock_pubmed.assert_called_once()
+    
+    @patch('chemsource.retriever.pubmed_retrieve')
+    @patch('chemsource.retriever.wikipedia_retrieve')
+    def test_retrieve_hedged_skips_secondary_on_fast_success(self, mock_wiki, mock_pubmed):
+        """Test that the secondary source is not started if the priority source answers in time."""
+        mock_wiki.return_value = "article"
+        
+        self.assertEqual(retrieve("aspirin", hedge_delay=1), ("WIKIPEDIA", "article"))
+        mock_pubmed.assert_not_called()
+        
+        mock_wiki.side_effect = WikipediaRetrievalError("missing")
+        mock_pubmed.side_effect = Exception("down")
+        self.assertEqual(retrieve("aspirin", hedge_delay=1), (None, None))
+    
+    @patch('chemsource.retriever.pubmed_retrieve')
+    @patch('chemsource.retriever.wikipedia_retrieve')
+    def test_retrieve_warm_cache_makes_no_requests(self, mock_wiki, mock_pubmed):
+        """Test that a warm cache answers repeated lookups without calling any source."""
+        cache = MagicMock()
+        cache.get.return_value = None
+        mock_wiki.side_effect = WikipediaRetrievalError("missing")
+        mock_pubmed.return_value = "abstract"
+        
+        self.assertEqual(retrieve("aspirin", cache=cache), ("PUBMED", "abstract"))
+        cache.set.assert_called_once_with("PUBMED", "aspirin", "abstract", {'retmax': '3', 'sort': 'relevance'})
+        
+        cache.get.side_effect = lambda source, name, params: "article" if source == "WIKIPEDIA" else None
+        mock_wiki.reset_mock()
+        mock_pubmed.reset_mock()
+        
+        self.assertEqual(retrieve("aspirin", cache=cache, hedge_delay=0), ("WIKIPEDIA", "article"))
+        mock_wiki.assert_not_called()
+        mock_pubmed.assert_not_called()
+
+    
+    @patch('chemsource.retriever.pubmed_retrieve')
+    @patch('chemsource.retriever.wikipedia_retrieve')
+    def test_retrieve_negative_cache_skips_known_misses(self, mock_wiki, mock_pubmed):
+        """Test that known misses are remembered separately and answered without requests."""
+        cache = MemoryCache()
+        negative_cache = MemoryCache()
+        mock_wiki.side_effect = WikipediaPageNotFoundError("missing")
+        mock_pubmed.return_value = "NO_RESULTS"
+        
+        self.assertEqual(retrieve("novelcompound", cache=cache, negative_cache=negative_cache),
+                         ("PUBMED", "NO_RESULTS"))
+        self.assertEqual(len(cache), 0)
+        self.assertEqual(negative_cache.get("WIKIPEDIA", "novelcompound"), "PAGE_NOT_FOUND")
+        
+        mock_wiki.reset_mock()
+        mock_pubmed.reset_mock()
+        self.assertEqual(retrieve("novelcompound", cache=cache, negative_cache=negative_cache),
+                         ("PUBMED", "NO_RESULTS"))
+        mock_wiki.assert_not_called()
+        mock_pubmed.assert_not_called()
+        self.assertEqual(retrieve("novelcompound", single_source=True, negative_cache=negative_cache),
+                         (None, None))
+        mock_wiki.assert_not_called()
+    
+    @patch('chemsource.retriever.pubmed_retrieve')
+    @patch('chemsource.retriever.wikipedia_retrieve')
+    def test_retrieve_negative_cache_ignores_transient_errors(self, mock_wiki, mock_pubmed):
+        """Test that failures other than a missing or ambiguous page are not remembered."""
+        negative_cache = MemoryCache()
+        mock_wiki.side_effect = WikipediaRetrievalError("timeout")
+        mock_pubmed.return_value = "abstract"
+        
+        self.assertEqual(retrieve("aspirin", negative_cache=negative_cache), ("PUBMED", "abstract"))
+        self.assertEqual(len(negative_cache), 0)
+    
+    @patch('chemsource.retriever.wikipedia.page')
+    def test_wikipedia_retrieve_miss_errors(self, mock_page):
+        """Test that missing and disambiguation pages raise specific WikipediaRetrievalError subclasses."""
+        mock_page.side_effect = wikipedia.exceptions.PageError("novelcompound")
+        with self.assertRaises(WikipediaPageNotFoundError):
+            wikipedia_retrieve("novelcompound")
+        
+        mock_page.side_effect = wikipedia.exceptions.DisambiguationError("Mercury", ["Mercury (planet)"])
+        with self.assertRaises(WikipediaDisambiguationError):
+            wikipedia_retrieve("Mercury")
+
+
+class TestAsyncRetriever(unittest.IsolatedAsyncioTestCase):
+    """Test cases for the asyncio retrieval functions."""
+    
+    async def test_apubmed_retrieve_success(self):
+        """Test successful asynchronous PubMed retrieval."""
+        search_response = MagicMock()
+        search_response.content = b"<eSearchResult><Count>1</Count><WebEnv>env</WebEnv></eSearchResult>"
+        abstract_response = MagicMock()
+        abstract_response.aiter_bytes.return_value = _achunks(b"<PubmedArticleSet><AbstractText>Async ",
+                                                              b"abstract.</AbstractText></PubmedArticleSet>")
+        stream = MagicMock()
+        stream.__aenter__ = AsyncMock(return_value=abstract_response)
+        stream.__aexit__ = AsyncMock(return_value=False)
+        transport = MagicMock()
+        transport.get = AsyncMock(return_value=search_response)
+        transport.stream.return_value = stream
+        
+        result = await apubmed_retrieve("aspirin", ncbikey="test_key", transport=transport)
+        
+        self.assertEqual(result, " Async abstract.")
+        self.assertEqual(transport.stream.call_args[1]['params']['WebEnv'], "env")
+    
+    async def test_apubmed_retrieve_request_failure(self):
+        """Test asynchronous PubMed retrieval with request failure."""
+        transport = MagicMock()
+        transport.get = AsyncMock(side_effect=Exception("Network error"))
+        
+        with self.assertRaises(PubMedSearchXMLParseError):
+            await apubmed_retrieve("aspirin", ncbikey="test_key", transport=transport)
+    
+    async def test_awikipedia_retrieve_success(self):
+        """Test successful asynchronous Wikipedia retrieval."""
+        response = MagicMock()
+        response.json.return_value = {"query": {"pages": [{"title": "Aspirin", "extract": "Aspirin\n is  a drug."}]}}
+        transport = MagicMock()
+        transport.get = AsyncMock(return_value=response)
+        
+        result = await awikipedia_retrieve("aspirin", transport=transport)
+        
+        self.assertEqual(result, "Aspirin is a drug.")
+    
+    @patch('chemsource.retriever.apubmed_retrieve', new_callable=AsyncMock)
+    @patch('chemsource.retriever.awikipedia_retrieve', new_callable=AsyncMock)
+    async def test_aretrieve_priority_and_fallback(self, mock_wiki, mock_pubmed):
+        """Test that aretrieve keeps the priority and single_source semantics of retrieve."""
+        mock_wiki.side_effect = WikipediaRetrievalError("missing")
+        mock_pubmed.return_value = "abstract"
+        transport = MagicMock()
+        
+        self.assertEqual(await aretrieve("x", transport=transport), ("PUBMED", "abstract"))
+        self.assertEqual(await aretrieve("x", single_source=True, transport=transport), (None, None))
+        self.assertEqual(await aretrieve("x", priority="PUBMED", transport=transport), ("PUBMED", "abstract"))
+        self.assertEqual(mock_wiki.call_count, 2)
+        
+        with self.assertRaises(ValueError):
+            await aretrieve("x", priority="OTHER", transport=transport)
+    
+    async def test_aretrieve_hedged(self):
+        """Test that hedged aretrieve prefers the priority source and cancels the secondary."""
+        cancelled = []
+        
+        async def slow_pubmed(*args):
+            try:
+                await asyncio.sleep(1)
+            except asyncio.CancelledError:
+                cancelled.append(True)
+                raise
+            return "abstract"
+        
+        async def wiki(*args):
+            await asyncio.sleep(0.05)
+            return "article"
+        
+        with patch('chemsource.retriever.awikipedia_retrieve', side_effect=wiki), \
+             patch('chemsource.retriever.apubmed_retrieve', side_effect=slow_pubmed):
+            result = await aretrieve("aspirin", transport=MagicMock(), hedge_delay=0)
+            await asyncio.sleep(0)
+        
+        self.assertEqual(result, ("WIKIPEDIA", "article"))
+        self.assertEqual(cancelled, [True])
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,145 @@
+"""
+Tests for the transport module.
+"""
+import asyncio
+import http.server
+import threading
+import unittest
+from unittest.mock import patch, MagicMock, AsyncMock
+from chemsource.transport import Transport, AsyncTransport, USER_AGENT
+
+
+class _KeepAliveHandler(http.server.BaseHTTPRequestHandler):
+    """HTTP/1.1 handler keeping connections open between requests."""
+
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header("Content-Length", "2")
+        self.end_headers()
+        self.wfile.write(b"ok")
+
+    def log_message(self, *args):
+        pass
+
+
+class TestTransport(unittest.TestCase):
+    """Test cases for the Transport class."""
+    
+    def test_transport_defaults(self):
+        """Test Transport initialization with default values."""
+        transport = Transport()
+        
+        self.assertEqual(transport.timeout, (5.0, 30.0))
+        self.assertEqual(transport.session.headers["User-Agent"], USER_AGENT)
+        self.assertEqual(transport.session.headers["Accept-Encoding"], "gzip, deflate")
+        adapter = transport.session.get_adapter("https://eutils.ncbi.nlm.nih.gov")
+        self.assertEqual(adapter._pool_maxsize, 10)
+    
+    def test_transport_custom_configuration(self):
+        """Test Transport initialization with custom pool size, timeouts and headers."""
+        transport = Transport(pool_size=4, connect_timeout=1, read_timeout=2,
+                              gzip=False, headers={"X-Test": "1"})
+        
+        self.assertEqual(transport.timeout, (1, 2))
+        self.assertEqual(transport.session.headers["Accept-Encoding"], "identity")
+        self.assertEqual(transport.session.headers["X-Test"], "1")
+        adapter = transport.session.get_adapter("https://en.wikipedia.org")
+        self.assertEqual(adapter._pool_maxsize, 4)
+    
+    def test_transport_invalid_pool_size(self):
+        """Test that a pool size below one raises ValueError."""
+        with self.assertRaises(ValueError):
+            Transport(pool_size=0)
+    
+    def test_transport_get_reuses_session_with_timeout(self):
+        """Test that GET requests go through the shared session with the configured timeout."""
+        transport = Transport(connect_timeout=1, read_timeout=2)
+        
+        with patch.object(transport.session, 'request', return_value=MagicMock()) as mock_request:
+            transport.get("https://example.org", params={"a": "1"})
+            transport.post("https://example.org", data={"b": "2"}, stream=True)
+        
+        mock_request.assert_any_call("GET", "https://example.org", params={"a": "1"},
+                                     data=None, timeout=(1, 2), stream=False)
+        mock_request.assert_any_call("POST", "https://example.org", params=None,
+                                     data={"b": "2"}, timeout=(1, 2), stream=True)
+
+
+
+class TestAsyncTransport(unittest.IsolatedAsyncioTestCase):
+    """Test cases for the AsyncTransport class."""
+    
+    async def test_client_created_lazily_and_reused(self):
+        """Test that the httpx client is created on first use and reused afterwards."""
+        transport = AsyncTransport(pool_size=3, connect_timeout=1, read_timeout=2)
+        self.assertEqual(len(transport._clients), 0)
+        
+        client = transport.client
+        self.assertIs(transport.client, client)
+        self.assertEqual(client.headers["User-Agent"], USER_AGENT)
+        self.assertEqual(client.timeout.connect, 1)
+        self.assertEqual(client.timeout.read, 2)
+        self.assertIsNone(client.timeout.pool)
+        
+        with self.assertRaises(RuntimeError):
+            transport.close()
+        await transport.aclose()
+        self.assertTrue(client.is_closed)
+        self.assertEqual(len(transport._clients), 0)
+    
+    async def test_get_and_post_use_client(self):
+        """Test that GET and POST requests go through the pooled client."""
+        transport = AsyncTransport()
+        with patch.object(transport.client, 'request', new_callable=AsyncMock) as mock_request:
+            await transport.get("https://example.org", params={"a": "1"})
+            await transport.post("https://example.org", data={"b": "2"})
+        
+        mock_request.assert_any_call("GET", "https://example.org", params={"a": "1"}, data=None)
+        mock_request.assert_any_call("POST", "https://example.org", params=None, data={"b": "2"})
+        await transport.aclose()
+    
+    def test_invalid_pool_size(self):
+        """Test that a pool size below one raises ValueError."""
+        with self.assertRaises(ValueError):
+            AsyncTransport(pool_size=0)
+
+
+class TestAsyncTransportEventLoops(unittest.TestCase):
+    """Test cases for an AsyncTransport shared by several event loops."""
+
+    def setUp(self):
+        """Start a local keep-alive HTTP server."""
+        self.server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), _KeepAliveHandler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.url = "http://127.0.0.1:%d/" % self.server.server_address[1]
+
+    def tearDown(self):
+        """Stop the server."""
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_reused_across_event_loops(self):
+        """Test that each asyncio.run call gets a client of its own event loop."""
+        transport = AsyncTransport()
+
+        async def get():
+            response = await transport.get(self.url)
+            return response.status_code, transport.client
+
+        status, first = asyncio.run(get())
+        self.assertEqual(status, 200)
+        loop = asyncio.new_event_loop()
+        try:
+            status, second = loop.run_until_complete(get())
+            self.assertEqual(status, 200)
+            self.assertIsNot(second, first)
+            transport.close()
+            self.assertTrue(second.is_closed)
+        finally:
+            loop.close()
+
+
+if __name__ == '__main__':
+    unittest.main()